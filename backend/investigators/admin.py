@@ -1,5 +1,7 @@
-from django.contrib import admin
+from django.contrib import admin, messages
+from django.db import transaction
 from .models import *
+from .trabajos import encolar
 
 admin.site.register(Unidad)
 admin.site.register(Area)
@@ -21,3 +23,53 @@ admin.site.register(RolEvento)
 admin.site.register(Evento)
 admin.site.register(Usuario)
 admin.site.register(PuntajeInvestigador)
+admin.site.register(HistorialPuntaje)
+admin.site.register(Trabajo)
+admin.site.register(PuntoControlImportacion)
+
+class ReglaPuntajeInline(admin.TabularInline):
+    model = ReglaPuntaje
+    extra = 0
+
+@admin.register(VersionReglasPuntaje)
+class VersionReglasPuntajeAdmin(admin.ModelAdmin):
+    """
+    Administración de las versiones de reglas de puntuación.
+    Permite duplicar una versión para editarla y activarla encolando el recálculo de todos los puntajes.
+    """
+    list_display = ('nombre', 'activa', 'fecha_creacion', 'fecha_modificacion')
+    inlines = [ReglaPuntajeInline]
+    actions = ['duplicar_version', 'activar_version']
+
+    @admin.action(description="Duplicar versiones seleccionadas")
+    def duplicar_version(self, request, queryset):
+        for version in queryset:
+            copia = VersionReglasPuntaje.objects.create(
+                nombre=f"Copia de {version.nombre}",
+                descripcion=version.descripcion,
+                activa=False
+            )
+            ReglaPuntaje.objects.bulk_create([
+                ReglaPuntaje(
+                    version=copia, categoria=regla.categoria, orden=regla.orden,
+                    condiciones=regla.condiciones, puntos=regla.puntos
+                )
+                for regla in version.reglas.all()
+            ])
+        self.message_user(request, f"{queryset.count()} versión(es) duplicada(s)")
+
+    @admin.action(description="Activar versión y recalcular puntajes")
+    def activar_version(self, request, queryset):
+        if queryset.count() != 1:
+            self.message_user(request, "Seleccione una sola versión para activar", level=messages.ERROR)
+            return
+
+        version = queryset.first()
+        with transaction.atomic():
+            VersionReglasPuntaje.objects.filter(activa=True).update(activa=False)
+            VersionReglasPuntaje.objects.filter(pk=version.pk).update(activa=True)
+            # El recálculo completo lo ejecuta procesar_trabajos fuera del proceso web
+            trabajo = encolar('recalcular_puntajes')
+        self.message_user(
+            request, f"Versión '{version.nombre}' activada; recálculo de puntajes encolado (trabajo #{trabajo.pk})"
+        )
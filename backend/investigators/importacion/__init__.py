@@ -0,0 +1,7 @@
+from .lector import FormatoInvalido, ObjetosPorModelo, leer_objetos
+
+__all__ = [
+    'FormatoInvalido',
+    'ObjetosPorModelo',
+    'leer_objetos',
+]
@@ -0,0 +1,152 @@
+import datetime
+import io
+import json
+
+from django.db import connection, transaction
+
+from investigators.importacion.escritura import (
+    BATCH_SIZE, importar_lote, marcar_afectados, normalizar_campos, resolver_relaciones
+)
+from investigators.scoring.cambios import investigadores_afectados
+
+# Cantidad de filas por COPY; cada lote se carga y fusiona en una sola sentencia
+COPY_BATCH_SIZE = 5000
+
+def copia_disponible():
+    """
+    Indica si la base de datos admite COPY FROM STDIN (solo PostgreSQL).
+    """
+    return connection.vendor == 'postgresql'
+
+def _texto(valor):
+    """
+    Convierte un valor ya preparado para la base de datos al formato de texto de COPY.
+    """
+    if valor is None:
+        return '\\N'
+    if isinstance(valor, bool):
+        valor = 't' if valor else 'f'
+    elif isinstance(valor, (datetime.date, datetime.time)):
+        valor = valor.isoformat()
+    elif isinstance(valor, (dict, list)):
+        valor = json.dumps(valor)
+    elif hasattr(valor, 'adapted'):
+        # Adaptadores de psycopg para JSON
+        valor = json.dumps(valor.adapted)
+    else:
+        valor = str(valor)
+    return valor.replace('\\', '\\\\').replace('\t', '\\t').replace('\n', '\\n').replace('\r', '\\r')
+
+def _columnas(Model, nombres):
+    """
+    Retorna (campos insertados, campos actualizados) para un grupo de filas con los
+    mismos campos. Se insertan la clave primaria, los campos presentes y los que tienen
+    valor por defecto; en las filas existentes solo se actualizan los presentes y los
+    auto_now, igual que en importar_lote.
+    """
+    insertados = []
+    actualizados = []
+    for field in Model._meta.concrete_fields:
+        presente = field.name in nombres or field.attname in nombres
+        automatico = getattr(field, 'auto_now', False) or getattr(field, 'auto_now_add', False)
+        if field.primary_key or presente or field.has_default() or automatico:
+            insertados.append(field)
+        if not field.primary_key and (presente or getattr(field, 'auto_now', False)):
+            actualizados.append(field)
+    return insertados, actualizados
+
+def _copiar(cursor, sql, datos):
+    """
+    Ejecuta COPY FROM STDIN con psycopg2 (copy_expert) o psycopg 3 (copy).
+    """
+    crudo = cursor.cursor
+    if hasattr(crudo, 'copy_expert'):
+        crudo.copy_expert(sql, datos)
+    else:
+        with crudo.copy(sql) as copia:
+            copia.write(datos.getvalue())
+
+def _fusionar(Model, objetos, insertados, actualizados):
+    """
+    Carga los objetos en una tabla temporal con COPY y los fusiona con la tabla real
+    con una sola sentencia INSERT ... SELECT ... ON CONFLICT (id) DO UPDATE.
+    """
+    quote = connection.ops.quote_name
+    tabla = quote(Model._meta.db_table)
+    temporal = quote(f'importacion_{Model._meta.db_table}')
+    columnas = ', '.join(quote(field.column) for field in insertados)
+    pk = quote(Model._meta.pk.column)
+
+    datos = io.StringIO()
+    for objeto in objetos:
+        datos.write('\t'.join(
+            _texto(field.get_db_prep_save(field.pre_save(objeto, add=True), connection))
+            for field in insertados
+        ))
+        datos.write('\n')
+    datos.seek(0)
+
+    if actualizados:
+        conflicto = 'DO UPDATE SET ' + ', '.join(
+            f'{quote(field.column)} = EXCLUDED.{quote(field.column)}' for field in actualizados
+        )
+    else:
+        conflicto = 'DO NOTHING'
+
+    with connection.cursor() as cursor:
+        # CREATE TABLE AS no copia las restricciones NOT NULL de la tabla original
+        cursor.execute(f'DROP TABLE IF EXISTS {temporal}')
+        cursor.execute(
+            f'CREATE TEMPORARY TABLE {temporal} ON COMMIT DROP AS '
+            f'SELECT {columnas} FROM {tabla} WITH NO DATA'
+        )
+        _copiar(cursor, f'COPY {temporal} ({columnas}) FROM STDIN', datos)
+        cursor.execute(
+            f'INSERT INTO {tabla} ({columnas}) SELECT {columnas} FROM {temporal} '
+            f'ON CONFLICT ({pk}) {conflicto}'
+        )
+        cursor.execute(f'DROP TABLE {temporal}')
+
+def importar_lote_copia(Model, items, relaciones, batch_size=BATCH_SIZE):
+    """
+    Importa un lote de objetos de fixture con COPY, para cargas grandes en PostgreSQL.
+
+    Los campos se normalizan y las relaciones se resuelven igual que en importar_lote.
+    Las filas se agrupan por los campos que traen (normalmente uno solo, como en los
+    fixtures de dumpdata) y cada grupo se carga con COPY en una tabla temporal y se
+    fusiona con la tabla real en una sola sentencia. No se consultan las filas
+    existentes ni se construye un UPDATE por fila.
+
+    Si la fusión falla (por ejemplo una fila viola una restricción) el lote se importa
+    con importar_lote, que aísla las filas con error. Retorna lo mismo que importar_lote.
+    """
+    filas = {item['pk']: normalizar_campos(item['fields'], relaciones) for item in items}
+    errores_relaciones, faltantes = resolver_relaciones(Model, filas, relaciones, batch_size)
+    errores = [f"ID {pk}: {mensaje}" for pk, mensaje in errores_relaciones.items()]
+
+    grupos = {}
+    for pk, fields in filas.items():
+        try:
+            objeto = Model(pk=pk, **fields)
+        except Exception as e:
+            errores.append(f"ID {pk}: {str(e)}")
+            continue
+        grupos.setdefault(frozenset(fields), []).append(objeto)
+
+    importados = [objeto.pk for objetos in grupos.values() for objeto in objetos]
+    afectados = investigadores_afectados(Model, importados)
+    try:
+        with transaction.atomic():
+            for nombres, objetos in grupos.items():
+                _fusionar(Model, objetos, *_columnas(Model, nombres))
+    except Exception:
+        # Las relaciones ya están resueltas como <campo>_id; se importan sin volver a resolverlas
+        pendientes = [
+            {'pk': objeto.pk, 'fields': filas[objeto.pk]}
+            for objetos in grupos.values() for objeto in objetos
+        ]
+        cantidad, errores_lote, _ = importar_lote(Model, pendientes, {}, batch_size)
+        return cantidad, errores + errores_lote, faltantes
+
+    marcar_afectados(Model, afectados, importados)
+    return len(importados), errores, faltantes
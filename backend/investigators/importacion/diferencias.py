@@ -0,0 +1,90 @@
+import datetime
+
+from django.conf import settings
+from django.core.exceptions import FieldDoesNotExist, ValidationError
+from django.utils import timezone
+
+from investigators.importacion.escritura import normalizar_campos
+
+def _comparables(Model):
+    """
+    Campos que se comparan: los concretos salvo la clave primaria y los auto_now /
+    auto_now_add, que la base de datos no guarda con el valor del fixture.
+    """
+    return {
+        field.attname: field for field in Model._meta.concrete_fields
+        if not field.primary_key
+        and not getattr(field, 'auto_now', False)
+        and not getattr(field, 'auto_now_add', False)
+    }
+
+def _canonico(field, valor):
+    """
+    Convierte un valor del fixture o de la base de datos a la misma representación:
+    el tipo de Python del campo, y las fechas con hora en UTC.
+    """
+    valor = field.to_python(valor)
+    if isinstance(valor, datetime.datetime):
+        if settings.USE_TZ and timezone.is_naive(valor):
+            valor = timezone.make_aware(valor)
+        if timezone.is_aware(valor):
+            valor = valor.astimezone(datetime.timezone.utc)
+    return valor
+
+def _valores_fixture(Model, comparables, fields, relaciones):
+    """
+    Valores canónicos {attname: valor} de los campos que trae un objeto del fixture.
+    """
+    valores = {}
+    for nombre, valor in normalizar_campos(fields, relaciones).items():
+        field = Model._meta.get_field(nombre)
+        if field.attname in comparables:
+            valores[field.attname] = _canonico(field, valor)
+    return valores
+
+def clasificar(Model, items, relaciones):
+    """
+    Separa un lote de objetos de fixture en nuevos, modificados y sin cambios.
+
+    Los valores canónicos de los campos que trae cada objeto se comparan directamente
+    con los de la fila guardada sobre los mismos campos. Las filas guardadas del lote
+    se leen con una sola consulta values_list. Los objetos que no se pueden interpretar
+    (un id o un valor inválido) se consideran modificados, para que la importación
+    informe el error.
+
+    Retorna (nuevos, modificados, sin_cambios), listas con los objetos del lote.
+    """
+    comparables = _comparables(Model)
+    pk_field = Model._meta.pk
+
+    entrantes = {}
+    modificados = []
+    for item in items:
+        try:
+            pk = pk_field.to_python(item['pk'])
+            entrantes[pk] = (item, _valores_fixture(Model, comparables, item['fields'], relaciones))
+        except (ValidationError, FieldDoesNotExist, TypeError, ValueError):
+            modificados.append(item)
+
+    attnames = list(comparables)
+    guardadas = {
+        fila[0]: dict(zip(attnames, fila[1:]))
+        for fila in Model.objects.filter(pk__in=list(entrantes)).values_list('pk', *attnames)
+    }
+
+    nuevos = []
+    sin_cambios = []
+    for pk, (item, valores) in entrantes.items():
+        guardada = guardadas.get(pk)
+        if guardada is None:
+            nuevos.append(item)
+            continue
+        almacenados = {
+            attname: _canonico(comparables[attname], guardada[attname]) for attname in valores
+        }
+        if valores == almacenados:
+            sin_cambios.append(item)
+        else:
+            modificados.append(item)
+
+    return nuevos, modificados, sin_cambios
@@ -0,0 +1,205 @@
+from collections import defaultdict
+
+from django.core.exceptions import ValidationError
+from django.core.management.color import no_style
+from django.db import connection, transaction
+
+from investigators.models import Investigador, PuntajeInvestigador
+from investigators.scoring.cambios import investigadores_afectados
+from investigators.scoring.pending import marcar_pendientes
+from investigators.scoring.ranking import programar_actualizacion
+from investigators.scoring.resumen import programar_invalidacion
+
+# Cantidad de filas por sentencia en bulk_create / bulk_update
+BATCH_SIZE = 500
+
+# Valores con los que los fixtures exportados resumen un campo
+ELIPSIS = ("…", "{…}")
+
+def normalizar_campos(fields, relaciones):
+    """
+    Retorna una copia de los campos con las elipsis reemplazadas: None en las
+    relaciones y cadena vacía en los demás campos.
+    """
+    fields = dict(fields)
+    for field, value in fields.items():
+        if value in ELIPSIS:
+            fields[field] = None if field in relaciones else ""
+    return fields
+
+def resolver_relaciones(Model, filas, relaciones, batch_size=BATCH_SIZE):
+    """
+    Resuelve las relaciones de un lote de filas con una consulta por modelo relacionado.
+
+    Se reúnen los ids referenciados por todas las filas, se comprueba cuáles existen con
+    filter(pk__in=...).values_list('pk') y cada relación se asigna como <campo>_id, sin
+    cargar las instancias. Las referencias a filas inexistentes quedan en None.
+
+    Parámetros:
+        Model: Modelo de las filas
+        filas (dict): {pk: campos}; los campos se modifican en el lugar
+        relaciones (dict): {campo: (nombre del modelo, modelo relacionado)}
+
+    Retorna (errores, faltantes): los errores {pk: mensaje} de las filas con un id
+    inválido, que se quitan de filas, y los ids inexistentes {campo: set(ids)}.
+    """
+    errores = {}
+    referencias = defaultdict(set)
+    for pk, fields in filas.items():
+        try:
+            for field_name, (related_model_name, RelatedModel) in relaciones.items():
+                if fields.get(field_name) is not None:
+                    fields[field_name] = RelatedModel._meta.pk.to_python(fields[field_name])
+                    referencias[RelatedModel].add(fields[field_name])
+        except ValidationError as e:
+            errores[pk] = f"{field_name}: {' '.join(e.messages)}"
+    for pk in errores:
+        del filas[pk]
+
+    existentes = {}
+    for RelatedModel, ids in referencias.items():
+        ids = list(ids)
+        existentes[RelatedModel] = set()
+        for inicio in range(0, len(ids), batch_size):
+            existentes[RelatedModel].update(
+                RelatedModel.objects.filter(pk__in=ids[inicio:inicio + batch_size]).values_list('pk', flat=True)
+            )
+
+    faltantes = defaultdict(set)
+    for fields in filas.values():
+        for field_name, (related_model_name, RelatedModel) in relaciones.items():
+            if field_name not in fields:
+                continue
+            related_id = fields.pop(field_name)
+            if related_id is not None and related_id not in existentes[RelatedModel]:
+                faltantes[field_name].add(related_id)
+                related_id = None
+            fields[Model._meta.get_field(field_name).attname] = related_id
+
+    return errores, faltantes
+
+def _campos_escritos(Model, nombres):
+    """
+    Campos que se actualizan en las filas existentes: los que trae el fixture
+    y los auto_now, que save() actualizaría.
+    """
+    return [
+        field.name for field in Model._meta.concrete_fields
+        if not field.primary_key and (
+            field.name in nombres or field.attname in nombres or getattr(field, 'auto_now', False)
+        )
+    ]
+
+def _escribir(Model, objetos, existentes, campos, batch_size):
+    """
+    Escribe las filas nuevas y las existentes. Si la base de datos admite
+    INSERT ... ON CONFLICT (id) DO UPDATE se hace todo con bulk_create(update_conflicts=True);
+    si no, con bulk_create para las nuevas y bulk_update para las existentes.
+    """
+    if campos and connection.features.supports_update_conflicts_with_target:
+        Model.objects.bulk_create(
+            objetos, batch_size=batch_size, update_conflicts=True,
+            unique_fields=[Model._meta.pk.name], update_fields=campos
+        )
+        return
+    nuevos = [objeto for objeto in objetos if objeto.pk not in existentes]
+    actualizados = [objeto for objeto in objetos if objeto.pk in existentes]
+    if nuevos:
+        Model.objects.bulk_create(nuevos, batch_size=batch_size)
+    if actualizados and campos:
+        Model.objects.bulk_update(actualizados, campos, batch_size=batch_size)
+
+def importar_lote(Model, items, relaciones, batch_size=BATCH_SIZE):
+    """
+    Crea o actualiza en bloque un lote de objetos de fixture de un mismo modelo.
+
+    Las filas existentes se obtienen con una sola consulta in_bulk; las nuevas y las
+    existentes se escriben con bulk_create / bulk_update en lotes de batch_size.
+    Si la escritura en bloque falla (por ejemplo una fila viola una restricción),
+    el lote se vuelve a intentar fila por fila para importar las demás e informar
+    cuáles fallaron.
+
+    Las escrituras en bloque no disparan señales: los investigadores cuyo puntaje
+    depende de las filas importadas se marcan como pendientes, y el ranking y los
+    resúmenes se actualizan si se importaron investigadores o puntajes.
+
+    Las relaciones se resuelven por lote (ver resolver_relaciones); las que apuntan
+    a filas inexistentes quedan en None y se informan juntas.
+
+    Retorna (cantidad importada, lista de errores "ID pk: mensaje",
+    ids inexistentes por campo {campo: set(ids)}).
+    """
+    filas = {item['pk']: normalizar_campos(item['fields'], relaciones) for item in items}
+    errores_relaciones, faltantes = resolver_relaciones(Model, filas, relaciones, batch_size)
+    errores = [f"ID {pk}: {mensaje}" for pk, mensaje in errores_relaciones.items()]
+
+    existentes = Model.objects.in_bulk(list(filas))
+    afectados = investigadores_afectados(Model, existentes)
+
+    objetos = []
+    nombres = set()
+    for pk, fields in filas.items():
+        try:
+            objeto = existentes.get(pk)
+            if objeto is None:
+                objeto = Model(pk=pk, **fields)
+            else:
+                for field_name, value in fields.items():
+                    if hasattr(objeto, field_name):
+                        setattr(objeto, field_name, value)
+        except Exception as e:
+            errores.append(f"ID {pk}: {str(e)}")
+            continue
+        nombres.update(fields)
+        objetos.append(objeto)
+
+    try:
+        with transaction.atomic():
+            _escribir(Model, objetos, existentes, _campos_escritos(Model, nombres), batch_size)
+        importados = [objeto.pk for objeto in objetos]
+    except Exception:
+        # Fila por fila, cada una en su propio savepoint, para aislar las que fallan
+        importados = []
+        for objeto in objetos:
+            try:
+                with transaction.atomic():
+                    objeto.save()
+                importados.append(objeto.pk)
+            except Exception as e:
+                errores.append(f"ID {objeto.pk}: {str(e)}")
+
+    marcar_afectados(Model, afectados, importados)
+    return len(importados), errores, faltantes
+
+def marcar_afectados(Model, afectados, importados):
+    """
+    Marca como pendientes a los investigadores afectados antes de escribir y a los
+    que dependen de las filas importadas. El ranking y los resúmenes se actualizan
+    si se importaron investigadores o puntajes.
+
+    Los puntajes importados de investigadores activos también se recalculan: son datos
+    derivados y el archivo puede traer valores que ya no corresponden a las reglas.
+    """
+    afectados = afectados | investigadores_afectados(Model, importados)
+    if importados and Model is PuntajeInvestigador:
+        afectados |= set(
+            PuntajeInvestigador.objects.filter(pk__in=importados, investigador__activo=True)
+            .values_list('investigador_id', flat=True)
+        )
+    marcar_pendientes(afectados)
+    if importados and Model in (Investigador, PuntajeInvestigador):
+        # Un cambio de área o de puntos altera las posiciones y los resúmenes
+        programar_actualizacion()
+        programar_invalidacion()
+
+def reiniciar_secuencias(modelos):
+    """
+    Ajusta las secuencias de ids (PostgreSQL) al mayor id de cada tabla, porque los
+    fixtures insertan ids explícitos y la secuencia no avanza. En SQLite no hace nada.
+    """
+    sentencias = connection.ops.sequence_reset_sql(no_style(), modelos)
+    if not sentencias:
+        return
+    with connection.cursor() as cursor:
+        for sentencia in sentencias:
+            cursor.execute(sentencia)
@@ -0,0 +1,184 @@
+import io
+import json
+import tempfile
+
+# Caracteres leídos por cada lectura del archivo
+TAMANO_LECTURA = 65536
+
+# Tamaño máximo de un objeto del fixture. Evita acumular todo el archivo en memoria
+# cuando un objeto no termina nunca (JSON truncado o inválido)
+MAX_OBJETO = 1048576
+
+_decodificador = json.JSONDecoder()
+
+class FormatoInvalido(ValueError):
+    """
+    El archivo no es una lista JSON de objetos de fixture.
+    """
+
+def _fragmentos_sin_comentarios(texto, tamano_lectura):
+    """
+    Lee el texto por líneas, descarta las de comentario (las que comienzan con //, como
+    en test_data.json) y entrega el resto en fragmentos de al menos tamano_lectura
+    caracteres. Una línea más larga que tamano_lectura se lee en varias partes, así que
+    un archivo en una sola línea tampoco se carga de una vez.
+    """
+    partes = []
+    tamano = 0
+    inicio_linea = True
+    comentario = False
+    while True:
+        parte = texto.readline(tamano_lectura)
+        if not parte:
+            break
+        if inicio_linea:
+            comentario = parte.lstrip().startswith('//')
+        inicio_linea = parte.endswith('\n')
+        if comentario:
+            continue
+        partes.append(parte)
+        tamano += len(parte)
+        if tamano >= tamano_lectura:
+            yield ''.join(partes)
+            partes = []
+            tamano = 0
+    if partes:
+        yield ''.join(partes)
+
+def leer_objetos(archivo, tamano_lectura=TAMANO_LECTURA, max_objeto=MAX_OBJETO):
+    """
+    Lee un fixture JSON (una lista de objetos) y entrega sus objetos uno a uno.
+
+    El archivo se decodifica y analiza de forma incremental: solo se mantiene en memoria
+    el fragmento pendiente de analizar, de modo que la memoria no depende del tamaño del
+    archivo sino del tamaño de cada objeto.
+
+    Parámetros:
+        archivo: Archivo binario abierto (por ejemplo un archivo subido)
+        tamano_lectura (int): Caracteres leídos por cada lectura
+        max_objeto (int): Tamaño máximo de un objeto en caracteres
+
+    Lanza FormatoInvalido si el contenido no es una lista JSON válida.
+    """
+    # TextIOWrapper cerraría el archivo al descartarse; se separa al terminar
+    texto = io.TextIOWrapper(archivo, encoding='utf-8-sig')
+    fragmentos = _fragmentos_sin_comentarios(texto, tamano_lectura)
+    buffer = ''
+    posicion = 0
+    fin = False
+
+    def leer_mas():
+        # Descarta lo ya analizado y agrega el siguiente fragmento del archivo
+        nonlocal buffer, posicion, fin
+        buffer = buffer[posicion:]
+        posicion = 0
+        fragmento = next(fragmentos, None)
+        if fragmento is None:
+            fin = True
+        else:
+            buffer += fragmento
+
+    def siguiente_caracter():
+        # Avanza hasta el siguiente carácter que no es espacio, o None al final del archivo
+        nonlocal posicion
+        while True:
+            while posicion < len(buffer) and buffer[posicion].isspace():
+                posicion += 1
+            if posicion < len(buffer):
+                return buffer[posicion]
+            if fin:
+                return None
+            leer_mas()
+
+    try:
+        if siguiente_caracter() != '[':
+            raise FormatoInvalido("El JSON debe ser una lista de objetos")
+        posicion += 1
+
+        primero = True
+        while True:
+            caracter = siguiente_caracter()
+            if caracter == ']':
+                posicion += 1
+                break
+            if not primero:
+                if caracter != ',':
+                    raise FormatoInvalido(f"Se esperaba ',' o ']' y se encontró {caracter!r}")
+                posicion += 1
+                siguiente_caracter()
+            primero = False
+
+            while True:
+                try:
+                    objeto, posicion = _decodificador.raw_decode(buffer, posicion)
+                    break
+                except json.JSONDecodeError as e:
+                    # El objeto puede estar incompleto: se lee más hasta completarlo
+                    if fin:
+                        raise FormatoInvalido(f"El archivo no contiene JSON válido: {e}")
+                    if len(buffer) - posicion > max_objeto:
+                        raise FormatoInvalido(
+                            f"El archivo no contiene JSON válido o un objeto supera {max_objeto} caracteres: {e}"
+                        )
+                    leer_mas()
+            yield objeto
+
+        if siguiente_caracter() is not None:
+            raise FormatoInvalido("Hay contenido después del final de la lista")
+    except UnicodeDecodeError as e:
+        raise FormatoInvalido(f"El archivo no está codificado en UTF-8: {e}")
+    finally:
+        texto.detach()
+
+class ObjetosPorModelo:
+    """
+    Agrupa por modelo los objetos de un fixture sin mantenerlos en memoria.
+
+    Cada objeto se escribe como una línea JSON en un archivo temporal de su modelo,
+    de modo que después se pueden importar los modelos en el orden de sus dependencias
+    leyendo cada uno por lotes. Se usa como administrador de contexto para eliminar
+    los archivos temporales al terminar.
+    """
+
+    def __init__(self):
+        self._archivos = {}
+        self.cantidades = {}
+
+    def agregar(self, modelo, objeto):
+        if modelo not in self._archivos:
+            self._archivos[modelo] = tempfile.TemporaryFile(mode='w+', encoding='utf-8')
+            self.cantidades[modelo] = 0
+        self._archivos[modelo].write(json.dumps(objeto, ensure_ascii=False) + '\n')
+        self.cantidades[modelo] += 1
+
+    def __contains__(self, modelo):
+        return modelo in self._archivos
+
+    def lotes(self, modelo, batch_size):
+        """
+        Entrega los objetos de un modelo en listas de hasta batch_size elementos,
+        en el orden en que aparecían en el archivo.
+        """
+        archivo = self._archivos.get(modelo)
+        if archivo is None:
+            return
+        archivo.seek(0)
+        lote = []
+        for linea in archivo:
+            lote.append(json.loads(linea))
+            if len(lote) == batch_size:
+                yield lote
+                lote = []
+        if lote:
+            yield lote
+
+    def cerrar(self):
+        for archivo in self._archivos.values():
+            archivo.close()
+        self._archivos = {}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.cerrar()
@@ -0,0 +1,50 @@
+from investigators.importacion.copia import COPY_BATCH_SIZE, importar_lote_copia
+from investigators.importacion.escritura import BATCH_SIZE, importar_lote
+from investigators.importacion.plan import niveles_de_importacion, relaciones_de
+from investigators.models import (
+    Unidad, Area, Especialidad, NivelEducacion, NivelSNII, Carrera,
+    TipoEstudiante, Investigador, JefeArea, Estudiante, Linea, DetLinea,
+    TipoHerramienta, Herramienta, Proyecto, DetProyecto, DetHerramienta,
+    Articulo, DetArticulo, TipoEvento, RolEvento, Evento, DetEvento, Usuario,
+    PuntajeInvestigador
+)
+
+# Modos de importación: función que importa un lote y tamaño del lote
+IMPORT_MODES = {
+    'bulk': (importar_lote, BATCH_SIZE),
+    'copy': (importar_lote_copia, COPY_BATCH_SIZE),
+}
+
+# Modelos que se pueden importar, por su nombre en el fixture
+MODEL_MAPPING = {
+    'investigators.unidad': Unidad,
+    'investigators.area': Area,
+    'investigators.especialidad': Especialidad,
+    'investigators.niveleducacion': NivelEducacion,
+    'investigators.nivelsnii': NivelSNII,
+    'investigators.carrera': Carrera,
+    'investigators.tipoestudiante': TipoEstudiante,
+    'investigators.investigador': Investigador,
+    'investigators.jefearea': JefeArea,
+    'investigators.estudiante': Estudiante,
+    'investigators.linea': Linea,
+    'investigators.detlinea': DetLinea,
+    'investigators.tipoherramienta': TipoHerramienta,
+    'investigators.herramienta': Herramienta,
+    'investigators.proyecto': Proyecto,
+    'investigators.detproyecto': DetProyecto,
+    'investigators.detherramienta': DetHerramienta,
+    'investigators.articulo': Articulo,
+    'investigators.detarticulo': DetArticulo,
+    'investigators.tipoevento': TipoEvento,
+    'investigators.rolevento': RolEvento,
+    'investigators.evento': Evento,
+    'investigators.detevento': DetEvento,
+    'investigators.usuario': Usuario,
+    'investigators.puntajeinvestigador': PuntajeInvestigador,
+}
+
+# Relaciones y orden de importación derivados de las ForeignKey de los modelos: cada
+# nivel solo depende de los anteriores y sus modelos son independientes entre sí
+MODEL_RELATIONSHIPS = {model_name: relaciones_de(Model) for model_name, Model in MODEL_MAPPING.items()}
+IMPORT_LEVELS = niveles_de_importacion(MODEL_MAPPING)
@@ -0,0 +1,55 @@
+from graphlib import CycleError, TopologicalSorter
+
+from django.core.exceptions import ImproperlyConfigured
+
+def relaciones_de(Model):
+    """
+    Relaciones de un modelo que se resuelven al importar: sus ForeignKey y OneToOneField.
+
+    Retorna {campo: (nombre del modelo relacionado, modelo relacionado)}. Las relaciones
+    ManyToMany con tabla intermedia (por ejemplo Linea.investigadores) no se escriben
+    desde el modelo: sus filas llegan como objetos del modelo intermedio (DetLinea), que
+    depende de ambos extremos por sus propias ForeignKey.
+    """
+    return {
+        field.name: (field.related_model._meta.label_lower, field.related_model)
+        for field in Model._meta.concrete_fields
+        if field.is_relation and (field.many_to_one or field.one_to_one)
+    }
+
+def niveles_de_importacion(modelos):
+    """
+    Agrupa los modelos en niveles según sus dependencias.
+
+    Con las ForeignKey de cada modelo se arma un grafo de dependencias y se ordena
+    topológicamente: el primer nivel tiene los modelos que no dependen de ningún otro
+    (los catálogos) y cada nivel siguiente solo depende de los anteriores, así que los
+    modelos de un mismo nivel se pueden procesar juntos y en cualquier orden. Las
+    dependencias hacia modelos que no están en modelos y las de un modelo consigo
+    mismo se ignoran.
+
+    Parámetros:
+        modelos (dict): {nombre del modelo: modelo}, por ejemplo 'investigators.area': Area
+
+    Retorna una lista de niveles, cada uno una lista de nombres de modelos en el orden
+    en que aparecen en modelos. Lanza ImproperlyConfigured si hay dependencias circulares.
+    """
+    orden = {nombre: indice for indice, nombre in enumerate(modelos)}
+    grafo = TopologicalSorter()
+    for nombre, Model in modelos.items():
+        dependencias = {
+            relacionado for relacionado, _ in relaciones_de(Model).values()
+            if relacionado in modelos and relacionado != nombre
+        }
+        grafo.add(nombre, *dependencias)
+
+    niveles = []
+    try:
+        grafo.prepare()
+    except CycleError as e:
+        raise ImproperlyConfigured(f"Dependencias circulares entre modelos importados: {e.args[1]}")
+    while grafo.is_active():
+        nivel = sorted(grafo.get_ready(), key=orden.get)
+        niveles.append(nivel)
+        grafo.done(*nivel)
+    return niveles
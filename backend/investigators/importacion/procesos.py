@@ -0,0 +1,17 @@
+# Funciones que ejecutan los procesos de validar_lotes. Con el método spawn cada proceso
+# importa este módulo antes de configurar Django, así que no puede importar modelos al
+# cargarse: validacion.py se importa recién después de django.setup()
+import django
+from django.apps import apps
+
+def inicializar():
+    # El proceso hijo no hereda Django configurado
+    if not apps.ready:
+        django.setup()
+
+def validar_lote(model_name, items):
+    """
+    Ejecuta validacion.validar_lote en un proceso ya inicializado.
+    """
+    from investigators.importacion.validacion import validar_lote
+    return validar_lote(model_name, items)
@@ -0,0 +1,119 @@
+import multiprocessing
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+from django.conf import settings
+from django.core.exceptions import FieldDoesNotExist, ValidationError
+
+from investigators.importacion import procesos as procesos_validacion
+from investigators.importacion.escritura import normalizar_campos
+from investigators.importacion.modelos import MODEL_MAPPING, MODEL_RELATIONSHIPS
+
+# Con menos objetos que estos se valida en el mismo proceso: iniciar los procesos
+# cuesta más que validar un archivo pequeño
+MIN_OBJETOS_PARALELO = 10000
+
+def _validar_campo(field, valor):
+    """
+    Convierte un valor del fixture al tipo del campo y lo valida con la definición del
+    campo: formato (fechas, números), null, choices y validadores como max_length.
+    No se exige blank porque las elipsis de los fixtures se importan como cadena vacía.
+    """
+    if valor is None:
+        automatico = getattr(field, 'auto_now', False) or getattr(field, 'auto_now_add', False)
+        if not field.null and not automatico:
+            raise ValidationError(field.error_messages['null'], code='null')
+        return None
+    valor = field.to_python(valor)
+    if field.choices and valor not in field.empty_values:
+        if valor not in {opcion for opcion, _ in field.flatchoices}:
+            raise ValidationError(
+                field.error_messages['invalid_choice'], code='invalid_choice', params={'value': valor}
+            )
+    field.run_validators(valor)
+    return valor
+
+def validar_lote(model_name, items):
+    """
+    Normaliza y valida un lote de objetos de fixture de un modelo.
+
+    Las elipsis se reemplazan como en normalizar_campos y cada campo que no es una
+    relación se convierte y valida con _validar_campo. Las relaciones solo se normalizan:
+    se resuelven contra la base de datos al escribir. Los campos ManyToMany se omiten,
+    porque sus filas llegan como objetos del modelo intermedio. Se ejecuta en los
+    procesos de validar_lotes, así que no consulta la base de datos.
+
+    Retorna (objetos válidos con sus campos convertidos, errores [(pk, campo, mensaje)]).
+    """
+    Model = MODEL_MAPPING[model_name]
+    relaciones = MODEL_RELATIONSHIPS[model_name]
+    validos = []
+    errores = []
+    for item in items:
+        fields = {}
+        errores_item = []
+        try:
+            pk = Model._meta.pk.to_python(item['pk'])
+        except ValidationError as e:
+            errores.append((item['pk'], 'pk', ' '.join(e.messages)))
+            continue
+        for nombre, valor in normalizar_campos(item['fields'], relaciones).items():
+            try:
+                field = Model._meta.get_field(nombre)
+            except FieldDoesNotExist:
+                errores_item.append((pk, nombre, "Campo inexistente"))
+                continue
+            if field.many_to_many:
+                continue
+            if field.is_relation:
+                fields[nombre] = valor
+                continue
+            try:
+                fields[nombre] = _validar_campo(field, valor)
+            except ValidationError as e:
+                errores_item.append((pk, nombre, ' '.join(e.messages)))
+        if errores_item:
+            errores.extend(errores_item)
+        else:
+            validos.append({'model': model_name, 'pk': pk, 'fields': fields})
+    return validos, errores
+
+def procesos_para(total):
+    """
+    Cantidad de procesos para validar un archivo de total objetos.
+    """
+    return settings.IMPORTACION_PROCESOS if total >= MIN_OBJETOS_PARALELO else 1
+
+def validar_lotes(lotes, procesos=1):
+    """
+    Valida lotes de objetos con validar_lote y los entrega en el mismo orden.
+
+    Parámetros:
+        lotes: Iterable de (nombre del modelo, lista de objetos)
+        procesos (int): Procesos de un ProcessPoolExecutor; con 1 se valida en este proceso
+
+    Entrega (nombre del modelo, objetos válidos, errores) por lote. Con varios procesos
+    se mantienen en curso a lo sumo dos lotes por proceso, de modo que la validación
+    avanza mientras quien consume los resultados escribe el lote anterior y la memoria
+    no depende del tamaño del archivo.
+    """
+    if procesos <= 1:
+        for model_name, items in lotes:
+            yield (model_name, *validar_lote(model_name, items))
+        return
+
+    # Con spawn los procesos no heredan por fork la conexión a la base de datos ni el estado
+    # de la transacción y los hilos de quien llama (por ejemplo una petición web)
+    contexto = multiprocessing.get_context('spawn')
+    with ProcessPoolExecutor(
+        max_workers=procesos, mp_context=contexto, initializer=procesos_validacion.inicializar
+    ) as executor:
+        en_curso = deque()
+        for model_name, items in lotes:
+            en_curso.append((model_name, executor.submit(procesos_validacion.validar_lote, model_name, items)))
+            if len(en_curso) >= procesos * 2:
+                model_name, futuro = en_curso.popleft()
+                yield (model_name, *futuro.result())
+        while en_curso:
+            model_name, futuro = en_curso.popleft()
+            yield (model_name, *futuro.result())
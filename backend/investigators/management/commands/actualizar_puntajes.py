@@ -1,23 +1,128 @@
-from django.core.management.base import BaseCommand
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, connections
 from investigators.models import Investigador
-from investigators.views.puntaje_view import PuntajeInvestigadorViewSet
+from investigators.scoring import calcular_puntajes
+from investigators.scoring.engine import BATCH_SIZE
+from investigators.scoring.ranking import actualizar_ranking, ranking_diferido
+
+def _iniciar_worker():
+    """
+    Prepara un proceso del pool: configura Django si el proceso no lo heredó
+    y descarta las conexiones heredadas para que abra la suya propia.
+    """
+    import django
+    from django.apps import apps
+    if not apps.ready:
+        django.setup()
+    connections.close_all()
+
+def _calcular_rango(desde, hasta, batch_size):
+    """
+    Calcula los puntajes de los investigadores activos con id en [desde, hasta].
+    El ranking no se actualiza por rango: se retorna (cantidad de investigadores
+    procesados, categorías cuyo ranking cambió) para actualizarlo una vez al final.
+    """
+    investigadores = Investigador.objects.filter(activo=True, pk__gte=desde, pk__lte=hasta)
+    with ranking_diferido() as categorias:
+        procesados = len(calcular_puntajes(investigadores, batch_size=batch_size))
+    return procesados, categorias
 
 class Command(BaseCommand):
     help = 'Calcula y actualiza los puntajes de todos los investigadores'
 
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=BATCH_SIZE,
+            help='Cantidad de puntajes por sentencia de escritura'
+        )
+        parser.add_argument(
+            '--workers', type=int, default=1,
+            help='Cantidad de procesos que calculan puntajes en paralelo'
+        )
+        parser.add_argument(
+            '--shard-size', type=int, default=1000,
+            help='Cantidad de investigadores por rango de ids asignado a cada proceso'
+        )
+        parser.add_argument(
+            '--progress-interval', type=float, default=5.0,
+            help='Segundos mínimos entre mensajes de progreso'
+        )
+
     def handle(self, *args, **options):
+        workers = options['workers']
+        shard_size = options['shard_size']
+        if workers < 1 or shard_size < 1:
+            raise CommandError('--workers y --shard-size deben ser mayores que cero')
+        if workers > 1 and connection.vendor == 'sqlite':
+            # SQLite no admite escrituras concurrentes desde varios procesos
+            self.stdout.write(self.style.WARNING('SQLite no admite varios procesos, se usará uno solo'))
+            workers = 1
+
         self.stdout.write(self.style.SUCCESS('Iniciando cálculo de puntajes...'))
-        
-        # Obtener todos los investigadores activos
-        investigadores = Investigador.objects.filter(activo=True)
-        total = investigadores.count()
-        
+
+        # Obtener los ids de todos los investigadores activos
+        ids = list(
+            Investigador.objects.filter(activo=True).order_by('pk').values_list('pk', flat=True)
+        )
+        total = len(ids)
+
         self.stdout.write(f'Procesando {total} investigadores activos')
-        
-        # Calcular puntajes para cada investigador
-        view = PuntajeInvestigadorViewSet()
-        for i, investigador in enumerate(investigadores, 1):
-            view._calcular_puntaje_investigador(investigador)
-            self.stdout.write(f'Procesado {i}/{total}: {investigador.nombre}')
-        
+
+        # Dividir los ids en rangos contiguos (desde, hasta)
+        rangos = [
+            (ids[inicio], ids[min(inicio + shard_size, total) - 1])
+            for inicio in range(0, total, shard_size)
+        ]
+
+        self._inicio = time.monotonic()
+        self._ultimo_reporte = self._inicio
+        self._procesados = 0
+        self._total = total
+        self._categorias = set()
+
+        if workers == 1:
+            for desde, hasta in rangos:
+                self._reportar(_calcular_rango(desde, hasta, options['batch_size']), options)
+        else:
+            self.stdout.write(f'Usando {workers} procesos con {len(rangos)} rangos de hasta {shard_size} investigadores')
+            # Las conexiones no se deben compartir con los procesos hijos
+            connections.close_all()
+            with ProcessPoolExecutor(max_workers=workers, initializer=_iniciar_worker) as pool:
+                futuros = [
+                    pool.submit(_calcular_rango, desde, hasta, options['batch_size'])
+                    for desde, hasta in rangos
+                ]
+                for futuro in as_completed(futuros):
+                    self._reportar(futuro.result(), options)
+
+        # Una sola actualización del ranking con las categorías que cambiaron en todos los rangos
+        actualizar_ranking(self._categorias, batch_size=options['batch_size'])
+
+        duracion = time.monotonic() - self._inicio
+        velocidad = self._procesados / duracion if duracion else 0
+        self.stdout.write(
+            f'Procesados {self._procesados} investigadores en {duracion:.2f} s '
+            f'({velocidad:.0f} investigadores/s)'
+        )
         self.stdout.write(self.style.SUCCESS('Puntajes actualizados correctamente'))
+
+    def _reportar(self, resultado, options):
+        """
+        Acumula el avance de un rango y muestra el progreso como máximo una vez por intervalo.
+        """
+        procesados, categorias = resultado
+        self._procesados += procesados
+        self._categorias.update(categorias)
+        ahora = time.monotonic()
+        if ahora - self._ultimo_reporte < options['progress_interval']:
+            return
+        self._ultimo_reporte = ahora
+        porcentaje = self._procesados * 100 / self._total if self._total else 100
+        velocidad = self._procesados / (ahora - self._inicio)
+        self.stdout.write(
+            f'Progreso: {self._procesados}/{self._total} ({porcentaje:.1f}%) '
+            f'- {velocidad:.0f} investigadores/s'
+        )
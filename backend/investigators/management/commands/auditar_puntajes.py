@@ -0,0 +1,46 @@
+from django.core.management.base import BaseCommand, CommandError
+from investigators.scoring.auditoria import CHUNK_SIZE, auditar_puntajes
+
+class Command(BaseCommand):
+    help = 'Compara los puntajes guardados con los esperados y opcionalmente corrige las diferencias'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--chunk-size', type=int, default=CHUNK_SIZE,
+            help='Cantidad de investigadores revisados por lote'
+        )
+        parser.add_argument(
+            '--corregir', action='store_true',
+            help='Recalcula los puntajes con diferencias o faltantes'
+        )
+        parser.add_argument(
+            '--limite', type=int, default=20,
+            help='Cantidad máxima de diferencias detalladas'
+        )
+
+    def handle(self, *args, **options):
+        if options['chunk_size'] < 1 or options['limite'] < 0:
+            raise CommandError('--chunk-size debe ser mayor que cero y --limite no puede ser negativo')
+
+        self.stdout.write('Auditando puntajes...')
+        reporte = auditar_puntajes(
+            chunk_size=options['chunk_size'], corregir=options['corregir'], limite=options['limite']
+        )
+
+        for diferencia in reporte['detalle']:
+            if diferencia.get('faltante'):
+                self.stdout.write(f"Investigador {diferencia['investigador']}: sin puntaje")
+                continue
+            campos = ', '.join(
+                f"{campo} {valores['guardado']} -> {valores['esperado']}"
+                for campo, valores in diferencia['campos'].items()
+            )
+            self.stdout.write(f"Investigador {diferencia['investigador']}: {campos}")
+
+        resumen = (
+            f"{reporte['revisados']} investigadores revisados, {reporte['discrepancias']} puntajes "
+            f"con diferencias, {reporte['faltantes']} faltantes, {reporte['corregidos']} corregidos"
+        )
+        sin_corregir = reporte['discrepancias'] + reporte['faltantes'] - reporte['corregidos']
+        estilo = self.style.SUCCESS if sin_corregir <= 0 else self.style.WARNING
+        self.stdout.write(estilo(resumen))
@@ -0,0 +1,26 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from investigators.scoring.history import compactar_historial
+
+class Command(BaseCommand):
+    help = 'Resume el historial de puntajes antiguo en una fila por investigador y mes'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--meses', type=int, default=3,
+            help='Meses recientes que conservan el historial detallado'
+        )
+
+    def handle(self, *args, **options):
+        meses = options['meses']
+        if meses < 0:
+            raise CommandError('--meses no puede ser negativo')
+
+        # El corte se alinea al inicio del mes para no resumir un mes a medias
+        inicio_mes = timezone.localtime().replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+        total_meses = inicio_mes.year * 12 + inicio_mes.month - 1 - meses
+        antes_de = inicio_mes.replace(year=total_meses // 12, month=total_meses % 12 + 1)
+
+        self.stdout.write(f'Compactando historial anterior a {antes_de:%Y-%m-%d}...')
+        eliminadas = compactar_historial(antes_de)
+        self.stdout.write(self.style.SUCCESS(f'Historial compactado: {eliminadas} filas eliminadas'))
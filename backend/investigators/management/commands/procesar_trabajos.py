@@ -0,0 +1,41 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+from investigators.trabajos import tomar_siguiente, ejecutar
+
+class Command(BaseCommand):
+    help = 'Ejecuta los trabajos en segundo plano encolados en la base de datos'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--intervalo', type=float, default=2.0,
+            help='Segundos de espera entre consultas cuando la cola está vacía'
+        )
+        parser.add_argument(
+            '--una-vez', action='store_true',
+            help='Procesa los trabajos pendientes y termina en lugar de esperar nuevos'
+        )
+
+    def handle(self, *args, **options):
+        self.stdout.write(self.style.SUCCESS('Esperando trabajos...'))
+        try:
+            while True:
+                # Descarta conexiones caducadas, igual que al inicio de cada petición web
+                close_old_connections()
+                trabajo = tomar_siguiente()
+                if trabajo is None:
+                    if options['una_vez']:
+                        break
+                    time.sleep(options['intervalo'])
+                    continue
+
+                self.stdout.write(f'Iniciando {trabajo}')
+                ejecutar(trabajo)
+                estilo = self.style.SUCCESS if trabajo.estado == 'Completado' else self.style.ERROR
+                self.stdout.write(estilo(
+                    f'{trabajo}: {trabajo.procesados}/{trabajo.total} procesados, '
+                    f'{len(trabajo.errores)} errores, {trabajo.velocidad} por segundo'
+                ))
+        except KeyboardInterrupt:
+            self.stdout.write('Detenido')
@@ -0,0 +1,78 @@
+import json
+import time
+
+from django.core.exceptions import ValidationError
+from django.core.management.base import BaseCommand, CommandError
+from investigators.scoring.simulacion import Simulador
+
+class Command(BaseCommand):
+    help = 'Simula cambios en los puntos de las reglas sin modificar los puntajes'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--escenarios',
+            help='Archivo JSON con una lista de escenarios {"nombre": ..., "pesos": {categoria: ...}}'
+        )
+        parser.add_argument(
+            '--peso', action='append', default=[],
+            help='Cambio de un escenario único con formato categoria:indice=puntos (se puede repetir)'
+        )
+        parser.add_argument(
+            '--limite', type=int, default=10,
+            help='Cantidad de investigadores mostrados por escenario'
+        )
+
+    def handle(self, *args, **options):
+        escenarios = []
+        if options['escenarios']:
+            try:
+                with open(options['escenarios'], encoding='utf-8') as archivo:
+                    escenarios = json.load(archivo)
+            except (OSError, json.JSONDecodeError) as e:
+                raise CommandError(f'No se pudo leer {options["escenarios"]}: {e}')
+        if options['peso']:
+            pesos = {}
+            for cambio in options['peso']:
+                try:
+                    regla, puntos = cambio.split('=')
+                    categoria, indice = regla.split(':')
+                except ValueError:
+                    raise CommandError(f'Formato inválido en --peso {cambio}, se esperaba categoria:indice=puntos')
+                pesos.setdefault(categoria, {})[indice] = puntos
+            escenarios.append({'nombre': 'Línea de comandos', 'pesos': pesos})
+
+        inicio = time.monotonic()
+        simulador = Simulador()
+        carga = time.monotonic() - inicio
+        self.stdout.write(f'Conteos de {len(simulador.ids)} investigadores cargados en {carga:.2f} s')
+
+        if not escenarios:
+            self.stdout.write('No se indicaron escenarios. Reglas actuales:')
+            for categoria, reglas in simulador.describir_reglas().items():
+                for regla in reglas:
+                    self.stdout.write(f'  {categoria}:{regla["indice"]} = {regla["puntos"]}  {regla["condiciones"]}')
+            return
+
+        inicio = time.monotonic()
+        try:
+            resultados = simulador.evaluar(escenarios, limite=options['limite'])
+        except ValidationError as e:
+            raise CommandError('; '.join(e.messages))
+        evaluacion = time.monotonic() - inicio
+
+        for resultado in resultados:
+            self.stdout.write(self.style.SUCCESS(f'\n{resultado["nombre"]}'))
+            self.stdout.write(
+                f'  Cambian de puntaje: {resultado["investigadores_con_cambio_puntaje"]}, '
+                f'de posición: {resultado["investigadores_con_cambio_posicion"]}, '
+                f'delta promedio {resultado["delta_promedio"]} '
+                f'(mín {resultado["delta_minimo"]}, máx {resultado["delta_maximo"]})'
+            )
+            for investigador in resultado['investigadores']:
+                self.stdout.write(
+                    f'  #{investigador["id"]}: {investigador["puntaje_actual"]} -> {investigador["puntaje_simulado"]} '
+                    f'({investigador["delta"]:+d}), posición {investigador["posicion_actual"]} -> '
+                    f'{investigador["posicion_simulada"]} ({investigador["cambio_posicion"]:+d})'
+                )
+
+        self.stdout.write(f'\n{len(resultados)} escenarios evaluados en {evaluacion * 1000:.1f} ms')
@@ -0,0 +1,100 @@
+# Generated by Django 5.2.18 on 2026-10-18 11:21
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+# Reglas vigentes al momento de crear la tabla (antes estaban fijas en el código)
+REGLAS_INICIALES = {
+    'puntos_estudiantes_maestria': [
+        ({'tipo_estudiante__nombre__icontains': 'Maestría', 'activo': True}, 1),
+        ({'tipo_estudiante__nombre__icontains': 'Maestría', 'estatus': 'Desertor'}, 2),
+        ({'tipo_estudiante__nombre__icontains': 'Maestría', 'estatus': 'Egresado'}, 3),
+        ({'tipo_estudiante__nombre__icontains': 'Maestría', 'estatus': 'Titulado'}, 5),
+    ],
+    'puntos_estudiantes_doctorado': [
+        ({'tipo_estudiante__nombre__icontains': 'Doctorado', 'activo': True}, 1),
+        ({'tipo_estudiante__nombre__icontains': 'Doctorado', 'estatus': 'Desertor'}, 3),
+        ({'tipo_estudiante__nombre__icontains': 'Doctorado', 'estatus': 'Egresado'}, 5),
+        ({'tipo_estudiante__nombre__icontains': 'Doctorado', 'estatus': 'Titulado'}, 8),
+    ],
+    'puntos_lineas_investigacion': [
+        ({'linea__reconocimiento_institucional': True}, 5),
+    ],
+    'puntos_proyectos': [
+        ({'estado': 'En Proceso'}, 3),
+        ({'estado': 'Terminado'}, 7),
+        ({'estado': 'Instalado en Sitio'}, 10),
+    ],
+    'puntos_articulos': [
+        ({'orden_autor': 1, 'articulo__estado': 'En Proceso'}, 3),
+        ({'orden_autor': 1, 'articulo__estado': 'Terminado'}, 5),
+        ({'orden_autor': 1, 'articulo__estado': 'En Revista'}, 7),
+        ({'orden_autor': 1, 'articulo__estado': 'Publicado'}, 10),
+        ({'orden_autor': 1}, 0),
+        ({}, 3),
+    ],
+    'puntos_eventos': [
+        ({'evento__tipo_evento__nombre': 'Congreso', 'rol_evento__nombre__contains': 'Ponente'}, 3),
+        ({'evento__tipo_evento__nombre': 'Taller'}, 1),
+        ({'evento__tipo_evento__nombre': 'Conferencia', 'rol_evento__nombre__contains': 'Ponente'}, 5),
+        ({'evento__tipo_evento__nombre': 'Diplomado'}, 3),
+        ({'evento__tipo_evento__nombre': 'Charla'}, 1),
+        ({}, 1),
+    ],
+}
+
+
+def crear_reglas_iniciales(apps, schema_editor):
+    VersionReglasPuntaje = apps.get_model('investigators', 'VersionReglasPuntaje')
+    ReglaPuntaje = apps.get_model('investigators', 'ReglaPuntaje')
+
+    version = VersionReglasPuntaje.objects.create(
+        nombre='Reglas iniciales',
+        descripcion='Reglas de puntuación originales del sistema',
+        activa=True
+    )
+    ReglaPuntaje.objects.bulk_create([
+        ReglaPuntaje(version=version, categoria=categoria, orden=orden, condiciones=condiciones, puntos=puntos)
+        for categoria, reglas in REGLAS_INICIALES.items()
+        for orden, (condiciones, puntos) in enumerate(reglas, 1)
+    ])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('investigators', '0006_puntajeinvestigador'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='VersionReglasPuntaje',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('nombre', models.CharField(max_length=100)),
+                ('descripcion', models.TextField(blank=True, null=True)),
+                ('activa', models.BooleanField(default=False)),
+                ('fecha_creacion', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'verbose_name_plural': 'Versiones de Reglas de Puntaje',
+                'constraints': [models.UniqueConstraint(condition=models.Q(('activa', True)), fields=('activa',), name='una_version_reglas_activa')],
+            },
+        ),
+        migrations.CreateModel(
+            name='ReglaPuntaje',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('categoria', models.CharField(choices=[('puntos_estudiantes_maestria', 'Estudiantes de maestría'), ('puntos_estudiantes_doctorado', 'Estudiantes de doctorado'), ('puntos_lineas_investigacion', 'Líneas de investigación'), ('puntos_proyectos', 'Proyectos'), ('puntos_articulos', 'Artículos'), ('puntos_eventos', 'Eventos')], max_length=50)),
+                ('orden', models.PositiveIntegerField(default=0)),
+                ('condiciones', models.JSONField(blank=True, default=dict)),
+                ('puntos', models.IntegerField()),
+                ('version', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='reglas', to='investigators.versionreglaspuntaje')),
+            ],
+            options={
+                'verbose_name_plural': 'Reglas de Puntaje',
+                'ordering': ['version', 'categoria', 'orden', 'id'],
+            },
+        ),
+        migrations.RunPython(crear_reglas_iniciales, migrations.RunPython.noop),
+    ]
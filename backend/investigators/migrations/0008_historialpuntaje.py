@@ -0,0 +1,35 @@
+# Generated by Django 5.2.18 on 2026-10-18 11:23
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('investigators', '0007_reglas_puntaje'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='HistorialPuntaje',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('fecha', models.DateTimeField(default=django.utils.timezone.now)),
+                ('puntos_estudiantes_maestria', models.IntegerField(default=0)),
+                ('puntos_estudiantes_doctorado', models.IntegerField(default=0)),
+                ('puntos_lineas_investigacion', models.IntegerField(default=0)),
+                ('puntos_proyectos', models.IntegerField(default=0)),
+                ('puntos_articulos', models.IntegerField(default=0)),
+                ('puntos_eventos', models.IntegerField(default=0)),
+                ('puntos_totales', models.IntegerField(default=0)),
+                ('mensual', models.BooleanField(default=False)),
+                ('investigador', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='historial_puntajes', to='investigators.investigador')),
+            ],
+            options={
+                'verbose_name_plural': 'Historial de Puntajes',
+                'indexes': [models.Index(fields=['investigador', 'fecha'], name='investigato_investi_500b6d_idx')],
+            },
+        ),
+    ]
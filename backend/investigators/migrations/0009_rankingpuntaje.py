@@ -0,0 +1,31 @@
+# Generated by Django 5.2.18 on 2026-10-18 11:26
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('investigators', '0008_historialpuntaje'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RankingPuntaje',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('categoria', models.CharField(choices=[('puntos_estudiantes_maestria', 'Estudiantes de maestría'), ('puntos_estudiantes_doctorado', 'Estudiantes de doctorado'), ('puntos_lineas_investigacion', 'Líneas de investigación'), ('puntos_proyectos', 'Proyectos'), ('puntos_articulos', 'Artículos'), ('puntos_eventos', 'Eventos'), ('puntos_totales', 'Total')], max_length=50)),
+                ('puntos', models.IntegerField(default=0)),
+                ('posicion_area', models.PositiveIntegerField()),
+                ('posicion_global', models.PositiveIntegerField()),
+                ('area', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='investigators.area')),
+                ('investigador', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='rankings', to='investigators.investigador')),
+            ],
+            options={
+                'verbose_name_plural': 'Rankings de Puntaje',
+                'indexes': [models.Index(fields=['categoria', 'area', 'posicion_area'], name='ranking_area_idx'), models.Index(fields=['categoria', 'posicion_global'], name='ranking_global_idx')],
+                'constraints': [models.UniqueConstraint(fields=('investigador', 'categoria'), name='ranking_unico_investigador_categoria')],
+            },
+        ),
+    ]
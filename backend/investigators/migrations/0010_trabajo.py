@@ -0,0 +1,33 @@
+# Generated by Django 5.2.18 on 2026-10-18 11:30
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('investigators', '0009_rankingpuntaje'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Trabajo',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('tipo', models.CharField(choices=[('recalcular_puntajes', 'Recalcular puntajes')], max_length=50)),
+                ('estado', models.CharField(choices=[('Pendiente', 'Pendiente'), ('En Proceso', 'En Proceso'), ('Completado', 'Completado'), ('Error', 'Error')], default='Pendiente', max_length=20)),
+                ('parametros', models.JSONField(blank=True, default=dict)),
+                ('total', models.PositiveIntegerField(default=0)),
+                ('procesados', models.PositiveIntegerField(default=0)),
+                ('errores', models.JSONField(blank=True, default=list)),
+                ('resultado', models.JSONField(blank=True, default=dict)),
+                ('fecha_creacion', models.DateTimeField(auto_now_add=True)),
+                ('fecha_inicio', models.DateTimeField(blank=True, null=True)),
+                ('fecha_fin', models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                'verbose_name_plural': 'Trabajos',
+                'indexes': [models.Index(fields=['estado', 'id'], name='investigato_estado_88b785_idx')],
+            },
+        ),
+    ]
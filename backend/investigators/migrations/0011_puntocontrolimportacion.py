@@ -0,0 +1,38 @@
+# Generated by Django 5.2.18 on 2026-10-18 11:55
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('investigators', '0010_trabajo'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='trabajo',
+            name='tipo',
+            field=models.CharField(choices=[('recalcular_puntajes', 'Recalcular puntajes'), ('importar_json', 'Importar JSON')], max_length=50),
+        ),
+        migrations.CreateModel(
+            name='PuntoControlImportacion',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('modelo', models.CharField(max_length=100)),
+                ('total', models.PositiveIntegerField(default=0)),
+                ('bloques', models.PositiveIntegerField(default=0)),
+                ('procesados', models.PositiveIntegerField(default=0)),
+                ('importados', models.PositiveIntegerField(default=0)),
+                ('errores', models.PositiveIntegerField(default=0)),
+                ('referencias_faltantes', models.JSONField(blank=True, default=dict)),
+                ('fecha_actualizacion', models.DateTimeField(auto_now=True)),
+                ('trabajo', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='puntos_control', to='investigators.trabajo')),
+            ],
+            options={
+                'verbose_name_plural': 'Puntos de control de importación',
+                'unique_together': {('trabajo', 'modelo')},
+            },
+        ),
+    ]
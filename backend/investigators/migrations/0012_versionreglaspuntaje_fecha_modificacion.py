@@ -0,0 +1,20 @@
+# Generated by Django 5.2.18 on 2026-10-18 14:02
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('investigators', '0011_puntocontrolimportacion'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='versionreglaspuntaje',
+            name='fecha_modificacion',
+            field=models.DateTimeField(auto_now=True, default=django.utils.timezone.now),
+            preserve_default=False,
+        ),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 5.2.18 on 2026-10-18 12:24
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('investigators', '0012_versionreglaspuntaje_fecha_modificacion'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Contador',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('nombre', models.CharField(max_length=100, unique=True)),
+                ('valor', models.BigIntegerField(default=0)),
+            ],
+            options={
+                'verbose_name_plural': 'Contadores',
+            },
+        ),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 5.2.18 on 2026-10-18 12:27
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('investigators', '0013_contador'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='rankingpuntaje',
+            index=models.Index(fields=['categoria', 'puntos'], name='ranking_puntos_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='rankingpuntaje',
+            index=models.Index(fields=['categoria', 'area', 'puntos'], name='ranking_area_puntos_idx'),
+        ),
+    ]
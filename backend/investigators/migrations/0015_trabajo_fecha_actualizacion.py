@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-18 12:34
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('investigators', '0014_rankingpuntaje_indices_puntos'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='trabajo',
+            name='fecha_actualizacion',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
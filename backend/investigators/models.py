@@ -2,7 +2,35 @@ from django.db import models
 from django.utils import timezone
 import datetime
 
-class Unidad(models.Model):
+class EliminacionEnCascadaQuerySet(models.QuerySet):
+    """
+    QuerySet cuyo delete() difiere el cálculo de puntajes mientras dura la cascada.
+    Las filas relacionadas eliminadas solo registran a sus investigadores y al terminar
+    se recalculan todos juntos, una vez, al confirmar la transacción.
+    """
+    def delete(self):
+        from investigators.scoring.pending import puntajes_diferidos
+        with puntajes_diferidos():
+            return super().delete()
+
+class EliminacionEnCascadaModel(models.Model):
+    """
+    Modelo base para los modelos cuya eliminación se propaga en cascada a filas que
+    aportan al puntaje (estudiantes, líneas, proyectos, artículos y eventos).
+    Tanto instance.delete() como QuerySet.delete() agrupan el recálculo de puntajes;
+    los investigadores eliminados en la misma cascada ya no se recalculan.
+    """
+    objects = EliminacionEnCascadaQuerySet.as_manager()
+
+    def delete(self, *args, **kwargs):
+        from investigators.scoring.pending import puntajes_diferidos
+        with puntajes_diferidos():
+            return super().delete(*args, **kwargs)
+
+    class Meta:
+        abstract = True
+
+class Unidad(EliminacionEnCascadaModel):
     """
     Modelo que representa una unidad académica o institución.
     Ejemplo: Facultad, Centro de Investigación, etc.
@@ -15,7 +43,7 @@ class Unidad(models.Model):
     class Meta:
         verbose_name_plural = "Unidades"
 
-class Area(models.Model):
+class Area(EliminacionEnCascadaModel):
     """
     Modelo que representa un área de conocimiento o departamento.
     Cada área pertenece a una unidad académica específica.
@@ -68,7 +96,7 @@ class NivelSNII(models.Model):
     class Meta:
         verbose_name_plural = "Niveles SNII"
 
-class Carrera(models.Model):
+class Carrera(EliminacionEnCascadaModel):
     """
     Modelo que representa una carrera o programa académico.
     """
@@ -80,7 +108,7 @@ class Carrera(models.Model):
     class Meta:
         verbose_name_plural = "Carreras"
 
-class TipoEstudiante(models.Model):
+class TipoEstudiante(EliminacionEnCascadaModel):
     """
     Modelo que define el tipo de estudiante.
     Ejemplo: Servicio Social, Licenciatura, Maestría, Doctorado, etc.
@@ -93,7 +121,7 @@ class TipoEstudiante(models.Model):
     class Meta:
         verbose_name_plural = "Tipos de Estudiantes"
 
-class Investigador(models.Model):
+class Investigador(EliminacionEnCascadaModel):
     """
     Modelo principal que representa a un investigador académico.
     Contiene información personal y profesional del investigador.
@@ -161,7 +189,7 @@ class Estudiante(models.Model):
     class Meta:
         verbose_name_plural = "Estudiantes"
 
-class Linea(models.Model):
+class Linea(EliminacionEnCascadaModel):
     """
     Modelo que representa una línea de investigación.
     Las líneas pueden tener reconocimiento institucional y están asociadas a investigadores.
@@ -258,7 +286,7 @@ class DetHerramienta(models.Model):
     class Meta:
         unique_together = ('proyecto', 'herramienta')
 
-class Articulo(models.Model):
+class Articulo(EliminacionEnCascadaModel):
     """
     Modelo que representa un artículo científico o publicación académica.
     Contiene información bibliográfica y estado de publicación.
@@ -310,7 +338,7 @@ class DetArticulo(models.Model):
     class Meta:
         unique_together = ('articulo', 'investigador')
 
-class TipoEvento(models.Model): 
+class TipoEvento(EliminacionEnCascadaModel): 
     """
     Modelo que clasifica los tipos de eventos académicos.
     Ejemplo: Conferencia, Congreso, Taller, Seminario, etc.
@@ -323,7 +351,7 @@ class TipoEvento(models.Model):
     class Meta:
         verbose_name_plural = "Tipos de Eventos"
 
-class RolEvento(models.Model):
+class RolEvento(EliminacionEnCascadaModel):
     """
     Modelo que define los roles que un investigador puede tener en un evento.
     Ejemplo: Organizador, Ponente, Asistente, etc.
@@ -336,7 +364,7 @@ class RolEvento(models.Model):
     class Meta:
         verbose_name_plural = "Roles de Evento"
 
-class Evento(models.Model):
+class Evento(EliminacionEnCascadaModel):
     """
     Modelo que representa un evento académico o profesional.
     Incluye detalles del evento y su relación con investigadores.
@@ -538,3 +566,229 @@ class PuntajeInvestigador(models.Model):
     
     class Meta:
         verbose_name_plural = "Puntajes de Investigadores"
+
+class VersionReglasPuntaje(models.Model):
+    """
+    Modelo que agrupa un conjunto versionado de reglas de puntuación.
+    Solo una versión puede estar activa; es la que se usa para calcular los puntajes.
+    Para cambiar un peso se recomienda duplicar la versión activa, editar la copia y activarla,
+    de modo que las versiones anteriores queden como historial.
+    """
+    nombre = models.CharField(max_length=100)
+    descripcion = models.TextField(blank=True, null=True)
+    activa = models.BooleanField(default=False)
+    fecha_creacion = models.DateTimeField(auto_now_add=True)
+    fecha_modificacion = models.DateTimeField(auto_now=True)
+    
+    def __str__(self):
+        return f"{self.nombre} (activa)" if self.activa else self.nombre
+    
+    class Meta:
+        verbose_name_plural = "Versiones de Reglas de Puntaje"
+        constraints = [
+            models.UniqueConstraint(
+                fields=['activa'],
+                condition=models.Q(activa=True),
+                name='una_version_reglas_activa'
+            ),
+        ]
+
+class ReglaPuntaje(models.Model):
+    """
+    Modelo que define una regla de puntuación dentro de una versión.
+    Cada fila relacionada (estudiante, proyecto, artículo, etc.) recibe los puntos de la
+    primera regla de su categoría, en orden, cuyas condiciones cumpla.
+    Las condiciones son búsquedas del ORM sobre el modelo de la categoría, por ejemplo
+    {"evento__tipo_evento__nombre": "Congreso", "rol_evento__nombre__contains": "Ponente"}.
+    Una regla sin condiciones aplica a cualquier fila y funciona como valor por defecto.
+    """
+    CATEGORIA_CHOICES = [
+        ('puntos_estudiantes_maestria', 'Estudiantes de maestría'),
+        ('puntos_estudiantes_doctorado', 'Estudiantes de doctorado'),
+        ('puntos_lineas_investigacion', 'Líneas de investigación'),
+        ('puntos_proyectos', 'Proyectos'),
+        ('puntos_articulos', 'Artículos'),
+        ('puntos_eventos', 'Eventos'),
+    ]
+    
+    version = models.ForeignKey(VersionReglasPuntaje, on_delete=models.CASCADE, related_name='reglas')
+    categoria = models.CharField(max_length=50, choices=CATEGORIA_CHOICES)
+    orden = models.PositiveIntegerField(default=0)
+    condiciones = models.JSONField(default=dict, blank=True)
+    puntos = models.IntegerField()
+    
+    def __str__(self):
+        return f"{self.get_categoria_display()} #{self.orden}: {self.puntos} puntos"
+    
+    def clean(self):
+        """
+        Verifica que las condiciones sean búsquedas válidas para el modelo de la categoría.
+        """
+        from investigators.scoring.rules import validar_condiciones
+        validar_condiciones(self.categoria, self.condiciones)
+    
+    class Meta:
+        verbose_name_plural = "Reglas de Puntaje"
+        ordering = ['version', 'categoria', 'orden', 'id']
+
+class HistorialPuntaje(models.Model):
+    """
+    Modelo de solo inserción que guarda la evolución del puntaje de un investigador.
+    Se agrega una fila cada vez que cambia el puntaje, o una por día según PUNTAJES_HISTORIAL.
+    El comando compactar_historial_puntajes resume las filas antiguas en una por mes (mensual=True).
+    """
+    investigador = models.ForeignKey(Investigador, on_delete=models.CASCADE, related_name='historial_puntajes')
+    fecha = models.DateTimeField(default=timezone.now)
+    puntos_estudiantes_maestria = models.IntegerField(default=0)
+    puntos_estudiantes_doctorado = models.IntegerField(default=0)
+    puntos_lineas_investigacion = models.IntegerField(default=0)
+    puntos_proyectos = models.IntegerField(default=0)
+    puntos_articulos = models.IntegerField(default=0)
+    puntos_eventos = models.IntegerField(default=0)
+    puntos_totales = models.IntegerField(default=0)
+    mensual = models.BooleanField(default=False)
+    
+    def __str__(self):
+        return f"{self.investigador_id} - {self.fecha:%Y-%m-%d}: {self.puntos_totales}"
+    
+    class Meta:
+        verbose_name_plural = "Historial de Puntajes"
+        indexes = [
+            models.Index(fields=['investigador', 'fecha']),
+        ]
+
+class RankingPuntaje(models.Model):
+    """
+    Modelo materializado con la posición de cada investigador por categoría de puntaje,
+    dentro de su área y en el total de investigadores.
+    Se actualiza, en las categorías que cambiaron, al confirmar cualquier transacción que
+    modifique puntajes (una sola vez al final en los recálculos masivos); los índices
+    permiten obtener los primeros lugares de un área o categoría sin ordenar toda la tabla
+    y desplazar solo las posiciones entre los puntos anteriores y nuevos de un investigador.
+    """
+    CATEGORIA_CHOICES = ReglaPuntaje.CATEGORIA_CHOICES + [
+        ('puntos_totales', 'Total'),
+    ]
+    
+    investigador = models.ForeignKey(Investigador, on_delete=models.CASCADE, related_name='rankings')
+    area = models.ForeignKey(Area, on_delete=models.CASCADE)
+    categoria = models.CharField(max_length=50, choices=CATEGORIA_CHOICES)
+    puntos = models.IntegerField(default=0)
+    posicion_area = models.PositiveIntegerField()
+    posicion_global = models.PositiveIntegerField()
+    
+    def __str__(self):
+        return f"{self.get_categoria_display()} - {self.investigador_id}: #{self.posicion_global}"
+    
+    class Meta:
+        verbose_name_plural = "Rankings de Puntaje"
+        constraints = [
+            models.UniqueConstraint(
+                fields=['investigador', 'categoria'],
+                name='ranking_unico_investigador_categoria'
+            ),
+        ]
+        indexes = [
+            models.Index(fields=['categoria', 'area', 'posicion_area'], name='ranking_area_idx'),
+            models.Index(fields=['categoria', 'posicion_global'], name='ranking_global_idx'),
+            # Rangos de puntos cuyas posiciones se desplazan al cambiar un puntaje
+            models.Index(fields=['categoria', 'puntos'], name='ranking_puntos_idx'),
+            models.Index(fields=['categoria', 'area', 'puntos'], name='ranking_area_puntos_idx'),
+        ]
+
+class Trabajo(models.Model):
+    """
+    Modelo que representa un trabajo en segundo plano guardado en la base de datos.
+    Las vistas lo encolan y el comando procesar_trabajos lo ejecuta fuera de los
+    procesos web, registrando el avance para consultarlo desde la API.
+    """
+    TIPO_CHOICES = [
+        ('recalcular_puntajes', 'Recalcular puntajes'),
+        ('importar_json', 'Importar JSON'),
+    ]
+    
+    ESTADO_CHOICES = [
+        ('Pendiente', 'Pendiente'),
+        ('En Proceso', 'En Proceso'),
+        ('Completado', 'Completado'),
+        ('Error', 'Error'),
+    ]
+    
+    tipo = models.CharField(max_length=50, choices=TIPO_CHOICES)
+    estado = models.CharField(max_length=20, choices=ESTADO_CHOICES, default='Pendiente')
+    parametros = models.JSONField(default=dict, blank=True)
+    total = models.PositiveIntegerField(default=0)
+    procesados = models.PositiveIntegerField(default=0)
+    errores = models.JSONField(default=list, blank=True)
+    resultado = models.JSONField(default=dict, blank=True)
+    fecha_creacion = models.DateTimeField(auto_now_add=True)
+    fecha_inicio = models.DateTimeField(null=True, blank=True)
+    fecha_fin = models.DateTimeField(null=True, blank=True)
+    # Último avance registrado; un trabajo 'En Proceso' sin avance reciente se retoma
+    fecha_actualizacion = models.DateTimeField(null=True, blank=True)
+    
+    def __str__(self):
+        return f"{self.get_tipo_display()} #{self.pk} ({self.estado})"
+    
+    @property
+    def porcentaje(self):
+        """
+        Porcentaje de avance del trabajo.
+        """
+        if self.estado == 'Completado':
+            return 100.0
+        return round(self.procesados * 100 / self.total, 1) if self.total else 0.0
+    
+    @property
+    def velocidad(self):
+        """
+        Elementos procesados por segundo desde que inició el trabajo.
+        """
+        if self.fecha_inicio is None:
+            return 0.0
+        duracion = ((self.fecha_fin or timezone.now()) - self.fecha_inicio).total_seconds()
+        return round(self.procesados / duracion, 1) if duracion > 0 else 0.0
+    
+    class Meta:
+        verbose_name_plural = "Trabajos"
+        indexes = [
+            models.Index(fields=['estado', 'id']),
+        ]
+
+class PuntoControlImportacion(models.Model):
+    """
+    Modelo que guarda el avance de un trabajo de importación para un modelo del fixture.
+    Se actualiza en la misma transacción que cada bloque importado, de modo que si el
+    trabajo falla se puede reanudar a partir del último bloque confirmado.
+    """
+    trabajo = models.ForeignKey(Trabajo, on_delete=models.CASCADE, related_name='puntos_control')
+    modelo = models.CharField(max_length=100)
+    total = models.PositiveIntegerField(default=0)
+    bloques = models.PositiveIntegerField(default=0)
+    procesados = models.PositiveIntegerField(default=0)
+    importados = models.PositiveIntegerField(default=0)
+    errores = models.PositiveIntegerField(default=0)
+    referencias_faltantes = models.JSONField(default=dict, blank=True)
+    fecha_actualizacion = models.DateTimeField(auto_now=True)
+    
+    def __str__(self):
+        return f"{self.modelo} ({self.procesados}/{self.total}) del trabajo #{self.trabajo_id}"
+    
+    class Meta:
+        verbose_name_plural = "Puntos de control de importación"
+        unique_together = ('trabajo', 'modelo')
+
+class Contador(models.Model):
+    """
+    Modelo con contadores compartidos entre procesos, por ejemplo la versión de los
+    resúmenes de puntajes en caché. Se incrementan con UPDATE ... SET valor = valor + n,
+    que es atómico, y no caducan como las claves de la caché.
+    """
+    nombre = models.CharField(max_length=100, unique=True)
+    valor = models.BigIntegerField(default=0)
+    
+    def __str__(self):
+        return f"{self.nombre}: {self.valor}"
+    
+    class Meta:
+        verbose_name_plural = "Contadores"
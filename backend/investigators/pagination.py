@@ -1,4 +1,4 @@
-from rest_framework.pagination import PageNumberPagination
+from rest_framework.pagination import PageNumberPagination, CursorPagination
 from rest_framework.response import Response
 
 def paginate(items, items_per_page, page_number):
@@ -79,3 +79,18 @@ class CustomPageNumberPagination(PageNumberPagination):
             'current_page': self.page.number,              # Número de la página actual
             'results': data                                # Datos de la página actual
         })
+
+class RankingCursorPagination(CursorPagination):
+    """
+    Paginación por cursor para recorrer el ranking de un área.
+    
+    A diferencia de la paginación por número de página, no cuenta el total de
+    filas ni usa OFFSET: cada página continúa desde la posición de la anterior,
+    aprovechando el índice (categoria, area, posicion_area) de RankingPuntaje.
+    
+    Ejemplo de uso en URL: /api/puntajes/stats_por_categoria/?categoria=total&area=3&cursor=...
+    """
+    page_size = 20
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+    ordering = ('posicion_area', 'investigador_id')
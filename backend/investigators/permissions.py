@@ -1,6 +1,6 @@
 from rest_framework import permissions
 from django.db.models import Q
-from investigators.models import DetEvento, DetArticulo
+from investigators.models import DetEvento, DetArticulo, Usuario
 
 class IsAdminOrReadOnly(permissions.BasePermission):
     """
@@ -18,6 +18,21 @@ class IsAdminOrReadOnly(permissions.BasePermission):
         # Para operaciones de escritura, verifica que sea un administrador
         return hasattr(request, 'usuario') and request.usuario and request.usuario.rol == 'admin'
 
+class IsAdminOrInitialRestore(permissions.BasePermission):
+    """
+    Permiso que solo permite el acceso a los administradores, con cualquier método.
+    
+    Mientras no exista ningún usuario (una instalación nueva) permite el acceso sin
+    autenticación, para restaurar un respaldo (incluidos los usuarios) en una instancia vacía.
+    Se usa en la importación de datos, que puede reemplazar cualquier registro.
+    """
+    def has_permission(self, request, view):
+        if hasattr(request, 'usuario') and request.usuario and request.usuario.rol == 'admin':
+            return True
+        
+        # Sin usuarios no hay administrador que pueda autenticarse todavía
+        return not Usuario.objects.exists()
+
 class IsInvestigadorOrReadOnly(permissions.BasePermission):
     """
     Permiso que permite lectura a cualquier usuario, pero solo los investigadores
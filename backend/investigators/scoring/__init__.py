@@ -0,0 +1,9 @@
+from .engine import CAMPOS_PUNTAJE, calcular_componentes, calcular_puntajes
+from .pending import puntajes_diferidos
+
+__all__ = [
+    'CAMPOS_PUNTAJE',
+    'calcular_componentes',
+    'calcular_puntajes',
+    'puntajes_diferidos',
+]
@@ -0,0 +1,85 @@
+from investigators.models import Investigador, PuntajeInvestigador
+from investigators.scoring.engine import CAMPOS_PUNTAJE, calcular_componentes, calcular_puntajes
+
+# Cantidad de investigadores revisados por lote
+CHUNK_SIZE = 1000
+
+# Campos comparados entre el puntaje guardado y el esperado
+CAMPOS_AUDITORIA = CAMPOS_PUNTAJE + ['puntos_totales']
+
+def _auditar_lote(investigador_ids, reporte, corregir, limite):
+    """
+    Compara los puntajes guardados de un lote de investigadores con los esperados
+    y, si se indica, recalcula solo los que no coinciden.
+    """
+    investigadores = Investigador.objects.filter(pk__in=investigador_ids)
+    esperados = calcular_componentes(investigadores)
+    guardados = {
+        fila.pop('investigador_id'): fila
+        for fila in PuntajeInvestigador.objects.filter(
+            investigador_id__in=investigador_ids
+        ).values('investigador_id', *CAMPOS_AUDITORIA)
+    }
+    activos = set(investigadores.filter(activo=True).values_list('pk', flat=True))
+
+    corregibles = []
+    for investigador_id in investigador_ids:
+        guardado = guardados.get(investigador_id)
+        if guardado is None:
+            # Solo los investigadores activos deben tener puntaje
+            if investigador_id not in activos:
+                continue
+            reporte['faltantes'] += 1
+            diferencia = {'investigador': investigador_id, 'faltante': True}
+        else:
+            esperado = esperados[investigador_id]
+            campos = {
+                campo: {'guardado': guardado[campo], 'esperado': esperado[campo]}
+                for campo in CAMPOS_AUDITORIA
+                if guardado[campo] != esperado[campo]
+            }
+            if not campos:
+                continue
+            reporte['discrepancias'] += 1
+            diferencia = {'investigador': investigador_id, 'campos': campos}
+
+        corregibles.append(investigador_id)
+        if len(reporte['detalle']) < limite:
+            reporte['detalle'].append(diferencia)
+
+    if corregir and corregibles:
+        reporte['corregidos'] += len(calcular_puntajes(Investigador.objects.filter(pk__in=corregibles)))
+
+def auditar_puntajes(chunk_size=CHUNK_SIZE, corregir=False, limite=100):
+    """
+    Compara los puntajes guardados con los que corresponden según las reglas vigentes.
+
+    Los investigadores se recorren con .iterator(chunk_size=...) y se evalúan por lotes
+    de chunk_size: en cada lote se calculan los componentes esperados en bloque y se
+    comparan con los guardados. La memoria usada depende de chunk_size y de limite,
+    no del tamaño de la tabla.
+
+    Parámetros:
+        chunk_size (int): Cantidad de investigadores por lote
+        corregir (bool): Recalcular los puntajes con diferencias o faltantes
+        limite (int): Cantidad máxima de diferencias detalladas en el reporte
+
+    Retorna un diccionario con la cantidad de investigadores revisados, puntajes con
+    diferencias, puntajes faltantes (investigadores activos sin puntaje), puntajes
+    corregidos y el detalle de las primeras diferencias.
+    """
+    reporte = {'revisados': 0, 'discrepancias': 0, 'faltantes': 0, 'corregidos': 0, 'detalle': []}
+
+    lote = []
+    ids = Investigador.objects.order_by('pk').values_list('pk', flat=True).iterator(chunk_size=chunk_size)
+    for investigador_id in ids:
+        lote.append(investigador_id)
+        if len(lote) == chunk_size:
+            _auditar_lote(lote, reporte, corregir, limite)
+            reporte['revisados'] += len(lote)
+            lote = []
+    if lote:
+        _auditar_lote(lote, reporte, corregir, limite)
+        reporte['revisados'] += len(lote)
+
+    return reporte
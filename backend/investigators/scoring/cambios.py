@@ -0,0 +1,219 @@
+import time
+from collections import defaultdict
+
+from django.apps import apps
+from django.conf import settings
+from django.db.models import Count, Max
+from django.utils import timezone
+
+from investigators.models import Investigador, ReglaPuntaje, VersionReglasPuntaje
+from investigators.scoring.rules import CATEGORIAS, REGLAS_PREDETERMINADAS, _separar_lookup
+
+# Resultados derivados de las reglas calculados en este proceso: {nombre: valor}.
+# Las señales de las reglas los descartan en el proceso que las modifica; para las
+# modificaciones de otros procesos se compara la marca de las reglas guardada en la
+# base de datos, como máximo cada PUNTAJES_REGLAS_VIGENCIA segundos
+_derivados = {}
+
+# Marca de las reglas con la que se calcularon los resultados derivados y momento
+# (time.monotonic) en que se comprobó por última vez; None obliga a comprobarla
+_marca = None
+_comprobado = None
+
+# Campos del investigador que afectan su puntaje (activo) o su ranking y resúmenes (area)
+CAMPOS_INVESTIGADOR = {'activo', 'area_id'}
+
+# Valor de un campo que no se cargó (por ejemplo con .only()); siempre cuenta como cambio
+_AUSENTE = object()
+
+def _condiciones():
+    """
+    Retorna las condiciones de las reglas predeterminadas y de todas las versiones,
+    como una lista de (categoria, condiciones).
+    """
+    condiciones = [
+        (categoria, condicion)
+        for categoria, reglas in REGLAS_PREDETERMINADAS.items()
+        for condicion, _ in reglas
+    ]
+    condiciones += list(ReglaPuntaje.objects.values_list('categoria', 'condiciones'))
+    return condiciones
+
+def _calcular_campos():
+    """
+    Obtiene los campos que alguna regla consulta, agrupados por modelo.
+
+    Se recorren las reglas predeterminadas y las de todas las versiones, de modo
+    que activar otra versión no cambia el resultado. Cada paso de una búsqueda
+    agrega su campo al modelo correspondiente: 'articulo__estado' en DetArticulo
+    agrega articulo_id a DetArticulo y estado a Articulo.
+    Retorna un diccionario {etiqueta del modelo: [attname, ...]}.
+    """
+    condiciones = _condiciones()
+
+    campos = defaultdict(set)
+    campos[Investigador._meta.label].update(CAMPOS_INVESTIGADOR)
+    for categoria, (Modelo, campo_investigador) in CATEGORIAS.items():
+        campos[Modelo._meta.label].add(campo_investigador)
+
+    for categoria, condicion in condiciones:
+        if categoria not in CATEGORIAS:
+            continue
+        for lookup in condicion or {}:
+            Modelo = CATEGORIAS[categoria][0]
+            ruta, _ = _separar_lookup(lookup)
+            for nombre in ruta:
+                campo = Modelo._meta.get_field(nombre)
+                campos[Modelo._meta.label].add(campo.attname)
+                if not campo.is_relation:
+                    break
+                Modelo = campo.related_model
+
+    return {modelo: sorted(nombres) for modelo, nombres in campos.items()}
+
+def marca_reglas():
+    """
+    Retorna la marca de las reglas guardadas: la cantidad de versiones y la fecha de la
+    última modificación de alguna. Cambia al crear o eliminar una versión y al guardar
+    o eliminar una de sus reglas (ver marcar_version_modificada).
+    """
+    fila = VersionReglasPuntaje.objects.aggregate(cantidad=Count('id'), ultima=Max('fecha_modificacion'))
+    return (fila['cantidad'], fila['ultima'])
+
+def marcar_version_modificada(version_id):
+    """
+    Actualiza la fecha de modificación de una versión; se llama al modificar una de sus reglas.
+    """
+    VersionReglasPuntaje.objects.filter(pk=version_id).update(fecha_modificacion=timezone.now())
+    invalidar_derivados()
+
+def invalidar_derivados():
+    """
+    Descarta los resultados derivados de las reglas calculados en este proceso.
+    """
+    global _comprobado
+    _derivados.clear()
+    _comprobado = None
+
+def _comprobar_marca():
+    """
+    Descarta los resultados derivados si la marca de las reglas cambió. La marca solo se
+    consulta si pasaron PUNTAJES_REGLAS_VIGENCIA segundos desde la última comprobación,
+    de modo que los guardados habituales no hacen ninguna consulta.
+    """
+    global _marca, _comprobado
+    ahora = time.monotonic()
+    if _comprobado is not None and ahora - _comprobado < settings.PUNTAJES_REGLAS_VIGENCIA:
+        return
+    marca = marca_reglas()
+    if marca != _marca:
+        _derivados.clear()
+        _marca = marca
+    _comprobado = ahora
+
+def _derivado(nombre, calcular):
+    """
+    Obtiene un resultado derivado de las reglas, calculándolo solo la primera vez en este
+    proceso o si las reglas cambiaron desde el último cálculo.
+    """
+    _comprobar_marca()
+    if nombre not in _derivados:
+        _derivados[nombre] = calcular()
+    return _derivados[nombre]
+
+def campos_relevantes():
+    """
+    Retorna los campos relevantes para el puntaje por modelo.
+    """
+    return _derivado('campos_relevantes', _calcular_campos)
+
+def tomar_instantanea(instance):
+    """
+    Guarda en la instancia los valores de sus campos tal como se cargaron o guardaron.
+    """
+    instance._valores_puntaje = {
+        campo.attname: instance.__dict__.get(campo.attname, _AUSENTE)
+        for campo in instance._meta.concrete_fields
+    }
+
+def cambio_relevante(instance):
+    """
+    Indica si cambió algún campo de la instancia que pueda afectar el puntaje.
+    Sin instantánea previa (por ejemplo una fila nueva) siempre se considera un cambio.
+    """
+    previos = getattr(instance, '_valores_puntaje', None)
+    if previos is None:
+        return True
+    for campo in campos_relevantes().get(instance._meta.label, ()):
+        previo = previos.get(campo, _AUSENTE)
+        if previo is _AUSENTE or previo != instance.__dict__.get(campo, _AUSENTE):
+            return True
+    return False
+
+def valor_previo(instance, campo):
+    """
+    Retorna el valor que tenía un campo al cargar o guardar la instancia por última vez,
+    o None si no se conoce. Permite marcar también al investigador anterior cuando una
+    fila cambia de investigador.
+    """
+    valor = getattr(instance, '_valores_puntaje', {}).get(campo)
+    return None if valor is _AUSENTE else valor
+
+def _calcular_rutas():
+    """
+    Obtiene, para cada modelo que alguna regla recorre, las rutas desde las filas
+    evaluadas hasta él: {etiqueta del modelo: [(etiqueta evaluada, campo del investigador, ruta)]}.
+    La ruta 'pk' indica que el modelo es el evaluado; 'evento__tipo_evento' que se llega
+    desde DetEvento a TipoEvento por esas relaciones.
+    """
+    rutas = defaultdict(set)
+    for categoria, (Evaluado, campo_investigador) in CATEGORIAS.items():
+        rutas[Evaluado._meta.label].add((Evaluado._meta.label, campo_investigador, 'pk'))
+    for categoria, condicion in _condiciones():
+        if categoria not in CATEGORIAS:
+            continue
+        Evaluado, campo_investigador = CATEGORIAS[categoria]
+        for lookup in condicion or {}:
+            ruta, _ = _separar_lookup(lookup)
+            Modelo = Evaluado
+            for i, nombre in enumerate(ruta):
+                campo = Modelo._meta.get_field(nombre)
+                if not campo.is_relation:
+                    break
+                Modelo = campo.related_model
+                rutas[Modelo._meta.label].add(
+                    (Evaluado._meta.label, campo_investigador, '__'.join(ruta[:i + 1]))
+                )
+    return {modelo: sorted(lista) for modelo, lista in rutas.items()}
+
+def rutas_afectadas():
+    """
+    Retorna las rutas de cada modelo hacia las filas evaluadas.
+    """
+    return _derivado('rutas_afectadas', _calcular_rutas)
+
+def investigadores_afectados(Modelo, pks):
+    """
+    Retorna los ids de los investigadores cuyo puntaje depende de las filas indicadas.
+
+    Las escrituras masivas (bulk_create, bulk_update) no disparan señales, así que quien
+    las hace marca con esto a los investigadores afectados. Se siguen las mismas rutas
+    que consultan las reglas: una fila evaluada afecta a su investigador, y una fila
+    relacionada (por ejemplo un Evento o un TipoEvento) a los investigadores de las
+    filas evaluadas que llegan a ella. Un investigador se afecta a sí mismo si está activo.
+    Para un cambio de investigador o de relación se debe llamar antes y después de escribir.
+    """
+    pks = list(pks)
+    if not pks:
+        return set()
+
+    afectados = set()
+    if Modelo is Investigador:
+        afectados.update(Investigador.objects.filter(pk__in=pks, activo=True).values_list('pk', flat=True))
+    for evaluado, campo_investigador, ruta in rutas_afectadas().get(Modelo._meta.label, ()):
+        Evaluado = apps.get_model(evaluado)
+        afectados.update(
+            Evaluado.objects.filter(**{f'{ruta}__in': pks}).values_list(campo_investigador, flat=True)
+        )
+    afectados.discard(None)
+    return afectados
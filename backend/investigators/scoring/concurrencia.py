@@ -0,0 +1,109 @@
+import threading
+
+from django.db import connection, transaction
+
+from investigators.models import Investigador
+from investigators.scoring.contador import incrementar, valores
+from investigators.scoring.engine import calcular_puntajes
+
+# Primera clave de los bloqueos consultivos de PostgreSQL (pg_advisory_xact_lock(clase, id)).
+# Separa los bloqueos de puntajes de otros bloqueos consultivos que use la base de datos
+CLASE_BLOQUEO = 7301
+
+# Contadores (modelo Contador) compartidos entre procesos
+CONTADORES = {
+    'ejecuciones': 'puntajes:recalculos:ejecuciones',
+    'absorbidos': 'puntajes:recalculos:absorbidos',
+    'esperas': 'puntajes:recalculos:esperas',
+}
+
+# Recálculos en curso en este proceso: {investigador_id: se pidió otro recálculo mientras corría}
+_en_curso = {}
+_candado = threading.Lock()
+
+def _contar(nombre, cantidad=1):
+    """
+    Incrementa un contador al confirmar la transacción en curso, para no bloquear la
+    fila del contador mientras dura un cálculo. Fuera de un bloque atómico se
+    incrementa de inmediato.
+    """
+    if not cantidad:
+        return
+    transaction.on_commit(lambda: incrementar(CONTADORES[nombre], cantidad))
+
+def contadores():
+    """
+    Retorna los contadores de recálculos individuales:
+    ejecuciones (cálculos realizados), absorbidos (pedidos que se resolvieron con un
+    cálculo ya en curso) y esperas (bloqueos de la base de datos que hubo que esperar).
+    """
+    guardados = valores(list(CONTADORES.values()))
+    return {nombre: guardados[clave] for nombre, clave in CONTADORES.items()}
+
+def _bloquear(investigador_ids):
+    """
+    Toma en PostgreSQL un bloqueo consultivo de transacción por investigador, en orden
+    de id para evitar interbloqueos. Se liberan solos al terminar la transacción.
+    Si otro proceso tiene el bloqueo se cuenta una espera y se espera a que lo libere.
+    En otras bases de datos no hace nada.
+    """
+    if connection.vendor != 'postgresql':
+        return
+    with connection.cursor() as cursor:
+        for investigador_id in sorted(investigador_ids):
+            cursor.execute('SELECT pg_try_advisory_xact_lock(%s, %s)', [CLASE_BLOQUEO, investigador_id])
+            if not cursor.fetchone()[0]:
+                _contar('esperas')
+                cursor.execute('SELECT pg_advisory_xact_lock(%s, %s)', [CLASE_BLOQUEO, investigador_id])
+
+def _calcular(investigador_ids):
+    with transaction.atomic():
+        _bloquear(investigador_ids)
+        calcular_puntajes(Investigador.objects.filter(pk__in=sorted(investigador_ids)))
+    _contar('ejecuciones', len(investigador_ids))
+
+def recalcular_investigadores(investigador_ids):
+    """
+    Recalcula el puntaje de algunos investigadores sin repetir cálculos concurrentes.
+
+    Dentro del proceso, si ya hay un recálculo en curso para un investigador el pedido
+    no se ejecuta: se marca y, al terminar, el recálculo en curso se repite una sola vez
+    para incluir los cambios que llegaron mientras corría. Así varios pedidos simultáneos
+    se resuelven con a lo sumo dos cálculos.
+
+    Entre procesos, en PostgreSQL, cada cálculo toma un bloqueo consultivo por
+    investigador durante su transacción, de modo que dos procesos no escriben el mismo
+    puntaje a la vez y el segundo calcula con los datos que confirmó el primero.
+
+    Retorna el conjunto de investigadores cuyo pedido fue absorbido por un cálculo en curso.
+    """
+    investigador_ids = {investigador_id for investigador_id in investigador_ids if investigador_id is not None}
+    propios = set()
+    with _candado:
+        for investigador_id in investigador_ids:
+            if investigador_id in _en_curso:
+                _en_curso[investigador_id] = True
+            else:
+                _en_curso[investigador_id] = False
+                propios.add(investigador_id)
+    absorbidos = investigador_ids - propios
+    _contar('absorbidos', len(absorbidos))
+
+    try:
+        while propios:
+            _calcular(propios)
+            with _candado:
+                repetir = {investigador_id for investigador_id in propios if _en_curso[investigador_id]}
+                for investigador_id in propios:
+                    if investigador_id in repetir:
+                        _en_curso[investigador_id] = False
+                    else:
+                        del _en_curso[investigador_id]
+            propios = repetir
+    finally:
+        # Si el cálculo falló se liberan los investigadores para que otro pedido los calcule
+        with _candado:
+            for investigador_id in propios:
+                _en_curso.pop(investigador_id, None)
+
+    return absorbidos
@@ -0,0 +1,94 @@
+import threading
+import weakref
+
+from django.db import transaction
+
+# Callbacks programados en la transacción en curso: {clave: weakref a _Callback}.
+# Es local a cada hilo porque cada hilo usa su propia conexión a la base de datos.
+_estado = threading.local()
+
+def _programados():
+    if not hasattr(_estado, 'callbacks'):
+        _estado.callbacks = {}
+    return _estado.callbacks
+
+class _Parte:
+    """
+    Datos acumulados para un _Callback en un mismo nivel de savepoint. Es lo que se
+    registra en on_commit, así que Django la descarta si ese savepoint se revierte.
+    """
+    def __init__(self, callback):
+        self.callback = callback
+        self.datos = set()
+
+    def __call__(self):
+        self.callback()
+
+class _Callback:
+    """
+    Función que se ejecuta una sola vez al confirmar la transacción con los datos de
+    todas sus partes que siguen vigentes.
+    """
+    def __init__(self, clave, funcion):
+        self.clave = clave
+        self.funcion = funcion
+        # {ids de los savepoints abiertos: weakref a _Parte}
+        self.partes = {}
+        self.ejecutado = False
+
+    def agregar(self, savepoints, datos):
+        """
+        Agrega datos a la parte del nivel de savepoint indicado. Una parte nueva se
+        registra en on_commit después de recibir los datos, porque fuera de un bloque
+        atómico se ejecuta de inmediato.
+        """
+        referencia = self.partes.get(savepoints)
+        parte = referencia() if referencia is not None else None
+        if parte is not None:
+            parte.datos.update(datos)
+            return
+        parte = _Parte(self)
+        parte.datos.update(datos)
+        self.partes[savepoints] = weakref.ref(parte)
+        transaction.on_commit(parte)
+
+    def __call__(self):
+        # La primera parte que se ejecuta reúne los datos; las demás no hacen nada
+        if self.ejecutado:
+            return
+        self.ejecutado = True
+        # Se desvincula antes de ejecutar: lo que se programe mientras corre
+        # (o en la transacción siguiente) registra un callback nuevo
+        programados = _programados()
+        referencia = programados.get(self.clave)
+        if referencia is not None and referencia() is self:
+            del programados[self.clave]
+        datos = set()
+        for referencia in self.partes.values():
+            parte = referencia()
+            if parte is not None:
+                datos |= parte.datos
+        self.funcion(datos)
+
+def al_confirmar(clave, funcion, datos=()):
+    """
+    Programa funcion(datos) para cuando se confirme la transacción en curso, una sola
+    vez por transacción aunque se llame muchas veces con la misma clave. Los datos de
+    todas las llamadas se acumulan en un único conjunto que recibe la función.
+    Fuera de un bloque atómico la función se ejecuta de inmediato.
+
+    Los datos se guardan por nivel de savepoint, en una parte registrada en on_commit.
+    Solo se guardan referencias débiles: las referencias fuertes las tiene la lista de
+    on_commit de Django. Si un savepoint se revierte, Django descarta sus partes y los
+    datos que se agregaron dentro de él se pierden con ellas; si se revierte la
+    transacción (o el savepoint donde se programó el callback) el callback completo
+    queda sin referencias y la siguiente llamada registra uno nuevo.
+    """
+    conexion = transaction.get_connection()
+    programados = _programados()
+    referencia = programados.get(clave)
+    callback = referencia() if referencia is not None else None
+    if callback is None or not conexion.in_atomic_block:
+        callback = _Callback(clave, funcion)
+        programados[clave] = weakref.ref(callback)
+    callback.agregar(tuple(conexion.savepoint_ids), datos)
@@ -0,0 +1,28 @@
+from django.db import IntegrityError, transaction
+from django.db.models import F
+
+from investigators.models import Contador
+
+def incrementar(nombre, cantidad=1):
+    """
+    Incrementa un contador con una sola sentencia UPDATE, de modo que los incrementos
+    concurrentes de varios procesos no se pierden. Si el contador no existe se crea;
+    si otro proceso lo crea al mismo tiempo, se incrementa el suyo.
+
+    El UPDATE bloquea la fila hasta el final de la transacción: se debe llamar fuera
+    de transacciones largas (por ejemplo desde transaction.on_commit).
+    """
+    if Contador.objects.filter(nombre=nombre).update(valor=F('valor') + cantidad):
+        return
+    try:
+        with transaction.atomic():
+            Contador.objects.create(nombre=nombre, valor=cantidad)
+    except IntegrityError:
+        Contador.objects.filter(nombre=nombre).update(valor=F('valor') + cantidad)
+
+def valores(nombres):
+    """
+    Retorna {nombre: valor} de los contadores indicados; los que no existen valen 0.
+    """
+    guardados = dict(Contador.objects.filter(nombre__in=nombres).values_list('nombre', 'valor'))
+    return {nombre: guardados.get(nombre, 0) for nombre in nombres}
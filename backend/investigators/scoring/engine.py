@@ -0,0 +1,131 @@
+from django.db import transaction
+from django.db.models import Sum
+from django.utils import timezone
+
+from investigators.models import PuntajeInvestigador
+from investigators.scoring.history import registrar_historial
+from investigators.scoring.ranking import programar_actualizacion
+from investigators.scoring.resumen import programar_invalidacion
+from investigators.scoring.rules import CATEGORIAS, cargar_reglas, compilar_case
+
+# Columnas de PuntajeInvestigador que componen el puntaje total
+CAMPOS_PUNTAJE = list(CATEGORIAS)
+
+# Cantidad de filas por sentencia en bulk_create / bulk_update
+BATCH_SIZE = 500
+
+def _consultas_componentes(investigadores, reglas):
+    """
+    Construye una consulta agregada por modelo evaluado, agrupada por investigador.
+    Cada categoría es una columna Sum(Case(...)) compilada a partir de sus reglas,
+    de modo que la base de datos calcula los puntos en una sola pasada.
+    """
+    por_modelo = {}
+    for categoria, (Modelo, campo_investigador) in CATEGORIAS.items():
+        por_modelo.setdefault((Modelo, campo_investigador), []).append(categoria)
+
+    for (Modelo, campo_investigador), categorias in por_modelo.items():
+        yield campo_investigador, Modelo.objects.filter(
+            **{f'{campo_investigador}__in': investigadores.values('pk')}
+        ).values(campo_investigador).annotate(**{
+            categoria: Sum(compilar_case(reglas[categoria]))
+            for categoria in categorias
+        }).order_by()
+
+def calcular_componentes(investigadores, reglas=None):
+    """
+    Calcula los componentes del puntaje de varios investigadores en bloque.
+
+    Ejecuta una consulta agregada por modelo relacionado (agrupada por investigador)
+    en lugar de recorrer las filas relacionadas de cada investigador en Python.
+
+    Parámetros:
+        investigadores (QuerySet): Investigadores a evaluar
+        reglas (dict): Reglas por categoría; por defecto las de la versión activa
+
+    Retorna un diccionario {investigador_id: {campo: puntos}} que incluye
+    'puntos_totales' y contiene a todos los investigadores del QuerySet,
+    aunque no tengan aportaciones.
+    """
+    if reglas is None:
+        reglas = cargar_reglas()
+
+    componentes = {
+        investigador_id: dict.fromkeys(CAMPOS_PUNTAJE, 0)
+        for investigador_id in investigadores.values_list('pk', flat=True)
+    }
+
+    for campo_investigador, consulta in _consultas_componentes(investigadores, reglas):
+        for fila in consulta:
+            puntos = componentes.get(fila.pop(campo_investigador))
+            if puntos is None:
+                continue
+            for campo, valor in fila.items():
+                puntos[campo] = valor or 0
+
+    for puntos in componentes.values():
+        puntos['puntos_totales'] = sum(puntos[campo] for campo in CAMPOS_PUNTAJE)
+
+    return componentes
+
+@transaction.atomic
+def calcular_puntajes(investigadores, batch_size=BATCH_SIZE):
+    """
+    Calcula y guarda en bloque los puntajes de los investigadores indicados.
+
+    Los componentes se obtienen con calcular_componentes y se escriben con
+    bulk_create (puntajes nuevos) y bulk_update (puntajes existentes) en lotes
+    de batch_size filas. Los puntajes nuevos o que cambiaron se agregan al historial
+    y, si hubo alguno, el ranking de los investigadores y categorías que cambiaron y
+    los resúmenes en caché se actualizan al confirmar la transacción.
+
+    Parámetros:
+        investigadores (QuerySet): Investigadores cuyo puntaje se recalcula
+        batch_size (int): Cantidad de filas por sentencia de escritura
+
+    Retorna la lista de objetos PuntajeInvestigador guardados.
+    """
+    componentes = calcular_componentes(investigadores)
+    existentes = {
+        fila.pop('investigador_id'): fila
+        for fila in PuntajeInvestigador.objects.filter(
+            investigador_id__in=investigadores.values('pk')
+        ).values('investigador_id', 'pk', 'puntos_totales', *CAMPOS_PUNTAJE)
+    }
+    ahora = timezone.now()
+
+    nuevos = []
+    actualizados = []
+    cambios = []
+    categorias = set()
+    for investigador_id, puntos in componentes.items():
+        existente = existentes.get(investigador_id)
+        puntaje = PuntajeInvestigador(
+            pk=existente.pop('pk') if existente else None,
+            investigador_id=investigador_id,
+            ultima_actualizacion=ahora,
+            **puntos
+        )
+        if puntaje.pk is None:
+            nuevos.append(puntaje)
+        else:
+            actualizados.append(puntaje)
+        if existente != puntos:
+            cambios.append(dict(puntos, investigador_id=investigador_id))
+            categorias.update(campo for campo, valor in puntos.items() if not existente or existente[campo] != valor)
+
+    if nuevos:
+        PuntajeInvestigador.objects.bulk_create(nuevos, batch_size=batch_size)
+    if actualizados:
+        # bulk_update no aplica auto_now, por eso se incluye ultima_actualizacion
+        PuntajeInvestigador.objects.bulk_update(
+            actualizados,
+            CAMPOS_PUNTAJE + ['puntos_totales', 'ultima_actualizacion'],
+            batch_size=batch_size
+        )
+    registrar_historial(cambios, batch_size=batch_size)
+    if cambios:
+        programar_actualizacion(categorias, [cambio['investigador_id'] for cambio in cambios])
+        programar_invalidacion()
+
+    return nuevos + actualizados
@@ -0,0 +1,67 @@
+from investigators.models import Estudiante, DetLinea, Proyecto, DetArticulo, DetEvento
+from investigators.scoring.engine import CAMPOS_PUNTAJE
+from investigators.scoring.rules import CATEGORIAS, cargar_reglas, compilar_indice
+
+# Modelo evaluado: (relaciones cargadas con select_related, datos que describen cada fila)
+DETALLES = {
+    Estudiante: (['tipo_estudiante'], lambda e: {
+        'estudiante': e.nombre, 'tipo_estudiante': e.tipo_estudiante.nombre,
+        'estatus': e.estatus, 'activo': e.activo,
+    }),
+    DetLinea: (['linea'], lambda d: {
+        'linea': d.linea.nombre, 'reconocimiento_institucional': d.linea.reconocimiento_institucional,
+    }),
+    Proyecto: ([], lambda p: {
+        'proyecto': p.nombre, 'estado': p.estado,
+    }),
+    DetArticulo: (['articulo'], lambda d: {
+        'articulo': d.articulo.nombre_articulo, 'estado': d.articulo.estado, 'orden_autor': d.orden_autor,
+    }),
+    DetEvento: (['evento__tipo_evento', 'rol_evento'], lambda d: {
+        'evento': d.evento.nombre_evento, 'tipo_evento': d.evento.tipo_evento.nombre, 'rol': d.rol_evento.nombre,
+    }),
+}
+
+def explicar_puntaje(investigador_id, reglas=None):
+    """
+    Detalla cada fila que aporta puntos al investigador y la regla que la evalúa.
+
+    Se ejecuta una consulta por modelo evaluado (las dos categorías de estudiantes
+    comparten la suya), con select_related para las relaciones que se muestran y una
+    anotación Case/When por categoría con el índice de la primera regla que cumple la
+    fila, igual que en el cálculo en bloque. Las filas que no cumplen ninguna regla de
+    una categoría no aparecen en ella.
+
+    Retorna un diccionario {categoria: {'puntos', 'aportaciones'}} con una entrada por
+    categoría y 'puntos_totales' con la suma de todas.
+    """
+    if reglas is None:
+        reglas = cargar_reglas()
+
+    por_modelo = {}
+    for categoria, (Modelo, campo_investigador) in CATEGORIAS.items():
+        por_modelo.setdefault((Modelo, campo_investigador), []).append(categoria)
+
+    explicacion = {categoria: {'puntos': 0, 'aportaciones': []} for categoria in CAMPOS_PUNTAJE}
+    for (Modelo, campo_investigador), categorias in por_modelo.items():
+        relaciones, describir = DETALLES[Modelo]
+        filas = Modelo.objects.filter(**{campo_investigador: investigador_id}).select_related(
+            *relaciones
+        ).annotate(**{
+            f'regla_{categoria}': compilar_indice(reglas[categoria]) for categoria in categorias
+        }).order_by('pk')
+
+        for fila in filas:
+            detalle = describir(fila)
+            for categoria in categorias:
+                indice = getattr(fila, f'regla_{categoria}')
+                if indice < 0:
+                    continue
+                condiciones, puntos = reglas[categoria][indice]
+                explicacion[categoria]['puntos'] += puntos
+                explicacion[categoria]['aportaciones'].append(dict(
+                    detalle, id=fila.pk, regla=indice, condiciones=condiciones, puntos=puntos
+                ))
+
+    explicacion['puntos_totales'] = sum(explicacion[categoria]['puntos'] for categoria in CAMPOS_PUNTAJE)
+    return explicacion
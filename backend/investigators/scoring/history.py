@@ -0,0 +1,93 @@
+from django.conf import settings
+from django.db.models import Max
+from django.db.models.functions import TruncMonth
+from django.utils import timezone
+
+from investigators.models import HistorialPuntaje
+from investigators.scoring.rules import CATEGORIAS
+
+# Columnas copiadas del puntaje al historial
+CAMPOS_HISTORIAL = list(CATEGORIAS) + ['puntos_totales']
+
+# Cantidad de filas por sentencia INSERT del historial
+BATCH_SIZE = 500
+
+def registrar_historial(puntajes, batch_size=BATCH_SIZE):
+    """
+    Agrega al historial una fila por cada puntaje recibido.
+
+    Parámetros:
+        puntajes (list): Diccionarios con 'investigador_id' y las columnas de CAMPOS_HISTORIAL
+        batch_size (int): Cantidad de filas por sentencia INSERT
+
+    Las filas se insertan con bulk_create, así un recálculo en bloque produce
+    inserciones de varias filas en lugar de una por investigador. Con
+    PUNTAJES_HISTORIAL = 'dia' se reemplaza la fila del día en curso.
+    """
+    if not puntajes:
+        return
+
+    ahora = timezone.now()
+    registros = [
+        HistorialPuntaje(
+            investigador_id=puntaje['investigador_id'],
+            fecha=ahora,
+            **{campo: puntaje[campo] for campo in CAMPOS_HISTORIAL}
+        )
+        for puntaje in puntajes
+    ]
+
+    if settings.PUNTAJES_HISTORIAL == 'dia':
+        inicio_dia = timezone.localtime(ahora).replace(hour=0, minute=0, second=0, microsecond=0)
+        for inicio in range(0, len(registros), batch_size):
+            HistorialPuntaje.objects.filter(
+                investigador_id__in=[r.investigador_id for r in registros[inicio:inicio + batch_size]],
+                fecha__gte=inicio_dia,
+                mensual=False
+            ).delete()
+
+    HistorialPuntaje.objects.bulk_create(registros, batch_size=batch_size)
+
+def compactar_historial(antes_de):
+    """
+    Resume en una fila por investigador y mes el historial anterior a antes_de.
+
+    Se conserva la última fila de cada mes (la de id mayor, porque la tabla es de solo
+    inserción), se marca como mensual y se eliminan las demás filas de ese mes.
+    Retorna la cantidad de filas eliminadas.
+    """
+    detalle = HistorialPuntaje.objects.filter(fecha__lt=antes_de, mensual=False)
+    ultimas = detalle.annotate(mes=TruncMonth('fecha')).values(
+        'investigador_id', 'mes'
+    ).annotate(ultima=Max('id')).values('ultima').order_by()
+
+    HistorialPuntaje.objects.filter(id__in=ultimas).update(mensual=True)
+    eliminadas, _ = HistorialPuntaje.objects.filter(fecha__lt=antes_de, mensual=False).delete()
+    return eliminadas
+
+def serie_historial(investigador_id, max_puntos=100, desde=None, hasta=None):
+    """
+    Obtiene la evolución del puntaje de un investigador reducida a lo sumo a max_puntos.
+
+    El intervalo de fechas se divide en max_puntos tramos iguales y de cada tramo
+    se toma la última fila, que es el puntaje vigente al final del tramo.
+    Se incluyen las filas con desde <= fecha < hasta.
+    Retorna una lista de diccionarios ordenados por fecha.
+    """
+    filas = HistorialPuntaje.objects.filter(investigador_id=investigador_id)
+    if desde:
+        filas = filas.filter(fecha__gte=desde)
+    if hasta:
+        filas = filas.filter(fecha__lt=hasta)
+    filas = list(filas.order_by('fecha', 'id').values('fecha', *CAMPOS_HISTORIAL))
+
+    if len(filas) <= max_puntos:
+        return filas
+
+    inicio = filas[0]['fecha']
+    duracion = (filas[-1]['fecha'] - inicio).total_seconds() or 1
+    tramos = {}
+    for fila in filas:
+        tramo = min(int((fila['fecha'] - inicio).total_seconds() * max_puntos / duracion), max_puntos - 1)
+        tramos[tramo] = fila
+    return [tramos[tramo] for tramo in sorted(tramos)]
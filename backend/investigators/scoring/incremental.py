@@ -0,0 +1,169 @@
+from collections import defaultdict
+
+from django.db.models import F
+from django.utils import timezone
+
+from investigators.models import (
+    Investigador, PuntajeInvestigador, DetLinea, Linea,
+    Articulo, DetArticulo, Evento, DetEvento
+)
+from investigators.scoring.engine import CAMPOS_PUNTAJE, calcular_puntajes
+from investigators.scoring.history import registrar_historial
+from investigators.scoring.ranking import programar_actualizacion
+from investigators.scoring.resumen import programar_invalidacion
+from investigators.scoring.rules import CATEGORIAS, cargar_reglas, evaluar, relaciones_para
+
+# Modelo padre: (modelo hijo evaluado por las reglas, campo del hijo que apunta al padre)
+PADRES = {
+    Linea: (DetLinea, 'linea'),
+    Articulo: (DetArticulo, 'articulo'),
+    Evento: (DetEvento, 'evento'),
+}
+
+def aportacion(instance, reglas):
+    """
+    Calcula la aportación de una fila a cada categoría según las reglas.
+    Retorna un diccionario {investigador_id: {campo: puntos}}.
+    """
+    resultado = defaultdict(dict)
+    for categoria, (Modelo, campo_investigador) in CATEGORIAS.items():
+        if isinstance(instance, Modelo):
+            investigador_id = getattr(instance, campo_investigador)
+            resultado[investigador_id][categoria] = evaluar(reglas[categoria], instance)
+    return resultado
+
+def _relaciones_previas(Modelo, reglas):
+    """
+    Relaciones a cargar junto con la versión anterior de una fila. Para un modelo padre
+    son las relaciones que las reglas de su modelo hijo recorren a través de él.
+    """
+    if Modelo in PADRES:
+        Hijo, campo_padre = PADRES[Modelo]
+        prefijo = campo_padre + '__'
+        return [
+            relacion[len(prefijo):]
+            for relacion in relaciones_para(Hijo, reglas)
+            if relacion.startswith(prefijo)
+        ]
+    return relaciones_para(Modelo, reglas)
+
+def guardar_estado_previo(instance):
+    """
+    Guarda en la instancia la versión almacenada en la base de datos antes de actualizarla.
+    Se llama desde pre_save; para filas nuevas el estado previo es None.
+    """
+    instance._puntaje_previo = None
+    if instance._state.adding or instance.pk is None:
+        return
+    relaciones = _relaciones_previas(type(instance), cargar_reglas())
+    instance._puntaje_previo = type(instance).objects.select_related(
+        *relaciones
+    ).filter(pk=instance.pk).first()
+
+def _acumular(deltas, aportacion, signo):
+    """
+    Suma (signo=1) o resta (signo=-1) una aportación al diccionario de diferencias.
+    """
+    for investigador_id, campos in aportacion.items():
+        if investigador_id is None:
+            continue
+        for campo, puntos in campos.items():
+            deltas[investigador_id][campo] += signo * puntos
+
+def _nuevos_deltas():
+    return defaultdict(lambda: defaultdict(int))
+
+def aplicar_deltas(deltas):
+    """
+    Suma las diferencias de puntos a los puntajes almacenados con expresiones F().
+
+    Parámetros:
+        deltas (dict): {investigador_id: {campo: diferencia}}
+
+    Los investigadores con la misma diferencia se actualizan juntos en una sola
+    sentencia UPDATE atómica que también ajusta puntos_totales. Los investigadores
+    que todavía no tienen puntaje se calculan completos para crear su registro.
+    Los puntajes resultantes se agregan al historial y se programa la actualización
+    del ranking y de los resúmenes en caché.
+    """
+    grupos = defaultdict(list)
+    for investigador_id, campos in deltas.items():
+        campos = tuple(sorted((campo, delta) for campo, delta in campos.items() if delta))
+        if campos:
+            grupos[campos].append(investigador_id)
+
+    ahora = timezone.now()
+    for campos, investigador_ids in grupos.items():
+        PuntajeInvestigador.objects.filter(investigador_id__in=investigador_ids).update(
+            puntos_totales=F('puntos_totales') + sum(delta for _, delta in campos),
+            ultima_actualizacion=ahora,
+            **{campo: F(campo) + delta for campo, delta in campos}
+        )
+
+    if grupos:
+        investigador_ids = [i for ids in grupos.values() for i in ids]
+        registrar_historial(list(
+            PuntajeInvestigador.objects.filter(investigador_id__in=investigador_ids).values(
+                'investigador_id', 'puntos_totales', *CAMPOS_PUNTAJE
+            )
+        ))
+        programar_actualizacion(
+            {'puntos_totales'} | {campo for campos in grupos for campo, _ in campos}, investigador_ids
+        )
+        programar_invalidacion()
+        faltantes = Investigador.objects.filter(pk__in=investigador_ids, puntaje__isnull=True)
+        if faltantes.exists():
+            calcular_puntajes(faltantes)
+
+def registrar_guardado(instance):
+    """
+    Aplica la diferencia entre la aportación anterior y la nueva de una fila guardada.
+    Si la fila cambió de investigador, se resta al anterior y se suma al nuevo.
+    """
+    reglas = cargar_reglas()
+    deltas = _nuevos_deltas()
+
+    previo = getattr(instance, '_puntaje_previo', None)
+    if previo is not None:
+        _acumular(deltas, aportacion(previo, reglas), -1)
+    _acumular(deltas, aportacion(instance, reglas), 1)
+
+    aplicar_deltas(deltas)
+
+def registrar_eliminacion(instance):
+    """
+    Resta la aportación de una fila eliminada al puntaje de su investigador.
+    """
+    deltas = _nuevos_deltas()
+    _acumular(deltas, aportacion(instance, cargar_reglas()), -1)
+    aplicar_deltas(deltas)
+
+def registrar_cambio_padre(instance):
+    """
+    Ajusta a los investigadores relacionados cuando cambia una línea, un artículo o un evento.
+
+    Cada fila hija (DetLinea, DetArticulo, DetEvento) se evalúa con la versión anterior y
+    con la nueva del padre; los investigadores con la misma diferencia se actualizan juntos.
+    """
+    previo = getattr(instance, '_puntaje_previo', None)
+    if previo is None:
+        return
+
+    reglas = cargar_reglas()
+    Hijo, campo_padre = PADRES[type(instance)]
+    deltas = _nuevos_deltas()
+    for hijo in Hijo.objects.filter(**{campo_padre: instance}).select_related(*relaciones_para(Hijo, reglas)):
+        setattr(hijo, campo_padre, previo)
+        _acumular(deltas, aportacion(hijo, reglas), -1)
+        setattr(hijo, campo_padre, instance)
+        _acumular(deltas, aportacion(hijo, reglas), 1)
+
+    aplicar_deltas(deltas)
+
+def asegurar_puntaje(investigador):
+    """
+    Crea el puntaje de un investigador activo que todavía no tiene uno.
+    Los cambios en los datos propios del investigador no alteran su puntaje.
+    """
+    if investigador.activo and not PuntajeInvestigador.objects.filter(investigador=investigador).exists():
+        calcular_puntajes(Investigador.objects.filter(pk=investigador.pk))
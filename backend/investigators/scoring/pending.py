@@ -0,0 +1,82 @@
+import threading
+from contextlib import contextmanager
+
+from investigators.scoring.concurrencia import recalcular_investigadores
+from investigators.scoring.confirmacion import al_confirmar
+from investigators.scoring.engine import BATCH_SIZE
+
+# Investigadores registrados dentro de puntajes_diferidos(). Es local a cada hilo
+# porque cada hilo usa su propia conexión a la base de datos.
+_estado = threading.local()
+
+def _diferidos():
+    if not hasattr(_estado, 'diferidos'):
+        _estado.diferidos = set()
+        _estado.niveles_diferidos = 0
+    return _estado.diferidos
+
+def diferido():
+    """
+    Indica si el hilo actual está dentro de un bloque puntajes_diferidos().
+    """
+    return getattr(_estado, 'niveles_diferidos', 0) > 0
+
+@contextmanager
+def puntajes_diferidos():
+    """
+    Difiere el cálculo de puntajes durante operaciones masivas.
+
+    Dentro del bloque las señales no calculan nada (ni en modo incremental): solo
+    registran los investigadores afectados. Al salir del bloque más externo esos
+    investigadores se recalculan en bloque una sola vez, al confirmar la transacción
+    en curso o de inmediato fuera de un bloque atómico.
+
+    Si el bloque termina con una excepción los investigadores también se marcan: si
+    la transacción se revierte, el recálculo se descarta con ella; si los cambios ya
+    se escribieron (fuera de un bloque atómico o porque la excepción se captura sin
+    revertir) sus puntajes se recalculan igual.
+
+    Se usa como administrador de contexto (with puntajes_diferidos(): ...) o como
+    decorador (@puntajes_diferidos()).
+    """
+    diferidos = _diferidos()
+    _estado.niveles_diferidos += 1
+    try:
+        yield
+    finally:
+        _estado.niveles_diferidos -= 1
+        if not _estado.niveles_diferidos:
+            investigador_ids = set(diferidos)
+            diferidos.clear()
+            marcar_pendientes(investigador_ids)
+
+def marcar_pendientes(investigador_ids):
+    """
+    Marca investigadores para recalcular su puntaje cuando termine la transacción.
+
+    Todas las señales de una misma transacción comparten el conjunto de pendientes
+    y un único callback de transaction.on_commit (ver al_confirmar), de modo que cada
+    investigador se recalcula una sola vez aunque se hayan guardado muchas filas
+    relacionadas. Si la transacción se revierte, los pendientes se descartan con el
+    callback. Fuera de un bloque atómico el cálculo se ejecuta de inmediato. Dentro de
+    puntajes_diferidos() solo se registran hasta que termina el bloque.
+    """
+    investigador_ids = {investigador_id for investigador_id in investigador_ids if investigador_id is not None}
+    if not investigador_ids:
+        return
+    if diferido():
+        _diferidos().update(investigador_ids)
+        return
+    al_confirmar('puntajes:pendientes', recalcular_pendientes, investigador_ids)
+
+def recalcular_pendientes(pendientes):
+    """
+    Recalcula en bloque el puntaje de los investigadores pendientes de una transacción.
+    Los investigadores eliminados en la misma transacción (por ejemplo en una eliminación
+    en cascada) ya no existen y la consulta los omite. Un investigador que otro hilo ya
+    está recalculando no se calcula dos veces (ver recalcular_investigadores).
+    """
+    investigador_ids = sorted(pendientes)
+
+    for inicio in range(0, len(investigador_ids), BATCH_SIZE):
+        recalcular_investigadores(investigador_ids[inicio:inicio + BATCH_SIZE])
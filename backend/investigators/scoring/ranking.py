@@ -0,0 +1,316 @@
+import threading
+from collections import defaultdict
+from contextlib import contextmanager
+
+from django.db import connection, transaction
+from django.db.models import Count, F, Q, Window
+from django.db.models.functions import Rank
+
+from investigators.models import PuntajeInvestigador, RankingPuntaje
+from investigators.scoring.confirmacion import al_confirmar
+from investigators.scoring.rules import CATEGORIAS
+
+# Columnas de PuntajeInvestigador que tienen ranking propio
+CAMPOS_RANKING = list(CATEGORIAS) + ['puntos_totales']
+
+# Cantidad de filas por sentencia en bulk_create / bulk_update
+BATCH_SIZE = 500
+
+# Primera clave de los bloqueos consultivos de PostgreSQL (pg_advisory_xact_lock(clase, id))
+# que serializan entre procesos las actualizaciones del ranking; hay uno por categoría
+CLASE_BLOQUEO = 7302
+
+# Con más investigadores que estos por categoría, una actualización programada recalcula
+# todas las posiciones de la categoría en lugar de desplazarlas investigador por investigador
+LIMITE_INCREMENTAL = 100
+
+# Actualizaciones diferidas con ranking_diferido(), por hilo
+_estado = threading.local()
+
+def _posiciones(categorias):
+    """
+    Calcula en la base de datos la posición de cada puntaje en las categorías indicadas,
+    dentro del área del investigador y global, con funciones de ventana RANK().
+    Retorna un diccionario {(investigador_id, categoria): (area_id, puntos, posicion_area, posicion_global)}.
+    """
+    ventanas = {}
+    for campo in categorias:
+        ventanas[f'area_{campo}'] = Window(
+            Rank(), partition_by=[F('investigador__area_id')], order_by=F(campo).desc()
+        )
+        ventanas[f'global_{campo}'] = Window(Rank(), order_by=F(campo).desc())
+
+    posiciones = {}
+    filas = PuntajeInvestigador.objects.annotate(
+        area_id=F('investigador__area_id'), **ventanas
+    ).values('investigador_id', 'area_id', *categorias, *ventanas)
+    for fila in filas:
+        for campo in categorias:
+            posiciones[(fila['investigador_id'], campo)] = (
+                fila['area_id'], fila[campo], fila[f'area_{campo}'], fila[f'global_{campo}']
+            )
+    return posiciones
+
+def _bloquear(categorias):
+    """
+    Toma en PostgreSQL el bloqueo consultivo de cada categoría hasta el final de la
+    transacción, en el orden de CAMPOS_RANKING para evitar interbloqueos, de modo que dos
+    procesos no calculen y escriban posiciones de la misma categoría a la vez. En otras
+    bases de datos no hace nada.
+    """
+    if connection.vendor != 'postgresql':
+        return
+    with connection.cursor() as cursor:
+        for indice, campo in enumerate(CAMPOS_RANKING):
+            if campo in categorias:
+                cursor.execute('SELECT pg_advisory_xact_lock(%s, %s)', [CLASE_BLOQUEO, indice])
+
+def _escribir(rankings, existentes, batch_size):
+    """
+    Escribe las filas nuevas y las que cambiaron. Si la base de datos admite
+    INSERT ... ON CONFLICT (investigador_id, categoria) DO UPDATE se hace todo con
+    bulk_create(update_conflicts=True); si no, con bulk_create para las nuevas y
+    bulk_update para las existentes (existentes: {(investigador_id, categoria): pk}).
+    """
+    campos = ['area', 'puntos', 'posicion_area', 'posicion_global']
+    if connection.features.supports_update_conflicts_with_target:
+        RankingPuntaje.objects.bulk_create(
+            rankings, batch_size=batch_size, update_conflicts=True,
+            unique_fields=['investigador', 'categoria'], update_fields=campos
+        )
+        return
+    nuevos = []
+    actualizados = []
+    for ranking in rankings:
+        ranking.pk = existentes.get((ranking.investigador_id, ranking.categoria))
+        (nuevos if ranking.pk is None else actualizados).append(ranking)
+    if nuevos:
+        RankingPuntaje.objects.bulk_create(nuevos, batch_size=batch_size)
+    if actualizados:
+        RankingPuntaje.objects.bulk_update(actualizados, campos, batch_size=batch_size)
+
+def _recalcular(categorias, batch_size):
+    """
+    Recalcula todas las posiciones de las categorías indicadas (ver actualizar_ranking).
+    """
+    posiciones = _posiciones(categorias)
+
+    existentes = {}
+    cambiados = []
+    eliminados = []
+    for pk, investigador_id, categoria, *guardados in RankingPuntaje.objects.filter(
+        categoria__in=categorias
+    ).values_list('pk', 'investigador_id', 'categoria', 'area_id', 'puntos', 'posicion_area', 'posicion_global'):
+        clave = (investigador_id, categoria)
+        valores = posiciones.pop(clave, None)
+        if valores is None:
+            eliminados.append(pk)
+            continue
+        existentes[clave] = pk
+        if valores != tuple(guardados):
+            cambiados.append((clave, valores))
+    cambiados.extend(posiciones.items())
+
+    rankings = [
+        RankingPuntaje(
+            investigador_id=investigador_id,
+            categoria=categoria,
+            area_id=area_id,
+            puntos=puntos,
+            posicion_area=posicion_area,
+            posicion_global=posicion_global
+        )
+        for (investigador_id, categoria), (area_id, puntos, posicion_area, posicion_global) in cambiados
+    ]
+
+    for inicio in range(0, len(eliminados), batch_size):
+        RankingPuntaje.objects.filter(pk__in=eliminados[inicio:inicio + batch_size]).delete()
+    if rankings:
+        _escribir(rankings, existentes, batch_size)
+
+    return len(rankings) + len(eliminados)
+
+@transaction.atomic
+def actualizar_ranking(categorias=None, batch_size=BATCH_SIZE):
+    """
+    Sincroniza RankingPuntaje con los puntajes actuales en las categorías indicadas
+    (todas si es None).
+
+    Las posiciones de esas categorías se calculan en una sola consulta sobre toda la
+    tabla y solo se escriben las filas cuya área, puntos o posición cambiaron; se
+    eliminan las de investigadores que ya no tienen puntaje. Se usa en los recálculos
+    masivos; los cambios de pocos investigadores se aplican con actualizar_posiciones.
+    La actualización toma los bloqueos consultivos de sus categorías y escribe con un
+    upsert, así que varios procesos pueden actualizar el ranking a la vez sin chocar
+    con la restricción única. Retorna la cantidad de filas escritas.
+    """
+    categorias = [campo for campo in CAMPOS_RANKING if categorias is None or campo in categorias]
+    if not categorias:
+        return 0
+    _bloquear(categorias)
+    return _recalcular(categorias, batch_size)
+
+def _banda(filas, campo, anterior, nuevo):
+    """
+    Ajusta la posición (campo) de las filas que un investigador deja atrás o que lo dejan
+    atrás cuando sus puntos pasan de anterior a nuevo, y retorna cuánto cambia su propia
+    posición. Con RANK() la posición es 1 + la cantidad de puntos mayores, así que solo
+    cambian las filas con puntos entre ambos valores.
+    """
+    if nuevo > anterior:
+        filas.filter(puntos__gte=anterior, puntos__lt=nuevo).update(**{campo: F(campo) + 1})
+        return -filas.filter(puntos__gt=anterior, puntos__lte=nuevo).count()
+    filas.filter(puntos__gte=nuevo, puntos__lt=anterior).update(**{campo: F(campo) - 1})
+    return filas.filter(puntos__gt=nuevo, puntos__lte=anterior).count()
+
+def _desplazar(filas, guardado, area_id, puntos):
+    """
+    Mueve la fila de un investigador a sus nuevos puntos y área ajustando solo las
+    posiciones de las filas que cambian.
+    """
+    pk, area_anterior, puntos_anteriores = guardado
+    otras = filas.exclude(pk=pk)
+    cambios = {
+        'area_id': area_id,
+        'puntos': puntos,
+        'posicion_global': F('posicion_global') + _banda(otras, 'posicion_global', puntos_anteriores, puntos),
+    }
+    if area_id == area_anterior:
+        desplazamiento = _banda(otras.filter(area_id=area_id), 'posicion_area', puntos_anteriores, puntos)
+        cambios['posicion_area'] = F('posicion_area') + desplazamiento
+    else:
+        # Sale de un área y entra en otra: se ajustan las filas de ambas que quedan por debajo
+        otras.filter(area_id=area_anterior, puntos__lt=puntos_anteriores).update(posicion_area=F('posicion_area') - 1)
+        otras.filter(area_id=area_id, puntos__lt=puntos).update(posicion_area=F('posicion_area') + 1)
+        cambios['posicion_area'] = otras.filter(area_id=area_id, puntos__gt=puntos).count() + 1
+    RankingPuntaje.objects.filter(pk=pk).update(**cambios)
+
+def _insertar(filas, categoria, investigador_id, area_id, puntos):
+    """
+    Agrega la fila de un investigador que no estaba en el ranking de la categoría.
+    """
+    filas.filter(puntos__lt=puntos).update(posicion_global=F('posicion_global') + 1)
+    filas.filter(area_id=area_id, puntos__lt=puntos).update(posicion_area=F('posicion_area') + 1)
+    superiores = filas.aggregate(
+        en_total=Count('pk', filter=Q(puntos__gt=puntos)),
+        en_area=Count('pk', filter=Q(area_id=area_id, puntos__gt=puntos))
+    )
+    RankingPuntaje.objects.create(
+        investigador_id=investigador_id,
+        categoria=categoria,
+        area_id=area_id,
+        puntos=puntos,
+        posicion_area=superiores['en_area'] + 1,
+        posicion_global=superiores['en_total'] + 1
+    )
+
+def _mover(categoria, investigador_ids):
+    """
+    Aplica al ranking de una categoría los puntajes actuales de algunos investigadores,
+    uno por uno, desplazando solo las filas cuya posición cambia. Retorna False si hay
+    que recalcular la categoría completa, porque un investigador ya no tiene puntaje.
+    """
+    filas = RankingPuntaje.objects.filter(categoria=categoria)
+    guardados = {
+        investigador_id: (pk, area_id, puntos)
+        for pk, investigador_id, area_id, puntos in filas.filter(
+            investigador_id__in=investigador_ids
+        ).values_list('pk', 'investigador_id', 'area_id', 'puntos')
+    }
+    actuales = {
+        investigador_id: (area_id, puntos)
+        for investigador_id, area_id, puntos in PuntajeInvestigador.objects.filter(
+            investigador_id__in=investigador_ids
+        ).values_list('investigador_id', 'investigador__area_id', categoria)
+    }
+    if guardados.keys() - actuales.keys():
+        return False
+
+    for investigador_id in sorted(actuales):
+        area_id, puntos = actuales[investigador_id]
+        guardado = guardados.get(investigador_id)
+        if guardado is None:
+            _insertar(filas, categoria, investigador_id, area_id, puntos)
+        elif guardado[1:] != (area_id, puntos):
+            _desplazar(filas, guardado, area_id, puntos)
+    return True
+
+@transaction.atomic
+def actualizar_posiciones(cambios, batch_size=BATCH_SIZE):
+    """
+    Actualiza el ranking con los cambios programados en una transacción.
+
+    Parámetros:
+        cambios: Conjunto de (categoria, investigador_id); investigador_id None indica
+            que la categoría se recalcula completa (por ejemplo al eliminar puntajes)
+
+    En las categorías con pocos investigadores cambiados (hasta LIMITE_INCREMENTAL) solo
+    se desplazan las filas cuyos puntos quedan entre el valor anterior y el nuevo de cada
+    investigador, con sentencias UPDATE sobre ese rango de puntos; el costo depende de las
+    posiciones que cambian y no del tamaño de la tabla. Las demás se recalculan completas
+    con actualizar_ranking. Toma los bloqueos consultivos de las categorías afectadas.
+    """
+    completas = set()
+    por_categoria = defaultdict(set)
+    for categoria, investigador_id in cambios:
+        if investigador_id is None:
+            completas.add(categoria)
+        else:
+            por_categoria[categoria].add(investigador_id)
+    for categoria, investigador_ids in por_categoria.items():
+        if len(investigador_ids) > LIMITE_INCREMENTAL:
+            completas.add(categoria)
+
+    _bloquear(completas | por_categoria.keys())
+    for categoria in CAMPOS_RANKING:
+        if categoria in completas:
+            continue
+        if categoria in por_categoria and not _mover(categoria, por_categoria[categoria]):
+            completas.add(categoria)
+    if completas:
+        _recalcular([campo for campo in CAMPOS_RANKING if campo in completas], batch_size)
+
+@contextmanager
+def ranking_diferido():
+    """
+    Difiere las actualizaciones del ranking que se programen en el hilo actual.
+
+    Pensado para los recálculos masivos, que guardan los puntajes por rangos en varias
+    transacciones (o en varios procesos): dentro del bloque ninguna transacción actualiza
+    el ranking y solo se acumulan las categorías afectadas en el conjunto que entrega el
+    bloque. Quien lo usa actualiza el ranking una sola vez al final con
+    actualizar_ranking(categorias).
+    """
+    anterior = getattr(_estado, 'categorias', None)
+    _estado.categorias = set()
+    try:
+        yield _estado.categorias
+    finally:
+        categorias = _estado.categorias
+        _estado.categorias = anterior
+        if anterior is not None:
+            # Un bloque anidado entrega sus categorías al bloque que lo contiene
+            anterior.update(categorias)
+
+def programar_actualizacion(categorias=None, investigador_ids=None):
+    """
+    Programa la actualización del ranking de las categorías indicadas (todas si es None)
+    al confirmar la transacción en curso. Se registra una sola vez por transacción aunque
+    cambien muchos puntajes, con todas las categorías e investigadores afectados; fuera
+    de un bloque atómico se ejecuta de inmediato (ver actualizar_posiciones).
+
+    Si se indican los investigadores cuyo puntaje o área cambió solo se desplazan sus
+    filas y las que quedan entre sus posiciones anterior y nueva; si no (por ejemplo al
+    eliminar puntajes) las categorías se recalculan completas. Dentro de
+    ranking_diferido() solo se acumulan las categorías.
+    """
+    categorias = CAMPOS_RANKING if categorias is None else categorias
+    diferidas = getattr(_estado, 'categorias', None)
+    if diferidas is not None:
+        diferidas.update(categorias)
+        return
+    if investigador_ids is None:
+        cambios = {(categoria, None) for categoria in categorias}
+    else:
+        cambios = {(categoria, investigador_id) for categoria in categorias for investigador_id in investigador_ids}
+    al_confirmar('puntajes:ranking', actualizar_posiciones, cambios)
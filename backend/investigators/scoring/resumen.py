@@ -0,0 +1,160 @@
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Avg, Count, F, Max, Sum, Window
+from django.db.models.functions import Rank, RowNumber
+
+from investigators.models import PuntajeInvestigador
+from investigators.scoring.confirmacion import al_confirmar
+from investigators.scoring.contador import incrementar, valores
+from investigators.scoring.rules import CATEGORIAS
+
+# Columnas sumadas en los resúmenes, en el orden en que se devuelven
+CAMPOS_RESUMEN = ['puntos_totales'] + list(CATEGORIAS)
+
+# Contador (modelo Contador) con la versión de la tabla de puntajes. Forma parte de la
+# clave de cada resumen en caché, así que incrementarlo invalida todos los resúmenes a la vez
+CLAVE_VERSION = 'puntajes:version'
+
+# Agrupación: (campo del investigador con el id, campo con el nombre)
+AGRUPACIONES = {
+    'area': ('investigador__area_id', 'investigador__area__nombre'),
+    'unidad': ('investigador__area__unidad_id', 'investigador__area__unidad__nombre'),
+}
+
+def version_puntajes():
+    """
+    Retorna la versión actual de la tabla de puntajes. Se guarda en la base de datos y
+    no en la caché: una clave de la caché puede caducar o descartarse y volver a empezar
+    desde un valor con el que ya hay resúmenes anteriores guardados.
+    """
+    return valores([CLAVE_VERSION])[CLAVE_VERSION]
+
+def marca_puntajes():
+    """
+    Retorna una marca de la tabla de puntajes leída de la base de datos: la cantidad de
+    puntajes y la fecha de la última actualización. Cambia con cualquier recálculo,
+    también los que hace otro proceso (por ejemplo procesar_trabajos), aunque la caché
+    no sea compartida entre procesos y el contador de versión no se haya incrementado.
+    """
+    fila = PuntajeInvestigador.objects.aggregate(cantidad=Count('id'), ultima=Max('ultima_actualizacion'))
+    ultima = fila['ultima'].timestamp() if fila['ultima'] else 0
+    return f"{fila['cantidad']}:{ultima}"
+
+def incrementar_version():
+    """
+    Incrementa la versión de la tabla de puntajes e invalida los resúmenes en caché.
+    """
+    incrementar(CLAVE_VERSION)
+
+def programar_invalidacion():
+    """
+    Incrementa la versión al confirmar la transacción en curso, una sola vez por transacción.
+    Hacerlo antes de confirmar permitiría guardar en caché, con la versión nueva,
+    un resumen calculado con los datos anteriores.
+    """
+    al_confirmar('puntajes:version', lambda datos: incrementar_version())
+
+def calcular_resumen(agrupar='area'):
+    """
+    Suma los puntajes por área o por unidad en una sola consulta agrupada.
+    Retorna una lista de diccionarios con id, nombre, las sumas de cada columna
+    y la cantidad de investigadores.
+    """
+    campo_id, campo_nombre = AGRUPACIONES[agrupar]
+    # Los alias no pueden coincidir con los campos del modelo, se renombran al final
+    filas = PuntajeInvestigador.objects.values(campo_id, campo_nombre).annotate(
+        total_investigadores=Count('id'),
+        **{f'suma_{campo}': Sum(campo) for campo in CAMPOS_RESUMEN}
+    ).order_by(campo_id)
+
+    resumen = []
+    for fila in filas:
+        grupo = {'id': fila[campo_id], 'nombre': fila[campo_nombre]}
+        for campo in CAMPOS_RESUMEN:
+            grupo[campo] = fila[f'suma_{campo}'] or 0
+        grupo['investigadores'] = fila['total_investigadores']
+        resumen.append(grupo)
+    return resumen
+
+def calcular_estadisticas(campo, top):
+    """
+    Calcula por área la cantidad de investigadores, la suma, el promedio, la mediana
+    y los top mejores puntajes de un campo.
+
+    Todo se resuelve en la base de datos con tres consultas: una agregación agrupada,
+    y dos consultas con funciones de ventana (ROW_NUMBER/RANK ... OVER (PARTITION BY área))
+    que devuelven solo las filas centrales y las top primeras de cada área. El tamaño
+    del resultado depende de la cantidad de áreas y de top, no de los investigadores.
+    Retorna una lista de áreas ordenada por cantidad de investigadores (de mayor a menor).
+    """
+    area = F('investigador__area_id')
+
+    areas = {}
+    for fila in PuntajeInvestigador.objects.values(
+        'investigador__area_id', 'investigador__area__nombre'
+    ).annotate(
+        cantidad=Count('id'), suma=Sum(campo), promedio=Avg(campo)
+    ).order_by():
+        areas[fila['investigador__area_id']] = {
+            'id': fila['investigador__area_id'],
+            'nombre': fila['investigador__area__nombre'],
+            'total_investigadores': fila['cantidad'],
+            'suma': fila['suma'] or 0,
+            'promedio': round(fila['promedio'] or 0, 2),
+            'mediana': 0,
+            'investigadores': []
+        }
+
+    # Filas centrales de cada área: una si la cantidad es impar, dos si es par
+    centrales = {}
+    for fila in PuntajeInvestigador.objects.annotate(
+        numero=Window(RowNumber(), partition_by=[area], order_by=[F(campo).asc(), F('id').asc()]),
+        cantidad=Window(Count('id'), partition_by=[area])
+    ).filter(
+        numero__gte=F('cantidad') / 2.0, numero__lte=F('cantidad') / 2.0 + 1
+    ).values('investigador__area_id', campo):
+        centrales.setdefault(fila['investigador__area_id'], []).append(fila[campo])
+    for area_id, valores in centrales.items():
+        areas[area_id]['mediana'] = sum(valores) / len(valores)
+
+    for fila in PuntajeInvestigador.objects.annotate(
+        posicion=Window(Rank(), partition_by=[area], order_by=F(campo).desc()),
+        numero=Window(RowNumber(), partition_by=[area], order_by=[F(campo).desc(), F('id').asc()])
+    ).filter(numero__lte=top).values(
+        'investigador_id', 'investigador__nombre', 'investigador__area_id', campo, 'posicion', 'numero'
+    ).order_by('investigador__area_id', 'numero'):
+        areas[fila['investigador__area_id']]['investigadores'].append({
+            'id': fila['investigador_id'],
+            'nombre': fila['investigador__nombre'],
+            'puntaje': fila[campo],
+            'posicion': fila['posicion']
+        })
+
+    return sorted(areas.values(), key=lambda a: a['total_investigadores'], reverse=True)
+
+def _en_cache(clave, calcular):
+    """
+    Obtiene un resultado desde la caché o lo calcula y lo guarda.
+    La clave se completa con la versión de la tabla de puntajes y con su marca en la
+    base de datos, de modo que cualquier escritura de puntajes, en este u otro proceso,
+    hace que la siguiente consulta lo recalcule. La versión cubre los cambios que no
+    tocan los puntajes, como el área de un investigador.
+    """
+    clave = f'{clave}:v{version_puntajes()}:{marca_puntajes()}'
+    resultado = cache.get(clave)
+    if resultado is None:
+        resultado = calcular()
+        cache.set(clave, resultado, timeout=settings.PUNTAJES_CACHE_TIMEOUT)
+    return resultado
+
+def resumen_en_cache(agrupar='area'):
+    """
+    Obtiene el resumen por área o por unidad desde la caché.
+    """
+    return _en_cache(f'puntajes:resumen:{agrupar}', lambda: calcular_resumen(agrupar))
+
+def estadisticas_en_cache(campo, top):
+    """
+    Obtiene las estadísticas por área de un campo desde la caché.
+    """
+    return _en_cache(f'puntajes:estadisticas:{campo}:{top}', lambda: calcular_estadisticas(campo, top))
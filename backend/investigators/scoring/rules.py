@@ -0,0 +1,221 @@
+from django.core.exceptions import FieldDoesNotExist, ValidationError
+from django.db.models import Case, When, Value, IntegerField, Q
+
+from investigators.models import (
+    Estudiante, DetLinea, Proyecto, DetArticulo, DetEvento,
+    ReglaPuntaje, VersionReglasPuntaje
+)
+
+# Categoría (columna de PuntajeInvestigador): (modelo evaluado, campo que apunta al investigador)
+CATEGORIAS = {
+    'puntos_estudiantes_maestria': (Estudiante, 'investigador_id'),
+    'puntos_estudiantes_doctorado': (Estudiante, 'investigador_id'),
+    'puntos_lineas_investigacion': (DetLinea, 'investigador_id'),
+    'puntos_proyectos': (Proyecto, 'lider_id'),
+    'puntos_articulos': (DetArticulo, 'investigador_id'),
+    'puntos_eventos': (DetEvento, 'investigador_id'),
+}
+
+# Reglas usadas cuando no hay ninguna versión activa en la base de datos.
+# Coinciden con la versión inicial creada por la migración 0007.
+# Categoría: lista de (condiciones, puntos) en orden de prioridad
+REGLAS_PREDETERMINADAS = {
+    'puntos_estudiantes_maestria': [
+        ({'tipo_estudiante__nombre__icontains': 'Maestría', 'activo': True}, 1),
+        ({'tipo_estudiante__nombre__icontains': 'Maestría', 'estatus': 'Desertor'}, 2),
+        ({'tipo_estudiante__nombre__icontains': 'Maestría', 'estatus': 'Egresado'}, 3),
+        ({'tipo_estudiante__nombre__icontains': 'Maestría', 'estatus': 'Titulado'}, 5),
+    ],
+    'puntos_estudiantes_doctorado': [
+        ({'tipo_estudiante__nombre__icontains': 'Doctorado', 'activo': True}, 1),
+        ({'tipo_estudiante__nombre__icontains': 'Doctorado', 'estatus': 'Desertor'}, 3),
+        ({'tipo_estudiante__nombre__icontains': 'Doctorado', 'estatus': 'Egresado'}, 5),
+        ({'tipo_estudiante__nombre__icontains': 'Doctorado', 'estatus': 'Titulado'}, 8),
+    ],
+    'puntos_lineas_investigacion': [
+        ({'linea__reconocimiento_institucional': True}, 5),
+    ],
+    'puntos_proyectos': [
+        ({'estado': 'En Proceso'}, 3),
+        ({'estado': 'Terminado'}, 7),
+        ({'estado': 'Instalado en Sitio'}, 10),
+    ],
+    'puntos_articulos': [
+        ({'orden_autor': 1, 'articulo__estado': 'En Proceso'}, 3),
+        ({'orden_autor': 1, 'articulo__estado': 'Terminado'}, 5),
+        ({'orden_autor': 1, 'articulo__estado': 'En Revista'}, 7),
+        ({'orden_autor': 1, 'articulo__estado': 'Publicado'}, 10),
+        ({'orden_autor': 1}, 0),
+        ({}, 3),
+    ],
+    'puntos_eventos': [
+        ({'evento__tipo_evento__nombre': 'Congreso', 'rol_evento__nombre__contains': 'Ponente'}, 3),
+        ({'evento__tipo_evento__nombre': 'Taller'}, 1),
+        ({'evento__tipo_evento__nombre': 'Conferencia', 'rol_evento__nombre__contains': 'Ponente'}, 5),
+        ({'evento__tipo_evento__nombre': 'Diplomado'}, 3),
+        ({'evento__tipo_evento__nombre': 'Charla'}, 1),
+        ({}, 1),
+    ],
+}
+
+# Operadores de búsqueda admitidos en las condiciones y su evaluación en Python
+OPERADORES = {
+    'exact': lambda valor, esperado: valor == esperado,
+    'iexact': lambda valor, esperado: valor is not None and str(valor).lower() == str(esperado).lower(),
+    'contains': lambda valor, esperado: valor is not None and str(esperado) in str(valor),
+    'icontains': lambda valor, esperado: valor is not None and str(esperado).lower() in str(valor).lower(),
+    'in': lambda valor, esperado: valor in esperado,
+    'gt': lambda valor, esperado: valor is not None and valor > esperado,
+    'gte': lambda valor, esperado: valor is not None and valor >= esperado,
+    'lt': lambda valor, esperado: valor is not None and valor < esperado,
+    'lte': lambda valor, esperado: valor is not None and valor <= esperado,
+}
+
+def _separar_lookup(lookup):
+    """
+    Separa una búsqueda como 'evento__tipo_evento__nombre__contains' en
+    (['evento', 'tipo_evento', 'nombre'], 'contains').
+    """
+    partes = lookup.split('__')
+    if len(partes) > 1 and partes[-1] in OPERADORES:
+        return partes[:-1], partes[-1]
+    return partes, 'exact'
+
+def _relaciones_lookup(Modelo, lookup):
+    """
+    Retorna las rutas de relaciones que recorre una búsqueda, por ejemplo
+    ['evento', 'evento__tipo_evento'] para 'evento__tipo_evento__nombre'.
+    Lanza FieldDoesNotExist si algún campo no existe.
+    """
+    ruta, _ = _separar_lookup(lookup)
+    relaciones = []
+    for i, nombre in enumerate(ruta):
+        campo = Modelo._meta.get_field(nombre)
+        if i < len(ruta) - 1:
+            if not campo.is_relation:
+                raise FieldDoesNotExist(f"'{nombre}' no es una relación de {Modelo.__name__}")
+            relaciones.append('__'.join(ruta[:i + 1]))
+            Modelo = campo.related_model
+    return relaciones
+
+def _validar_ruta(Modelo, lookup):
+    """
+    Verifica que una búsqueda solo recorra relaciones directas (ForeignKey y OneToOneField
+    del propio modelo) y termine en un campo simple o en el id de una relación.
+
+    Las relaciones inversas o de muchos a muchos repetirían la fila evaluada una vez por
+    cada fila relacionada, multiplicando su puntaje en Sum(Case/When), y evaluar() no
+    puede recorrerlas. Comparar una relación directa con un valor se escribe '<campo>_id'
+    para que evaluar() compare el id y no la instancia relacionada.
+    Lanza FieldDoesNotExist con el detalle del problema.
+    """
+    ruta, _ = _separar_lookup(lookup)
+    for i, nombre in enumerate(ruta):
+        campo = Modelo._meta.get_field(nombre)
+        directa = campo.concrete and (campo.many_to_one or campo.one_to_one)
+        if campo.is_relation and not directa:
+            raise FieldDoesNotExist(
+                f"'{nombre}' es una relación inversa o de muchos a muchos de {Modelo.__name__}"
+            )
+        if i < len(ruta) - 1:
+            if not campo.is_relation or nombre != campo.name:
+                raise FieldDoesNotExist(f"'{nombre}' no es una relación de {Modelo.__name__}")
+            Modelo = campo.related_model
+        elif campo.is_relation and nombre != campo.attname:
+            raise FieldDoesNotExist(f"para comparar la relación '{nombre}' se debe usar '{campo.attname}'")
+
+def validar_condiciones(categoria, condiciones):
+    """
+    Verifica que las condiciones de una regla sean búsquedas válidas para su categoría
+    (ver _validar_ruta). Lanza ValidationError con el detalle del problema.
+    """
+    if categoria not in CATEGORIAS:
+        raise ValidationError({'categoria': f"Categoría desconocida: {categoria}"})
+    if not isinstance(condiciones, dict):
+        raise ValidationError({'condiciones': "Las condiciones deben ser un objeto JSON"})
+    Modelo, _ = CATEGORIAS[categoria]
+    for lookup in condiciones:
+        try:
+            _validar_ruta(Modelo, lookup)
+        except FieldDoesNotExist as e:
+            raise ValidationError({'condiciones': f"Búsqueda inválida '{lookup}': {e}"})
+
+def cargar_reglas():
+    """
+    Obtiene las reglas de la versión activa agrupadas por categoría.
+
+    Retorna un diccionario {categoria: [(condiciones, puntos), ...]} en orden de prioridad.
+    Si no hay una versión activa se usan REGLAS_PREDETERMINADAS.
+    """
+    version = VersionReglasPuntaje.objects.filter(activa=True).first()
+    if version is None:
+        return REGLAS_PREDETERMINADAS
+
+    reglas = {categoria: [] for categoria in CATEGORIAS}
+    for regla in ReglaPuntaje.objects.filter(version=version).order_by('orden', 'id'):
+        reglas[regla.categoria].append((regla.condiciones or {}, regla.puntos))
+    return reglas
+
+def compilar_case(reglas_categoria):
+    """
+    Convierte las reglas de una categoría en una expresión Case/When.
+    La primera regla sin condiciones se usa como valor por defecto; las siguientes
+    no pueden aplicarse nunca y se ignoran.
+    """
+    whens = []
+    default = 0
+    for condiciones, puntos in reglas_categoria:
+        if not condiciones:
+            default = puntos
+            break
+        whens.append(When(Q(**condiciones), then=Value(puntos)))
+    return Case(*whens, default=Value(default), output_field=IntegerField())
+
+def compilar_indice(reglas_categoria):
+    """
+    Convierte las reglas de una categoría en una expresión Case/When que devuelve
+    la posición de la primera regla que cumple cada fila, o -1 si no cumple ninguna.
+    Permite contar cuántas filas obtienen cada regla sin depender de sus puntos.
+    """
+    whens = []
+    default = -1
+    for indice, (condiciones, _) in enumerate(reglas_categoria):
+        if not condiciones:
+            default = indice
+            break
+        whens.append(When(Q(**condiciones), then=Value(indice)))
+    return Case(*whens, default=Value(default), output_field=IntegerField())
+
+def evaluar(reglas_categoria, instance):
+    """
+    Evalúa en Python los puntos que una fila obtiene con las reglas de una categoría.
+    Es el equivalente por fila de compilar_case.
+    """
+    for condiciones, puntos in reglas_categoria:
+        if all(_cumple(instance, lookup, esperado) for lookup, esperado in condiciones.items()):
+            return puntos
+    return 0
+
+def _cumple(instance, lookup, esperado):
+    ruta, operador = _separar_lookup(lookup)
+    valor = instance
+    for nombre in ruta:
+        if valor is None:
+            break
+        valor = getattr(valor, nombre)
+    if esperado is None and operador == 'exact':
+        return valor is None
+    return OPERADORES[operador](valor, esperado)
+
+def relaciones_para(Modelo, reglas):
+    """
+    Rutas de select_related necesarias para evaluar en Python las reglas de un modelo.
+    """
+    relaciones = set()
+    for categoria, (ModeloCategoria, _) in CATEGORIAS.items():
+        if ModeloCategoria is not Modelo:
+            continue
+        for condiciones, _ in reglas.get(categoria, []):
+            for lookup in condiciones:
+                relaciones.update(_relaciones_lookup(Modelo, lookup))
+    return sorted(relaciones)
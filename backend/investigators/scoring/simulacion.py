@@ -0,0 +1,158 @@
+import numpy as np
+from django.core.exceptions import ValidationError
+from django.db.models import Count
+
+from investigators.models import Investigador
+from investigators.scoring.rules import CATEGORIAS, cargar_reglas, compilar_indice
+
+def posiciones(puntajes):
+    """
+    Calcula la posición de cada puntaje (1 = mayor) con empates compartidos, como RANK().
+    La posición es 1 más la cantidad de puntajes estrictamente mayores.
+    """
+    ordenados = np.sort(puntajes)
+    return len(puntajes) - np.searchsorted(ordenados, puntajes, side='right') + 1
+
+class Simulador:
+    """
+    Evalúa cambios en los puntos de las reglas sin escribir en la base de datos.
+
+    Al construirse cuenta, con una consulta por categoría, cuántas filas de cada
+    investigador obtienen cada regla (la primera cuyas condiciones cumplen). Con esa
+    matriz de conteos (investigadores x reglas) el puntaje de cualquier conjunto de
+    pesos es un producto matricial, así que se pueden comparar muchos escenarios
+    sin volver a consultar la base de datos.
+
+    Solo se simulan cambios en los puntos: modificar las condiciones de una regla
+    cambia qué filas la cumplen y requiere recalcular los conteos.
+    """
+
+    def __init__(self, investigadores=None, reglas=None):
+        if investigadores is None:
+            investigadores = Investigador.objects.filter(activo=True)
+        self.reglas = reglas if reglas is not None else cargar_reglas()
+
+        self.ids = np.array(sorted(investigadores.values_list('pk', flat=True)), dtype=np.int64)
+        fila_investigador = {investigador_id: fila for fila, investigador_id in enumerate(self.ids.tolist())}
+
+        # Una columna por regla: (categoría, posición de la regla dentro de la categoría)
+        self.columnas = [
+            (categoria, indice)
+            for categoria in CATEGORIAS
+            for indice in range(len(self.reglas[categoria]))
+        ]
+        columna_regla = {columna: posicion for posicion, columna in enumerate(self.columnas)}
+
+        self.conteos = np.zeros((len(self.ids), len(self.columnas)), dtype=np.int64)
+        for categoria, (Modelo, campo_investigador) in CATEGORIAS.items():
+            consulta = Modelo.objects.filter(
+                **{f'{campo_investigador}__in': investigadores.values('pk')}
+            ).annotate(
+                regla=compilar_indice(self.reglas[categoria])
+            ).values(campo_investigador, 'regla').annotate(cantidad=Count('pk')).order_by()
+            for fila in consulta:
+                if fila['regla'] < 0:
+                    continue
+                self.conteos[
+                    fila_investigador[fila[campo_investigador]],
+                    columna_regla[(categoria, fila['regla'])]
+                ] = fila['cantidad']
+
+        self.pesos_actuales = np.array(
+            [self.reglas[categoria][indice][1] for categoria, indice in self.columnas], dtype=np.int64
+        )
+        self.puntajes_actuales = self.conteos @ self.pesos_actuales
+        self.posiciones_actuales = posiciones(self.puntajes_actuales)
+
+    def vector_pesos(self, cambios):
+        """
+        Construye el vector de pesos de un escenario a partir de los pesos actuales.
+
+        Parámetros:
+            cambios (dict): {categoria: [puntos, ...]} para reemplazar los puntos de todas
+                las reglas de la categoría en orden, o {categoria: {indice: puntos}} para
+                cambiar solo algunas reglas. Las categorías omitidas conservan sus puntos.
+
+        Lanza ValidationError si una categoría o índice no existe.
+        """
+        pesos = self.pesos_actuales.copy()
+        for categoria, puntos in cambios.items():
+            if categoria not in CATEGORIAS:
+                raise ValidationError(f"Categoría desconocida: {categoria}")
+            cantidad = len(self.reglas[categoria])
+            if isinstance(puntos, list):
+                if len(puntos) != cantidad:
+                    raise ValidationError(f"'{categoria}' tiene {cantidad} reglas, se recibieron {len(puntos)} puntos")
+                puntos = dict(enumerate(puntos))
+            if not isinstance(puntos, dict):
+                raise ValidationError(f"Los puntos de '{categoria}' deben ser una lista o un objeto")
+            for indice, valor in puntos.items():
+                try:
+                    indice, valor = int(indice), int(valor)
+                except (TypeError, ValueError):
+                    raise ValidationError(f"Índice o puntos inválidos en '{categoria}': {indice}={valor}")
+                if not 0 <= indice < cantidad:
+                    raise ValidationError(f"'{categoria}' no tiene una regla con índice {indice}")
+                pesos[self.columnas.index((categoria, indice))] = valor
+        return pesos
+
+    def evaluar(self, escenarios, limite=50):
+        """
+        Evalúa varios escenarios de pesos con un solo producto matricial.
+
+        Parámetros:
+            escenarios (list): Diccionarios con 'nombre' (opcional) y 'pesos' (ver vector_pesos)
+            limite (int): Cantidad máxima de investigadores detallados por escenario
+
+        Retorna una lista con un resumen por escenario y los investigadores con mayor
+        cambio de posición (y luego de puntaje), sin modificar ningún puntaje.
+        """
+        if not escenarios:
+            return []
+        matriz_pesos = np.column_stack([self.vector_pesos(e.get('pesos') or {}) for e in escenarios])
+        simulados = self.conteos @ matriz_pesos
+
+        resultados = []
+        for j, escenario in enumerate(escenarios):
+            puntajes = simulados[:, j]
+            nuevas_posiciones = posiciones(puntajes)
+            deltas = puntajes - self.puntajes_actuales
+            # Positivo cuando el investigador sube en el ranking
+            cambios_posicion = self.posiciones_actuales - nuevas_posiciones
+
+            orden = np.lexsort((self.ids, -np.abs(deltas), -np.abs(cambios_posicion)))
+            afectados = orden[(deltas[orden] != 0) | (cambios_posicion[orden] != 0)][:limite]
+
+            resultados.append({
+                'nombre': escenario.get('nombre', f'Escenario {j + 1}'),
+                'investigadores_con_cambio_puntaje': int(np.count_nonzero(deltas)),
+                'investigadores_con_cambio_posicion': int(np.count_nonzero(cambios_posicion)),
+                'delta_promedio': round(float(deltas.mean()), 2) if len(deltas) else 0,
+                'delta_minimo': int(deltas.min()) if len(deltas) else 0,
+                'delta_maximo': int(deltas.max()) if len(deltas) else 0,
+                'investigadores': [
+                    {
+                        'id': int(self.ids[i]),
+                        'puntaje_actual': int(self.puntajes_actuales[i]),
+                        'puntaje_simulado': int(puntajes[i]),
+                        'delta': int(deltas[i]),
+                        'posicion_actual': int(self.posiciones_actuales[i]),
+                        'posicion_simulada': int(nuevas_posiciones[i]),
+                        'cambio_posicion': int(cambios_posicion[i]),
+                    }
+                    for i in afectados
+                ]
+            })
+        return resultados
+
+    def describir_reglas(self):
+        """
+        Retorna las reglas actuales con su índice, para construir los escenarios.
+        """
+        return {
+            categoria: [
+                {'indice': indice, 'condiciones': condiciones, 'puntos': puntos}
+                for indice, (condiciones, puntos) in enumerate(self.reglas[categoria])
+            ]
+            for categoria in CATEGORIAS
+        }
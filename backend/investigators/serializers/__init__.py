@@ -19,3 +19,4 @@ from .evento_serializer import EventoSerializer, InvestigadorEventoSerializer
 from .unidad_serializer import UnidadSerializer
 from .jefe_area_serializer import JefeAreaSerializer
 from .puntaje_serializer import PuntajeInvestigadorSerializer
+from .trabajo_serializer import TrabajoSerializer, PuntoControlImportacionSerializer
@@ -0,0 +1,24 @@
+from rest_framework import serializers
+from investigators.models import Trabajo, PuntoControlImportacion
+
+class TrabajoSerializer(serializers.ModelSerializer):
+    porcentaje = serializers.FloatField(read_only=True)
+    velocidad = serializers.FloatField(read_only=True)
+    
+    class Meta:
+        model = Trabajo
+        fields = [
+            'id', 'tipo', 'estado', 'parametros', 'total', 'procesados',
+            'porcentaje', 'velocidad', 'errores', 'resultado',
+            'fecha_creacion', 'fecha_inicio', 'fecha_fin', 'fecha_actualizacion'
+        ]
+        read_only_fields = fields
+
+class PuntoControlImportacionSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = PuntoControlImportacion
+        fields = [
+            'modelo', 'total', 'bloques', 'procesados', 'importados', 'errores',
+            'referencias_faltantes', 'fecha_actualizacion'
+        ]
+        read_only_fields = fields
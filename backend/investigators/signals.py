@@ -1,11 +1,13 @@
-from django.db.models.signals import post_save, post_delete
+from django.conf import settings
+from django.db.models.signals import post_init, pre_save, post_save, post_delete
 from django.dispatch import receiver
 from django.contrib.auth.models import User
 from .models import (
-    Usuario, Investigador, Estudiante, Proyecto, 
-    Articulo, DetArticulo, DetEvento, Evento, DetLinea, Linea
+    Usuario, Unidad, Area, Investigador, Estudiante, Proyecto, 
+    Articulo, DetArticulo, DetEvento, Evento, DetLinea, Linea, PuntajeInvestigador,
+    ReglaPuntaje, VersionReglasPuntaje
 )
-from .views.puntaje_view import PuntajeInvestigadorViewSet
+from .scoring import cambios, incremental, pending, ranking, resumen
 
 # Esta señal se activa después de guardar un nuevo usuario en el sistema Django
 # Su propósito es crear automáticamente un perfil de Usuario personalizado
@@ -32,6 +34,73 @@ def create_user_profile(sender, instance, created, **kwargs):
             # Si no existe un investigador con ese correo, no hace nada
             pass
 
+# Esta señal se activa al crear o cargar de la base de datos una instancia de los modelos que aportan al puntaje
+# Guarda los valores cargados para detectar después si una edición cambió algún campo relevante
+@receiver(post_init, sender=Investigador)
+@receiver(post_init, sender=Estudiante)
+@receiver(post_init, sender=DetLinea)
+@receiver(post_init, sender=Linea)
+@receiver(post_init, sender=Proyecto)
+@receiver(post_init, sender=DetArticulo)
+@receiver(post_init, sender=Articulo)
+@receiver(post_init, sender=DetEvento)
+@receiver(post_init, sender=Evento)
+def tomar_instantanea_puntaje(sender, instance, **kwargs):
+    """
+    Guarda los valores de la instancia al crearla o cargarla.
+    """
+    cambios.tomar_instantanea(instance)
+
+def _sin_cambios(instance, kwargs):
+    """
+    Indica si un guardado no modificó ningún campo que pueda afectar el puntaje,
+    por ejemplo al editar solo datos de contacto. Las filas nuevas, las eliminaciones
+    y las cargas de fixtures siempre se consideran cambios.
+    """
+    if kwargs['signal'] is post_delete or kwargs.get('created') or kwargs.get('raw', False):
+        return False
+    if kwargs['signal'] is pre_save and instance._state.adding:
+        return False
+    return not cambios.cambio_relevante(instance)
+
+def _incremental(kwargs):
+    """
+    Indica si la señal debe aplicar diferencias de puntos en lugar de marcar investigadores.
+    Dentro de puntajes_diferidos() y en las cargas de fixtures (raw, como loaddata) solo
+    se marcan los investigadores afectados para recalcularlos en bloque al final.
+    """
+    return settings.PUNTAJES_INCREMENTALES and not pending.diferido() and not kwargs.get('raw', False)
+
+# Esta señal se activa antes de guardar cualquier modelo que aporte al puntaje
+# En modo incremental conserva la versión anterior de la fila para calcular
+# únicamente la diferencia de puntos que produce el cambio
+@receiver(pre_save, sender=Estudiante)
+@receiver(pre_save, sender=DetLinea)
+@receiver(pre_save, sender=Linea)
+@receiver(pre_save, sender=Proyecto)
+@receiver(pre_save, sender=DetArticulo)
+@receiver(pre_save, sender=Articulo)
+@receiver(pre_save, sender=DetEvento)
+@receiver(pre_save, sender=Evento)
+def guardar_estado_previo_puntaje(sender, instance, **kwargs):
+    """
+    Guarda el estado anterior de la fila antes de actualizarla (solo en modo incremental).
+    """
+    if _sin_cambios(instance, kwargs):
+        return
+    
+    if _incremental(kwargs):
+        incremental.guardar_estado_previo(instance)
+
+def _registrar_cambio_incremental(instance, kwargs):
+    """
+    Aplica la diferencia de puntos de una fila guardada o eliminada.
+    """
+    if kwargs['signal'] is post_delete:
+        incremental.registrar_eliminacion(instance)
+    else:
+        incremental.registrar_guardado(instance)
+
 # Esta señal se activa cuando se crea, actualiza o elimina un estudiante
 # Recalcula el puntaje del investigador asociado, ya que los estudiantes
 # aportan puntos a la evaluación del investigador
@@ -42,10 +111,14 @@ def actualizar_puntaje_estudiante(sender, instance, **kwargs):
     Los investigadores reciben puntos según los estudiantes que dirigen.
     Se ejecuta cuando un estudiante es creado, modificado o eliminado.
     """
-    if instance.investigador:
-        # Crea instancia del viewset y llama al método para calcular puntajes
-        view = PuntajeInvestigadorViewSet()
-        view._calcular_puntaje_investigador(instance.investigador)
+    if _sin_cambios(instance, kwargs):
+        return
+    
+    if _incremental(kwargs):
+        _registrar_cambio_incremental(instance, kwargs)
+    else:
+        # El puntaje se recalcula una sola vez al confirmar la transacción
+        pending.marcar_pendientes([instance.investigador_id, cambios.valor_previo(instance, 'investigador_id')])
 
 # Esta señal se activa cuando se modifica la relación entre investigadores y líneas de investigación
 # Las líneas de investigación también aportan al puntaje del investigador
@@ -56,9 +129,13 @@ def actualizar_puntaje_linea(sender, instance, **kwargs):
     DetLinea es la tabla intermedia que relaciona investigadores con líneas de investigación.
     Se ejecuta cuando se crea o elimina esta relación.
     """
-    if instance.investigador:
-        view = PuntajeInvestigadorViewSet()
-        view._calcular_puntaje_investigador(instance.investigador)
+    if _sin_cambios(instance, kwargs):
+        return
+    
+    if _incremental(kwargs):
+        _registrar_cambio_incremental(instance, kwargs)
+    else:
+        pending.marcar_pendientes([instance.investigador_id, cambios.valor_previo(instance, 'investigador_id')])
 
 # Esta señal se activa cuando se modifica una línea de investigación
 # Si cambia el reconocimiento de la línea, afecta a todos los investigadores asociados
@@ -69,10 +146,15 @@ def actualizar_puntaje_cambio_linea(sender, instance, **kwargs):
     Es particularmente importante cuando cambia el estado de 'reconocimiento_institucional' de la línea,
     ya que esto puede afectar los puntos de todos los investigadores vinculados.
     """
-    view = PuntajeInvestigadorViewSet()
-    # Busca todas las relaciones entre esta línea e investigadores y actualiza cada uno
-    for det_linea in instance.detlinea_set.all():
-        view._calcular_puntaje_investigador(det_linea.investigador)
+    if _sin_cambios(instance, kwargs):
+        return
+    
+    if _incremental(kwargs):
+        incremental.registrar_cambio_padre(instance)
+        return
+    
+    # Marca a todos los investigadores relacionados con esta línea
+    pending.marcar_pendientes(instance.detlinea_set.values_list('investigador_id', flat=True))
 
 # Esta señal se activa cuando se crea, actualiza o elimina un proyecto
 # Los proyectos aportan al puntaje del investigador líder
@@ -82,9 +164,14 @@ def actualizar_puntaje_proyecto(sender, instance, **kwargs):
     Actualiza el puntaje cuando hay cambios en los proyectos liderados por un investigador.
     Solo actualiza el puntaje del líder del proyecto, no de todos los participantes.
     """
-    if instance.lider:
-        view = PuntajeInvestigadorViewSet()
-        view._calcular_puntaje_investigador(instance.lider)
+    if _sin_cambios(instance, kwargs):
+        return
+    
+    if _incremental(kwargs):
+        _registrar_cambio_incremental(instance, kwargs)
+    else:
+        # Si cambió el líder, el anterior también pierde los puntos del proyecto
+        pending.marcar_pendientes([instance.lider_id, cambios.valor_previo(instance, 'lider_id')])
 
 # Esta señal se activa cuando se modifica la relación entre investigadores y artículos
 @receiver([post_save, post_delete], sender=DetArticulo)
@@ -94,9 +181,13 @@ def actualizar_puntaje_articulo(sender, instance, **kwargs):
     DetArticulo es la tabla intermedia que relaciona investigadores con artículos.
     La posición del autor (orden_autor) también puede influir en los puntos asignados.
     """
-    if instance.investigador:
-        view = PuntajeInvestigadorViewSet()
-        view._calcular_puntaje_investigador(instance.investigador)
+    if _sin_cambios(instance, kwargs):
+        return
+    
+    if _incremental(kwargs):
+        _registrar_cambio_incremental(instance, kwargs)
+    else:
+        pending.marcar_pendientes([instance.investigador_id, cambios.valor_previo(instance, 'investigador_id')])
 
 # Esta señal se activa cuando se modifica un artículo científico
 # Si cambia el estado del artículo (ej: de "En Proceso" a "Publicado"), 
@@ -108,10 +199,15 @@ def actualizar_puntaje_cambio_articulo(sender, instance, **kwargs):
     Es especialmente relevante cuando cambia el estado del artículo (ej: de "En Revista" a "Publicado"),
     ya que esto puede modificar significativamente los puntos asignados.
     """
-    # Obtiene todos los investigadores relacionados con este artículo
-    for det_articulo in instance.detarticulo_set.all():
-        view = PuntajeInvestigadorViewSet()
-        view._calcular_puntaje_investigador(det_articulo.investigador)
+    if _sin_cambios(instance, kwargs):
+        return
+    
+    if _incremental(kwargs):
+        incremental.registrar_cambio_padre(instance)
+        return
+    
+    # Marca a todos los investigadores relacionados con este artículo
+    pending.marcar_pendientes(instance.detarticulo_set.values_list('investigador_id', flat=True))
 
 # Esta señal se activa cuando se modifica la relación entre investigadores y eventos
 @receiver([post_save, post_delete], sender=DetEvento)
@@ -121,19 +217,110 @@ def actualizar_puntaje_evento(sender, instance, **kwargs):
     DetEvento es la tabla intermedia que relaciona investigadores con eventos.
     El rol del investigador en el evento (organizador, ponente, etc.) puede influir en los puntos.
     """
-    if instance.investigador:
-        view = PuntajeInvestigadorViewSet()
-        view._calcular_puntaje_investigador(instance.investigador)
+    if _sin_cambios(instance, kwargs):
+        return
+    
+    if _incremental(kwargs):
+        _registrar_cambio_incremental(instance, kwargs)
+    else:
+        pending.marcar_pendientes([instance.investigador_id, cambios.valor_previo(instance, 'investigador_id')])
+
+# Esta señal se activa cuando cambia un evento
+# El tipo de evento determina los puntos de cada participante
+@receiver([post_save], sender=Evento)
+def actualizar_puntaje_cambio_evento(sender, instance, **kwargs):
+    """
+    Ajusta los puntajes de los participantes de un evento cuando cambia su tipo.
+    """
+    if _sin_cambios(instance, kwargs):
+        return
+    
+    if _incremental(kwargs):
+        incremental.registrar_cambio_padre(instance)
+        return
+    
+    # Marca a todos los participantes del evento
+    pending.marcar_pendientes(instance.detevento_set.values_list('investigador_id', flat=True))
 
 # Esta señal se activa cuando se crea o actualiza un investigador
 # Asegura que todos los investigadores tengan un puntaje calculado
 @receiver([post_save], sender=Investigador)
-def crear_puntaje_investigador(sender, instance, created, **kwargs):
+def crear_puntaje_investigador(sender, instance, **kwargs):
     """
     Crea o actualiza el puntaje cuando se crea o modifica un investigador.
     Garantiza que cada investigador activo tenga un registro de puntaje actualizado.
     Este cálculo considera todas las contribuciones: estudiantes, proyectos, artículos, etc.
     """
-    if instance.activo:
-        view = PuntajeInvestigadorViewSet()
-        view._calcular_puntaje_investigador(instance)
+    if _sin_cambios(instance, kwargs):
+        return
+    
+    if _incremental(kwargs):
+        incremental.asegurar_puntaje(instance)
+    elif instance.activo:
+        pending.marcar_pendientes([instance.pk])
+    
+    # Un cambio de área altera las posiciones y los resúmenes por área
+    ranking.programar_actualizacion(investigador_ids=[instance.pk])
+    resumen.programar_invalidacion()
+
+# Esta señal se activa cuando un puntaje se guarda o elimina directamente (por ejemplo desde la API)
+# Los cálculos en bloque no disparan señales y programan la actualización por su cuenta
+@receiver([post_save, post_delete], sender=PuntajeInvestigador)
+def actualizar_ranking_puntaje(sender, instance, **kwargs):
+    """
+    Programa la actualización del ranking y de los resúmenes al confirmar la transacción.
+    Al eliminar un puntaje las posiciones se recalculan completas: la fila del
+    investigador en el ranking puede haberse eliminado ya en cascada y no queda con qué
+    desplazar las demás.
+    """
+    if kwargs['signal'] is post_delete:
+        ranking.programar_actualizacion()
+    else:
+        ranking.programar_actualizacion(investigador_ids=[instance.investigador_id])
+    resumen.programar_invalidacion()
+
+# Esta señal se activa cuando se crea, modifica o elimina un área o una unidad
+# Los resúmenes agrupan por área y por unidad y muestran sus nombres
+@receiver([post_save, post_delete], sender=Area)
+@receiver([post_save, post_delete], sender=Unidad)
+def invalidar_resumenes_area(sender, instance, **kwargs):
+    """
+    Invalida los resúmenes en caché al confirmar la transacción, aunque ningún puntaje cambie.
+    """
+    resumen.programar_invalidacion()
+
+# Esta señal se activa después de guardar cualquier modelo que aporte al puntaje
+# Se registra al final para que las señales anteriores comparen contra los valores previos
+@receiver(post_save, sender=Investigador)
+@receiver(post_save, sender=Estudiante)
+@receiver(post_save, sender=DetLinea)
+@receiver(post_save, sender=Linea)
+@receiver(post_save, sender=Proyecto)
+@receiver(post_save, sender=DetArticulo)
+@receiver(post_save, sender=Articulo)
+@receiver(post_save, sender=DetEvento)
+@receiver(post_save, sender=Evento)
+def actualizar_instantanea_puntaje(sender, instance, **kwargs):
+    """
+    Actualiza los valores guardados de la instancia para comparar el siguiente guardado.
+    """
+    cambios.tomar_instantanea(instance)
+
+# Esta señal se activa cuando se crea, modifica o elimina una regla de puntaje
+# Una regla puede consultar campos que antes no afectaban al puntaje
+@receiver([post_save, post_delete], sender=ReglaPuntaje)
+def marcar_reglas_modificadas(sender, instance, **kwargs):
+    """
+    Actualiza la fecha de modificación de la versión de la regla, de modo que todos los
+    procesos vuelvan a calcular los campos relevantes para el puntaje.
+    """
+    cambios.marcar_version_modificada(instance.version_id)
+
+# Esta señal se activa cuando se crea o elimina una versión de reglas de puntaje
+# Cambia la marca de las reglas, así que los resultados derivados de este proceso se descartan
+@receiver([post_save, post_delete], sender=VersionReglasPuntaje)
+def invalidar_reglas_derivadas(sender, instance, **kwargs):
+    """
+    Descarta los campos relevantes y las rutas calculados en este proceso.
+    """
+    cambios.invalidar_derivados()
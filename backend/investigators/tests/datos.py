@@ -0,0 +1,72 @@
+import datetime
+from pathlib import Path
+
+from django.core.management import call_command
+
+from investigators.models import (
+    Area, Articulo, Carrera, DetArticulo, DetEvento, DetLinea, Estudiante, Evento,
+    Investigador, Linea, NivelEducacion, Proyecto, RolEvento, TipoEstudiante, TipoEvento,
+)
+
+# Fixture con catálogos y datos de ejemplo de 14 investigadores
+FIXTURE = Path(__file__).resolve().parents[2] / 'test_data.json'
+
+FECHA = datetime.date(2024, 1, 15)
+
+def cargar_datos(test_case):
+    """
+    Carga el fixture de ejemplo desde setUpTestData y ejecuta los callbacks de on_commit
+    que programe, para que no queden registrados en la transacción de la clase.
+    """
+    with test_case.captureOnCommitCallbacks(execute=True):
+        call_command('loaddata', str(FIXTURE), verbosity=0)
+
+def crear_investigador(nombre, activo=True):
+    return Investigador.objects.create(
+        nombre=nombre,
+        correo=f'{nombre.lower().replace(" ", ".")}@example.com',
+        area=Area.objects.order_by('pk').first(),
+        nivel_edu=NivelEducacion.objects.order_by('pk').first(),
+        activo=activo,
+    )
+
+def crear_estudiante(investigador, tipo, activo=True, estatus=None):
+    return Estudiante.objects.create(
+        investigador=investigador,
+        tipo_estudiante=TipoEstudiante.objects.get(nombre=tipo),
+        carrera=Carrera.objects.order_by('pk').first(),
+        nombre=f'Estudiante de {investigador.nombre}',
+        fecha_inicio=FECHA,
+        activo=activo,
+        estatus=estatus,
+    )
+
+def crear_linea(investigador, reconocida):
+    linea = Linea.objects.create(nombre=f'Línea de {investigador.nombre}', reconocimiento_institucional=reconocida)
+    return DetLinea.objects.create(linea=linea, investigador=investigador)
+
+def crear_proyecto(lider, estado):
+    return Proyecto.objects.create(
+        nombre=f'Proyecto {estado}', lider=lider, estado=estado, fecha_inicio=FECHA
+    )
+
+def crear_articulo(estado, *autores):
+    """
+    Crea un artículo con sus autores en el orden indicado (el primero es el autor 1).
+    """
+    articulo = Articulo.objects.create(
+        nombre_articulo=f'Artículo {estado}', pais_publicacion='México',
+        fecha_publicacion=FECHA, estado=estado,
+    )
+    for orden, autor in enumerate(autores, start=1):
+        DetArticulo.objects.create(articulo=articulo, investigador=autor, orden_autor=orden)
+    return articulo
+
+def crear_evento(investigador, tipo, rol):
+    evento = Evento.objects.create(
+        tipo_evento=TipoEvento.objects.get(nombre=tipo), nombre_evento=f'{tipo} de prueba',
+        fecha_inicio=FECHA, fecha_fin=FECHA, lugar='Campus', empresa_invita='Universidad',
+    )
+    return DetEvento.objects.create(
+        evento=evento, investigador=investigador, rol_evento=RolEvento.objects.get(nombre=rol)
+    )
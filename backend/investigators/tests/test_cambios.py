@@ -0,0 +1,67 @@
+import time
+from unittest import mock
+
+from django.test import TestCase
+from django.utils import timezone
+
+from investigators.models import Articulo, ReglaPuntaje, VersionReglasPuntaje
+from investigators.scoring import cambios
+from investigators.tests import datos
+
+class CamposRelevantesTests(TestCase):
+    """
+    Campos relevantes para el puntaje guardados en el proceso: los guardados no consultan
+    las reglas y una regla modificada se tiene en cuenta sin reiniciar el proceso.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        datos.cargar_datos(cls)
+        with cls.captureOnCommitCallbacks(execute=True):
+            cls.autor = datos.crear_investigador('Autor')
+            cls.articulo = datos.crear_articulo('Publicado', cls.autor)
+        cls.version = VersionReglasPuntaje.objects.order_by('pk').first()
+
+    def setUp(self):
+        # Los resultados derivados son del proceso: no deben pasar de una prueba a otra
+        cambios.invalidar_derivados()
+        self.addCleanup(cambios.invalidar_derivados)
+
+    def _campos_articulo(self):
+        return cambios.campos_relevantes()[Articulo._meta.label]
+
+    def test_edicion_sin_campos_relevantes_no_consulta_las_reglas(self):
+        self._campos_articulo()
+        articulo = Articulo.objects.get(pk=self.articulo.pk)
+
+        # Solo el UPDATE del artículo
+        with self.captureOnCommitCallbacks(execute=True) as callbacks, self.assertNumQueries(1):
+            articulo.nombre_revista = 'Otra revista'
+            articulo.save()
+        self.assertEqual(callbacks, [])
+
+    def test_regla_nueva_se_aplica_en_el_mismo_proceso(self):
+        self.assertNotIn('pais_publicacion', self._campos_articulo())
+
+        with self.captureOnCommitCallbacks(execute=True):
+            ReglaPuntaje.objects.create(
+                version=self.version, categoria='puntos_articulos', orden=99,
+                condiciones={'articulo__pais_publicacion': 'México'}, puntos=1
+            )
+
+        self.assertIn('pais_publicacion', self._campos_articulo())
+
+    def test_regla_de_otro_proceso_se_aplica_al_vencer_la_vigencia(self):
+        self.assertNotIn('pais_publicacion', self._campos_articulo())
+
+        # Otro proceso crea la regla: en este no se dispara ninguna señal
+        ReglaPuntaje.objects.bulk_create([ReglaPuntaje(
+            version=self.version, categoria='puntos_articulos', orden=99,
+            condiciones={'articulo__pais_publicacion': 'México'}, puntos=1
+        )])
+        VersionReglasPuntaje.objects.filter(pk=self.version.pk).update(fecha_modificacion=timezone.now())
+        self.assertNotIn('pais_publicacion', self._campos_articulo())
+
+        with self.settings(PUNTAJES_REGLAS_VIGENCIA=60), \
+                mock.patch('time.monotonic', return_value=time.monotonic() + 61):
+            self.assertIn('pais_publicacion', self._campos_articulo())
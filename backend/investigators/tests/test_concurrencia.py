@@ -0,0 +1,117 @@
+import datetime
+import threading
+import unittest
+from unittest import mock
+
+from django.db import connection
+from django.test import TestCase, TransactionTestCase
+from django.utils import timezone
+
+from investigators.models import Contador, PuntajeInvestigador
+from investigators.scoring import concurrencia
+from investigators.scoring.contador import incrementar, valores
+from investigators.tests import datos
+
+class RecalculoUnicoTests(TestCase):
+    """
+    Recálculos individuales sin repetir cálculos concurrentes del mismo investigador.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        datos.cargar_datos(cls)
+        with cls.captureOnCommitCallbacks(execute=True):
+            cls.autor = datos.crear_investigador('Autor')
+            cls.otro = datos.crear_investigador('Otro')
+
+    def setUp(self):
+        self.iniciales = concurrencia.contadores()
+
+    def _contados(self):
+        """
+        Contadores incrementados durante la prueba.
+        """
+        return {nombre: valor - self.iniciales[nombre] for nombre, valor in concurrencia.contadores().items()}
+
+    def test_pedido_durante_un_calculo_se_absorbe_y_se_repite_una_vez(self):
+        calcular = concurrencia._calcular
+        llamadas = []
+
+        def calcular_con_pedidos(investigador_ids):
+            llamadas.append(set(investigador_ids))
+            if len(llamadas) == 1:
+                # Otros pedidos llegan mientras corre el primer cálculo
+                self.assertEqual(concurrencia.recalcular_investigadores([self.autor.pk]), {self.autor.pk})
+                self.assertEqual(concurrencia.recalcular_investigadores([self.autor.pk]), {self.autor.pk})
+            calcular(investigador_ids)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            with mock.patch('investigators.scoring.concurrencia._calcular', calcular_con_pedidos):
+                absorbidos = concurrencia.recalcular_investigadores([self.autor.pk, self.otro.pk])
+
+        self.assertEqual(absorbidos, set())
+        self.assertEqual(llamadas, [{self.autor.pk, self.otro.pk}, {self.autor.pk}])
+        self.assertEqual(concurrencia._en_curso, {})
+        self.assertEqual(self._contados(), {'ejecuciones': 3, 'absorbidos': 2, 'esperas': 0})
+        self.assertTrue(PuntajeInvestigador.objects.filter(investigador=self.autor).exists())
+
+    def test_calculo_fallido_libera_a_los_investigadores(self):
+        with mock.patch('investigators.scoring.concurrencia._calcular', side_effect=ValueError):
+            with self.assertRaises(ValueError):
+                concurrencia.recalcular_investigadores([self.autor.pk])
+
+        self.assertEqual(concurrencia._en_curso, {})
+        with self.captureOnCommitCallbacks(execute=True):
+            self.assertEqual(concurrencia.recalcular_investigadores([self.autor.pk]), set())
+        self.assertEqual(self._contados()['ejecuciones'], 1)
+
+    def test_contadores_no_caducan(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            concurrencia.recalcular_investigadores([self.autor.pk, self.otro.pk])
+
+        # Pasado el tiempo de vida por defecto de la caché (300 s) los contadores se conservan
+        with mock.patch(
+            'django.core.cache.backends.db.tz_now',
+            return_value=timezone.now() + datetime.timedelta(seconds=600)
+        ):
+            with self.captureOnCommitCallbacks(execute=True):
+                concurrencia.recalcular_investigadores([self.autor.pk])
+            self.assertEqual(self._contados()['ejecuciones'], 3)
+
+    def test_contadores_se_incrementan_al_confirmar(self):
+        with self.captureOnCommitCallbacks() as callbacks:
+            concurrencia._contar('esperas', 2)
+            self.assertEqual(self._contados()['esperas'], 0)
+
+        for callback in callbacks:
+            callback()
+        self.assertEqual(self._contados()['esperas'], 2)
+
+class ContadorTests(TestCase):
+
+    def test_incrementar_crea_el_contador(self):
+        incrementar('prueba', 2)
+        incrementar('prueba')
+        self.assertEqual(valores(['prueba', 'inexistente']), {'prueba': 3, 'inexistente': 0})
+
+@unittest.skipIf(connection.vendor == 'sqlite', 'SQLite no admite escrituras concurrentes desde varios hilos')
+class ContadorConcurrenteTests(TransactionTestCase):
+
+    def test_incrementos_concurrentes_no_se_pierden(self):
+        hilos = 8
+        incrementos = 50
+
+        def incrementar_varias_veces():
+            try:
+                for _ in range(incrementos):
+                    incrementar('concurrente')
+            finally:
+                connection.close()
+
+        trabajadores = [threading.Thread(target=incrementar_varias_veces) for _ in range(hilos)]
+        for trabajador in trabajadores:
+            trabajador.start()
+        for trabajador in trabajadores:
+            trabajador.join()
+
+        self.assertEqual(Contador.objects.get(nombre='concurrente').valor, hilos * incrementos)
@@ -0,0 +1,175 @@
+from io import StringIO
+
+from django.core.management import call_command
+from django.db.models import F
+from django.test import TestCase
+
+from investigators.models import (
+    Articulo, DetArticulo, DetEvento, DetLinea, Estudiante, Investigador, Proyecto, PuntajeInvestigador,
+)
+from investigators.scoring import calcular_puntajes
+from investigators.scoring.engine import CAMPOS_PUNTAJE, calcular_componentes
+from investigators.tests import datos
+
+CAMPOS = CAMPOS_PUNTAJE + ['puntos_totales']
+
+def puntaje_original(investigador):
+    """
+    Cálculo por investigador que usaba PuntajeViewSet antes del motor en bloque: recorre
+    las filas relacionadas en Python. Sirve de referencia para el motor.
+    """
+    puntos = dict.fromkeys(CAMPOS_PUNTAJE, 0)
+
+    tablas_estudiantes = {
+        'puntos_estudiantes_maestria': ('Maestría', {'Desertor': 2, 'Egresado': 3, 'Titulado': 5}),
+        'puntos_estudiantes_doctorado': ('Doctorado', {'Desertor': 3, 'Egresado': 5, 'Titulado': 8}),
+    }
+    for campo, (tipo, por_estatus) in tablas_estudiantes.items():
+        for estudiante in Estudiante.objects.filter(investigador=investigador, tipo_estudiante__nombre__icontains=tipo):
+            puntos[campo] += 1 if estudiante.activo else por_estatus.get(estudiante.estatus, 0)
+
+    puntos['puntos_lineas_investigacion'] = DetLinea.objects.filter(
+        investigador=investigador, linea__reconocimiento_institucional=True
+    ).count() * 5
+
+    por_estado_proyecto = {'En Proceso': 3, 'Terminado': 7, 'Instalado en Sitio': 10}
+    for proyecto in Proyecto.objects.filter(lider=investigador):
+        puntos['puntos_proyectos'] += por_estado_proyecto.get(proyecto.estado, 0)
+
+    por_estado_articulo = {'En Proceso': 3, 'Terminado': 5, 'En Revista': 7, 'Publicado': 10}
+    for det_articulo in DetArticulo.objects.filter(investigador=investigador):
+        if det_articulo.orden_autor == 1:
+            puntos['puntos_articulos'] += por_estado_articulo.get(det_articulo.articulo.estado, 0)
+        else:
+            puntos['puntos_articulos'] += 3
+
+    for det_evento in DetEvento.objects.filter(investigador=investigador):
+        tipo = det_evento.evento.tipo_evento.nombre
+        rol = det_evento.rol_evento.nombre
+        if tipo == 'Congreso' and 'Ponente' in rol:
+            puntos['puntos_eventos'] += 3
+        elif tipo == 'Conferencia' and 'Ponente' in rol:
+            puntos['puntos_eventos'] += 5
+        elif tipo == 'Diplomado':
+            puntos['puntos_eventos'] += 3
+        else:
+            puntos['puntos_eventos'] += 1
+
+    puntos['puntos_totales'] = sum(puntos.values())
+    return puntos
+
+class CalculoPuntajesTests(TestCase):
+    """
+    Compara el motor en bloque con el cálculo original por investigador.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        datos.cargar_datos(cls)
+        with cls.captureOnCommitCallbacks(execute=True):
+            # Un investigador con una fila por cada rama de las reglas
+            cls.completo = datos.crear_investigador('Investigador Completo')
+            coautor = datos.crear_investigador('Coautor')
+            for tipo in ('Maestría', 'Doctorado', 'Postdoctorado'):
+                datos.crear_estudiante(cls.completo, tipo)
+                datos.crear_estudiante(cls.completo, tipo, activo=False)
+                for estatus in ('Desertor', 'Egresado', 'Titulado'):
+                    datos.crear_estudiante(cls.completo, tipo, activo=False, estatus=estatus)
+            datos.crear_linea(cls.completo, reconocida=True)
+            datos.crear_linea(cls.completo, reconocida=False)
+            for estado in ('En Proceso', 'Terminado', 'Instalado en Sitio', 'Cancelado'):
+                datos.crear_proyecto(cls.completo, estado)
+            for estado in ('En Proceso', 'Terminado', 'En Revista', 'Publicado'):
+                datos.crear_articulo(estado, cls.completo, coautor)
+                datos.crear_articulo(estado, coautor, cls.completo)
+            for tipo in ('Congreso', 'Conferencia', 'Taller', 'Diplomado', 'Charla', 'Seminario'):
+                for rol in ('Ponente', 'Asistente'):
+                    datos.crear_evento(cls.completo, tipo, rol)
+
+            cls.inactivo = datos.crear_investigador('Investigador Inactivo', activo=False)
+            datos.crear_proyecto(cls.inactivo, 'Terminado')
+            datos.crear_articulo('Publicado', cls.inactivo, cls.completo)
+
+            cls.sin_actividad = datos.crear_investigador('Investigador Sin Actividad')
+
+    def _recalcular_activos(self, **kwargs):
+        with self.captureOnCommitCallbacks(execute=True):
+            return calcular_puntajes(Investigador.objects.filter(activo=True), **kwargs)
+
+    def _guardados(self):
+        return {
+            fila.pop('investigador_id'): fila
+            for fila in PuntajeInvestigador.objects.values('investigador_id', *CAMPOS)
+        }
+
+    def _esperados(self):
+        return {
+            investigador.pk: puntaje_original(investigador)
+            for investigador in Investigador.objects.filter(activo=True)
+        }
+
+    def _borrar_puntajes(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            PuntajeInvestigador.objects.all().delete()
+
+    def test_coincide_con_calculo_por_investigador(self):
+        self._borrar_puntajes()
+        guardados = self._recalcular_activos()
+
+        self.assertEqual(len(guardados), Investigador.objects.filter(activo=True).count())
+        self.assertEqual(self._guardados(), self._esperados())
+        # El investigador con todas las ramas suma puntos en cada categoría
+        self.assertTrue(all(self._guardados()[self.completo.pk][campo] for campo in CAMPOS))
+
+    def test_tamano_de_lote_no_cambia_el_resultado(self):
+        activos = Investigador.objects.filter(activo=True).count()
+        for batch_size in (1, 2, 3, activos - 1, activos, activos + 1):
+            with self.subTest(batch_size=batch_size):
+                # Todos los puntajes son nuevos (bulk_create)
+                self._borrar_puntajes()
+                self._recalcular_activos(batch_size=batch_size)
+                self.assertEqual(self._guardados(), self._esperados())
+
+                # Todos los puntajes existen y cambian (bulk_update); QuerySet.update no
+                # dispara señales, así que solo el recálculo los actualiza
+                Articulo.objects.update(estado='Publicado')
+                Proyecto.objects.update(estado='Instalado en Sitio')
+                DetArticulo.objects.update(orden_autor=F('orden_autor') + 1)
+                self._recalcular_activos(batch_size=batch_size)
+                self.assertEqual(self._guardados(), self._esperados())
+
+    def test_comando_por_rangos_coincide_con_calculo_por_investigador(self):
+        for shard_size, batch_size in ((1, 1), (4, 3), (1000, 500)):
+            with self.subTest(shard_size=shard_size, batch_size=batch_size):
+                self._borrar_puntajes()
+                with self.captureOnCommitCallbacks(execute=True):
+                    call_command(
+                        'actualizar_puntajes', shard_size=shard_size, batch_size=batch_size, stdout=StringIO()
+                    )
+                self.assertEqual(self._guardados(), self._esperados())
+
+    def test_investigador_inactivo_no_se_recalcula(self):
+        self._borrar_puntajes()
+        self._recalcular_activos()
+        self.assertFalse(PuntajeInvestigador.objects.filter(investigador=self.inactivo).exists())
+
+        # Un puntaje previo del investigador inactivo se conserva tal cual
+        with self.captureOnCommitCallbacks(execute=True):
+            PuntajeInvestigador.objects.create(investigador=self.inactivo, puntos_proyectos=1, puntos_totales=1)
+        self._recalcular_activos()
+        puntaje = PuntajeInvestigador.objects.get(investigador=self.inactivo)
+        self.assertEqual((puntaje.puntos_proyectos, puntaje.puntos_totales), (1, 1))
+
+        # Sus aportaciones sí cuentan para los investigadores activos con los que colabora
+        self.assertEqual(
+            self._guardados()[self.completo.pk]['puntos_articulos'],
+            puntaje_original(self.completo)['puntos_articulos'],
+        )
+
+    def test_investigador_sin_actividad_tiene_puntaje_en_cero(self):
+        componentes = calcular_componentes(Investigador.objects.filter(pk=self.sin_actividad.pk))
+        self.assertEqual(componentes, {self.sin_actividad.pk: dict.fromkeys(CAMPOS, 0)})
+
+        self._borrar_puntajes()
+        self._recalcular_activos()
+        self.assertEqual(self._guardados()[self.sin_actividad.pk], dict.fromkeys(CAMPOS, 0))
@@ -0,0 +1,153 @@
+import copy
+import json
+import os
+import tempfile
+import unittest
+
+from django.db import connection
+from django.test import TestCase
+
+from investigators.importacion.copia import importar_lote_copia
+from investigators.importacion.diferencias import clasificar
+from investigators.importacion.escritura import importar_lote
+from investigators.importacion.modelos import MODEL_MAPPING, MODEL_RELATIONSHIPS
+from investigators.models import Articulo, DetArticulo, Investigador, PuntajeInvestigador, RankingPuntaje, Trabajo
+from investigators.scoring import puntajes_diferidos, ranking
+from investigators.scoring.engine import CAMPOS_PUNTAJE, calcular_componentes
+from investigators.tests import datos
+from investigators.trabajos import ejecutar, encolar, tomar_siguiente
+
+def objetos_del_fixture(model_name):
+    with open(datos.FIXTURE, encoding='utf-8') as archivo:
+        return [item for item in json.load(archivo) if item['model'] == model_name]
+
+class ClasificarTests(TestCase):
+    """
+    Clasificación de los objetos de un fixture frente a las filas guardadas.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        datos.cargar_datos(cls)
+
+    def _clasificar(self, model_name, items):
+        nuevos, modificados, sin_cambios = clasificar(
+            MODEL_MAPPING[model_name], items, MODEL_RELATIONSHIPS[model_name]
+        )
+        return [[item['pk'] for item in grupo] for grupo in (nuevos, modificados, sin_cambios)]
+
+    def test_fixture_ya_importado_no_tiene_cambios(self):
+        for model_name in ('investigators.articulo', 'investigators.detarticulo', 'investigators.investigador'):
+            with self.subTest(model_name=model_name):
+                items = objetos_del_fixture(model_name)
+                self.assertEqual(self._clasificar(model_name, items), [[], [], [item['pk'] for item in items]])
+
+    def test_nuevos_modificados_e_invalidos(self):
+        articulos = objetos_del_fixture('investigators.articulo')[:3]
+        modificado, igual, nuevo = copy.deepcopy(articulos)
+        modificado['fields']['estado'] = 'Publicado'
+        nuevo['pk'] = 9000
+        invalido = dict(copy.deepcopy(articulos[0]), pk='abc')
+
+        self.assertEqual(
+            self._clasificar('investigators.articulo', [modificado, igual, nuevo, invalido]),
+            [[9000], ['abc', modificado['pk']], [igual['pk']]]
+        )
+
+    def test_valores_equivalentes_no_son_cambios(self):
+        articulo = copy.deepcopy(objetos_del_fixture('investigators.articulo')[0])
+        # Solo los campos que trae el objeto se comparan, con el tipo de Python del campo
+        articulo['fields'] = {'estatus': 1, 'fecha_publicacion': articulo['fields']['fecha_publicacion']}
+
+        self.assertEqual(self._clasificar('investigators.articulo', [articulo]), [[], [], [articulo['pk']]])
+
+class ImportarLoteTests(TestCase):
+    """
+    Escritura en bloque de un fixture: las filas importadas no disparan señales, pero los
+    puntajes y el ranking de los investigadores afectados quedan al día.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        datos.cargar_datos(cls)
+        with cls.captureOnCommitCallbacks(execute=True):
+            ranking.actualizar_ranking()
+
+    def _articulos_publicados(self):
+        articulos = copy.deepcopy(objetos_del_fixture('investigators.articulo'))
+        for articulo in articulos:
+            articulo['fields']['estado'] = 'Publicado'
+        return articulos
+
+    def _importar(self, importar, items):
+        with self.captureOnCommitCallbacks(execute=True):
+            with puntajes_diferidos():
+                return importar(Articulo, items, MODEL_RELATIONSHIPS['investigators.articulo'])
+
+    def _assert_puntajes_al_dia(self):
+        investigadores = Investigador.objects.filter(activo=True)
+        guardados = {
+            fila.pop('investigador_id'): fila
+            for fila in PuntajeInvestigador.objects.values('investigador_id', 'puntos_totales', *CAMPOS_PUNTAJE)
+        }
+        self.assertEqual(
+            {pk: guardados.get(pk) for pk in investigadores.values_list('pk', flat=True)},
+            calcular_componentes(investigadores)
+        )
+        self.assertEqual(
+            {
+                (investigador_id, categoria): tuple(valores)
+                for investigador_id, categoria, *valores in RankingPuntaje.objects.values_list(
+                    'investigador_id', 'categoria', 'area_id', 'puntos', 'posicion_area', 'posicion_global'
+                )
+            },
+            ranking._posiciones(ranking.CAMPOS_RANKING)
+        )
+
+    def test_importar_articulos_actualiza_los_puntajes_de_sus_autores(self):
+        antes = dict(PuntajeInvestigador.objects.values_list('investigador_id', 'puntos_articulos'))
+        items = self._articulos_publicados()
+
+        importados, errores, faltantes = self._importar(importar_lote, items)
+
+        self.assertEqual((importados, errores, faltantes), (len(items), [], {}))
+        self.assertFalse(Articulo.objects.exclude(estado='Publicado').exists())
+        self._assert_puntajes_al_dia()
+        primeros_autores = set(DetArticulo.objects.filter(orden_autor=1).values_list('investigador_id', flat=True))
+        self.assertTrue(any(
+            PuntajeInvestigador.objects.get(investigador_id=investigador_id).puntos_articulos > antes[investigador_id]
+            for investigador_id in primeros_autores
+        ))
+
+    @unittest.skipIf(connection.vendor != 'postgresql', 'COPY solo está disponible en PostgreSQL')
+    def test_copy_escribe_lo_mismo_que_bulk(self):
+        items = self._articulos_publicados()
+
+        importados, errores, faltantes = self._importar(importar_lote_copia, items)
+
+        self.assertEqual((importados, errores, faltantes), (len(items), [], {}))
+        self.assertFalse(Articulo.objects.exclude(estado='Publicado').exists())
+        self._assert_puntajes_al_dia()
+
+    def test_trabajo_incremental_solo_escribe_las_filas_modificadas(self):
+        articulos = copy.deepcopy(objetos_del_fixture('investigators.articulo'))
+        articulos[0]['fields']['estado'] = 'Publicado'
+        directorio = tempfile.TemporaryDirectory()
+        self.addCleanup(directorio.cleanup)
+        ruta = os.path.join(directorio.name, 'respaldo.json')
+        with open(ruta, 'w', encoding='utf-8') as archivo:
+            json.dump(articulos, archivo)
+        # En SQLite el modo copy se reemplaza por bulk
+        encolar('importar_json', ruta=ruta, mode='copy', incremental=True)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            trabajo = tomar_siguiente()
+            ejecutar(trabajo)
+        trabajo = Trabajo.objects.get(pk=trabajo.pk)
+
+        self.assertEqual(trabajo.estado, 'Completado')
+        if connection.vendor != 'postgresql':
+            self.assertEqual(trabajo.resultado['mode'], 'bulk')
+        self.assertEqual(trabajo.resultado['imported_counts'], {'investigators.articulo': 1})
+        self.assertEqual((trabajo.procesados, trabajo.total), (len(articulos), len(articulos)))
+        self._assert_puntajes_al_dia()
@@ -0,0 +1,80 @@
+from unittest import mock
+
+from django.test import TestCase, override_settings
+
+from investigators.models import (
+    Articulo, DetArticulo, DetEvento, Investigador, Proyecto, PuntajeInvestigador, RankingPuntaje
+)
+from investigators.scoring import incremental, ranking
+from investigators.scoring.engine import CAMPOS_PUNTAJE, calcular_componentes
+from investigators.tests import datos
+
+@override_settings(PUNTAJES_INCREMENTALES=True)
+class PuntajesIncrementalesTests(TestCase):
+    """
+    Modo incremental: las señales aplican la diferencia de puntos de la fila que cambió
+    y el resultado debe coincidir con un cálculo desde cero.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        datos.cargar_datos(cls)
+        with cls.captureOnCommitCallbacks(execute=True):
+            cls.autor = datos.crear_investigador('Autor')
+            cls.coautor = datos.crear_investigador('Coautor')
+            cls.articulo = datos.crear_articulo('En Proceso', cls.autor, cls.coautor)
+            cls.proyecto = datos.crear_proyecto(cls.autor, 'En Proceso')
+            cls.det_evento = datos.crear_evento(cls.coautor, 'Conferencia', 'Ponente')
+            ranking.actualizar_ranking()
+
+    def _assert_al_dia(self):
+        ids = [self.autor.pk, self.coautor.pk]
+        guardados = {
+            fila.pop('investigador_id'): fila
+            for fila in PuntajeInvestigador.objects.filter(investigador_id__in=ids)
+            .values('investigador_id', 'puntos_totales', *CAMPOS_PUNTAJE)
+        }
+        self.assertEqual(guardados, calcular_componentes(Investigador.objects.filter(pk__in=ids)))
+        self.assertEqual(
+            {
+                (investigador_id, categoria): tuple(valores)
+                for investigador_id, categoria, *valores in RankingPuntaje.objects.values_list(
+                    'investigador_id', 'categoria', 'area_id', 'puntos', 'posicion_area', 'posicion_global'
+                )
+            },
+            ranking._posiciones(ranking.CAMPOS_RANKING)
+        )
+
+    def test_cambio_de_estado_de_proyecto(self):
+        with self.captureOnCommitCallbacks(execute=True), \
+                mock.patch.object(incremental, 'aplicar_deltas', wraps=incremental.aplicar_deltas) as aplicar:
+            proyecto = Proyecto.objects.get(pk=self.proyecto.pk)
+            proyecto.estado = 'Instalado en Sitio'
+            proyecto.save()
+
+        # Solo la diferencia entre 'En Proceso' (3) e 'Instalado en Sitio' (10)
+        self.assertEqual(
+            [{investigador_id: dict(campos) for investigador_id, campos in llamada.args[0].items()}
+             for llamada in aplicar.call_args_list],
+            [{self.autor.pk: {'puntos_proyectos': 7}}]
+        )
+        self._assert_al_dia()
+        self.assertEqual(PuntajeInvestigador.objects.get(investigador=self.autor).puntos_proyectos, 10)
+
+    def test_cambio_del_articulo_ajusta_a_sus_autores(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            articulo = Articulo.objects.get(pk=self.articulo.pk)
+            articulo.estado = 'Publicado'
+            articulo.save()
+
+        self._assert_al_dia()
+
+    def test_cambio_de_autor_y_eliminaciones(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            det_articulo = DetArticulo.objects.get(articulo=self.articulo, investigador=self.coautor)
+            det_articulo.orden_autor = 1
+            det_articulo.save()
+            DetEvento.objects.get(pk=self.det_evento.pk).delete()
+
+        self._assert_al_dia()
+        self.assertEqual(PuntajeInvestigador.objects.get(investigador=self.coautor).puntos_eventos, 0)
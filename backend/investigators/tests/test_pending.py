@@ -0,0 +1,226 @@
+from unittest import mock
+
+from django.db import transaction
+from django.test import TestCase
+
+from investigators.models import Articulo, DetArticulo, DetEvento, Investigador, Proyecto, PuntajeInvestigador
+from investigators.scoring import confirmacion, pending
+from investigators.scoring.concurrencia import recalcular_investigadores
+from investigators.scoring.engine import CAMPOS_PUNTAJE, calcular_componentes
+from investigators.tests import datos
+
+class PuntajesPendientesTests(TestCase):
+    """
+    Recálculo de puntajes desde las señales: los investigadores afectados se acumulan
+    durante la transacción y se recalculan una sola vez al confirmarla.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        datos.cargar_datos(cls)
+        with cls.captureOnCommitCallbacks(execute=True):
+            cls.autor = datos.crear_investigador('Autor')
+            cls.coautor = datos.crear_investigador('Coautor')
+            cls.otro = datos.crear_investigador('Otro')
+            cls.articulo = datos.crear_articulo('Publicado', cls.autor, cls.coautor)
+            cls.proyecto = datos.crear_proyecto(cls.autor, 'Terminado')
+            cls.det_evento = datos.crear_evento(cls.autor, 'Conferencia', 'Ponente')
+
+    def setUp(self):
+        patcher = mock.patch(
+            'investigators.scoring.pending.recalcular_investigadores', wraps=recalcular_investigadores
+        )
+        self.recalcular = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def _recalculados(self):
+        """
+        Conjuntos de investigadores de cada llamada a recalcular_investigadores.
+        """
+        return [set(llamada.args[0]) for llamada in self.recalcular.call_args_list]
+
+    def _assert_al_dia(self, *investigadores):
+        """
+        Comprueba que el puntaje guardado coincide con un cálculo desde cero.
+        """
+        ids = [investigador.pk for investigador in investigadores]
+        esperados = calcular_componentes(Investigador.objects.filter(pk__in=ids))
+        guardados = {
+            fila.pop('investigador_id'): fila
+            for fila in PuntajeInvestigador.objects.filter(investigador_id__in=ids)
+            .values('investigador_id', 'puntos_totales', *CAMPOS_PUNTAJE)
+        }
+        self.assertEqual(guardados, esperados)
+
+    def _assert_sin_pendientes(self):
+        referencia = confirmacion._programados().get('puntajes:pendientes')
+        self.assertTrue(referencia is None or referencia() is None)
+        self.assertFalse(pending.diferido())
+        self.assertEqual(pending._diferidos(), set())
+
+    def test_editar_detarticulo(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            det_articulo = DetArticulo.objects.get(articulo=self.articulo, investigador=self.autor)
+            det_articulo.orden_autor = 3
+            det_articulo.save()
+
+        self.assertEqual(self._recalculados(), [{self.autor.pk}])
+        self._assert_al_dia(self.autor)
+
+    def test_editar_sin_cambio_relevante_no_recalcula(self):
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            DetArticulo.objects.get(articulo=self.articulo, investigador=self.autor).save()
+
+        self.assertEqual(callbacks, [])
+        self.recalcular.assert_not_called()
+
+    def test_mover_detarticulo_recalcula_ambos_investigadores(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            det_articulo = DetArticulo.objects.get(articulo=self.articulo, investigador=self.autor)
+            det_articulo.investigador = self.otro
+            det_articulo.save()
+
+        self.assertEqual(self._recalculados(), [{self.autor.pk, self.otro.pk}])
+        self._assert_al_dia(self.autor, self.otro)
+        self.assertEqual(PuntajeInvestigador.objects.get(investigador=self.autor).puntos_articulos, 0)
+
+    def test_eliminar_detarticulo(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            DetArticulo.objects.get(articulo=self.articulo, investigador=self.coautor).delete()
+
+        self.assertEqual(self._recalculados(), [{self.coautor.pk}])
+        self._assert_al_dia(self.coautor)
+
+    def test_eliminar_detevento(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            DetEvento.objects.get(pk=self.det_evento.pk).delete()
+
+        self.assertEqual(self._recalculados(), [{self.autor.pk}])
+        self._assert_al_dia(self.autor)
+        self.assertEqual(PuntajeInvestigador.objects.get(investigador=self.autor).puntos_eventos, 0)
+
+    def test_cambiar_lider_de_proyecto(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            proyecto = Proyecto.objects.get(pk=self.proyecto.pk)
+            proyecto.lider = self.otro
+            proyecto.save()
+
+        self.assertEqual(self._recalculados(), [{self.autor.pk, self.otro.pk}])
+        self._assert_al_dia(self.autor, self.otro)
+        self.assertEqual(PuntajeInvestigador.objects.get(investigador=self.otro).puntos_proyectos, 7)
+
+    def test_eliminar_articulo_en_cascada(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            Articulo.objects.get(pk=self.articulo.pk).delete()
+
+        self.assertEqual(self._recalculados(), [{self.autor.pk, self.coautor.pk}])
+        self._assert_al_dia(self.autor, self.coautor)
+
+    def test_eliminar_articulos_con_queryset_en_cascada(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            otro_articulo = datos.crear_articulo('Terminado', self.otro, self.coautor)
+        self.recalcular.reset_mock()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Articulo.objects.filter(pk__in=[self.articulo.pk, otro_articulo.pk]).delete()
+
+        self.assertEqual(self._recalculados(), [{self.autor.pk, self.coautor.pk, self.otro.pk}])
+        self._assert_al_dia(self.autor, self.coautor, self.otro)
+
+    def test_eliminar_investigador_en_cascada(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            Investigador.objects.get(pk=self.autor.pk).delete()
+
+        # El investigador eliminado se marca por sus filas, pero el cálculo lo omite
+        self.assertEqual(self._recalculados(), [{self.autor.pk}])
+        self.assertFalse(PuntajeInvestigador.objects.filter(investigador_id=self.autor.pk).exists())
+        self._assert_al_dia(self.coautor)
+
+    def test_varios_cambios_se_recalculan_una_vez(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            with transaction.atomic():
+                for det_articulo in DetArticulo.objects.filter(articulo=self.articulo):
+                    det_articulo.orden_autor += 1
+                    det_articulo.save()
+                proyecto = Proyecto.objects.get(pk=self.proyecto.pk)
+                proyecto.estado = 'Instalado en Sitio'
+                proyecto.save()
+                DetEvento.objects.get(pk=self.det_evento.pk).delete()
+
+        self.assertEqual(self._recalculados(), [{self.autor.pk, self.coautor.pk}])
+        self._assert_al_dia(self.autor, self.coautor)
+        self._assert_sin_pendientes()
+
+    def test_transaccion_revertida_no_recalcula(self):
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            with self.assertRaises(ValueError):
+                with transaction.atomic():
+                    proyecto = Proyecto.objects.get(pk=self.proyecto.pk)
+                    proyecto.lider = self.otro
+                    proyecto.save()
+                    raise ValueError
+
+        self.assertEqual(callbacks, [])
+        self.recalcular.assert_not_called()
+        self._assert_sin_pendientes()
+
+        # Los investigadores de la transacción revertida no se suman a la siguiente
+        with self.captureOnCommitCallbacks(execute=True):
+            DetArticulo.objects.get(articulo=self.articulo, investigador=self.coautor).delete()
+
+        self.assertEqual(self._recalculados(), [{self.coautor.pk}])
+
+    def test_savepoint_revertido_conserva_los_demas_pendientes(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            with transaction.atomic():
+                DetArticulo.objects.get(articulo=self.articulo, investigador=self.coautor).delete()
+                with self.assertRaises(ValueError):
+                    with transaction.atomic():
+                        DetEvento.objects.get(pk=self.det_evento.pk).delete()
+                        raise ValueError
+
+        self.assertEqual(self._recalculados(), [{self.coautor.pk}])
+        self._assert_al_dia(self.autor, self.coautor)
+
+    def test_puntajes_diferidos_recalcula_al_salir_del_bloque(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            with pending.puntajes_diferidos():
+                DetArticulo.objects.get(articulo=self.articulo, investigador=self.coautor).delete()
+                DetEvento.objects.get(pk=self.det_evento.pk).delete()
+                self.assertTrue(pending.diferido())
+                self.recalcular.assert_not_called()
+
+        self.assertEqual(self._recalculados(), [{self.autor.pk, self.coautor.pk}])
+        self._assert_sin_pendientes()
+
+    def test_puntajes_diferidos_con_excepcion_marca_los_cambios_escritos(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            with self.assertRaises(ValueError):
+                with pending.puntajes_diferidos():
+                    DetEvento.objects.get(pk=self.det_evento.pk).delete()
+                    raise ValueError
+
+        # La eliminación se escribió, así que el puntaje se recalcula igual
+        self.assertEqual(self._recalculados(), [{self.autor.pk}])
+        self._assert_al_dia(self.autor)
+        self._assert_sin_pendientes()
+
+    def test_puntajes_diferidos_con_excepcion_y_transaccion_revertida(self):
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            with self.assertRaises(ValueError):
+                with transaction.atomic():
+                    with pending.puntajes_diferidos():
+                        DetEvento.objects.get(pk=self.det_evento.pk).delete()
+                        raise ValueError
+
+        self.assertEqual(callbacks, [])
+        self.recalcular.assert_not_called()
+        self._assert_sin_pendientes()
+
+    def test_recalcular_pendientes_por_lotes(self):
+        with mock.patch('investigators.scoring.pending.BATCH_SIZE', 2):
+            pending.recalcular_pendientes({self.otro.pk, self.autor.pk, self.coautor.pk})
+
+        ids = sorted([self.autor.pk, self.coautor.pk, self.otro.pk])
+        self.assertEqual(self._recalculados(), [set(ids[:2]), set(ids[2:])])
+        self._assert_al_dia(self.autor, self.coautor, self.otro)
@@ -0,0 +1,107 @@
+import random
+from unittest import mock
+
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from investigators.models import Area, Investigador, PuntajeInvestigador, RankingPuntaje
+from investigators.scoring import ranking
+from investigators.scoring.engine import CAMPOS_PUNTAJE
+from investigators.tests import datos
+
+class RankingTests(TestCase):
+    """
+    Mantenimiento del ranking materializado: los cambios de pocos investigadores
+    desplazan posiciones y deben dar el mismo resultado que recalcularlo completo.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        datos.cargar_datos(cls)
+        with cls.captureOnCommitCallbacks(execute=True):
+            ranking.actualizar_ranking()
+
+    def _guardado(self):
+        return {
+            (investigador_id, categoria): tuple(valores)
+            for investigador_id, categoria, *valores in RankingPuntaje.objects.values_list(
+                'investigador_id', 'categoria', 'area_id', 'puntos', 'posicion_area', 'posicion_global'
+            )
+        }
+
+    def _assert_coincide_con_recalculo(self):
+        self.assertEqual(self._guardado(), ranking._posiciones(ranking.CAMPOS_RANKING))
+
+    def _guardar_puntaje(self, puntaje, generador):
+        for campo in CAMPOS_PUNTAJE:
+            # Pocos valores posibles para que haya empates
+            setattr(puntaje, campo, generador.randint(0, 4))
+        puntaje.puntos_totales = sum(getattr(puntaje, campo) for campo in CAMPOS_PUNTAJE)
+        puntaje.save()
+
+    def test_cambios_aleatorios_coinciden_con_recalculo(self):
+        generador = random.Random(7302)
+        areas = list(Area.objects.values_list('pk', flat=True))
+        self._assert_coincide_con_recalculo()
+
+        for paso in range(60):
+            operacion = generador.choice(['puntaje', 'puntaje', 'varios', 'area', 'nuevo', 'eliminar'])
+            with self.subTest(paso=paso, operacion=operacion):
+                with self.captureOnCommitCallbacks(execute=True):
+                    puntajes = list(PuntajeInvestigador.objects.order_by('pk'))
+                    if operacion == 'puntaje':
+                        self._guardar_puntaje(generador.choice(puntajes), generador)
+                    elif operacion == 'varios':
+                        for puntaje in generador.sample(puntajes, 3):
+                            self._guardar_puntaje(puntaje, generador)
+                    elif operacion == 'area':
+                        investigador = Investigador.objects.get(pk=generador.choice(puntajes).investigador_id)
+                        investigador.area_id = generador.choice(areas)
+                        investigador.save()
+                    elif operacion == 'nuevo':
+                        investigador = datos.crear_investigador(f'Nuevo {paso}')
+                        datos.crear_proyecto(investigador, generador.choice(['En Proceso', 'Terminado']))
+                    else:
+                        generador.choice(puntajes).delete()
+                self._assert_coincide_con_recalculo()
+
+    def test_una_edicion_no_recorre_toda_la_tabla(self):
+        puntaje = PuntajeInvestigador.objects.order_by('pk').first()
+
+        def consultas_de_una_edicion(puntos):
+            # QuerySet.update no dispara señales: solo se mide la actualización del ranking
+            PuntajeInvestigador.objects.filter(pk=puntaje.pk).update(
+                puntos_articulos=puntos, puntos_totales=puntos
+            )
+            with CaptureQueriesContext(connection) as consultas:
+                ranking.actualizar_posiciones({
+                    ('puntos_articulos', puntaje.investigador_id), ('puntos_totales', puntaje.investigador_id)
+                })
+            self._assert_coincide_con_recalculo()
+            return [consulta['sql'] for consulta in consultas.captured_queries]
+
+        antes = consultas_de_una_edicion(50)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            for numero in range(40):
+                datos.crear_proyecto(datos.crear_investigador(f'Adicional {numero}'), 'Terminado')
+        despues = consultas_de_una_edicion(20)
+
+        self.assertEqual(len(antes), len(despues))
+        self.assertFalse(any('RANK(' in sql.upper() for sql in antes + despues))
+
+    def test_muchos_investigadores_recalculan_la_categoria_completa(self):
+        PuntajeInvestigador.objects.update(puntos_eventos=1, puntos_totales=1)
+        investigador_ids = list(PuntajeInvestigador.objects.values_list('investigador_id', flat=True))
+
+        with mock.patch.object(ranking, 'LIMITE_INCREMENTAL', 2), \
+                mock.patch.object(ranking, '_recalcular', wraps=ranking._recalcular) as recalcular:
+            ranking.actualizar_posiciones({
+                (categoria, investigador_id)
+                for categoria in ('puntos_eventos', 'puntos_totales')
+                for investigador_id in investigador_ids
+            })
+
+        recalcular.assert_called_once_with(['puntos_eventos', 'puntos_totales'], ranking.BATCH_SIZE)
+        self._assert_coincide_con_recalculo()
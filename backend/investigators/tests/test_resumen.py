@@ -0,0 +1,79 @@
+import datetime
+from unittest import mock
+
+from django.test import TestCase
+from django.utils import timezone
+
+from investigators.models import Area, Investigador, Unidad
+from investigators.scoring.resumen import calcular_resumen, resumen_en_cache, version_puntajes
+from investigators.tests import datos
+
+class ResumenEnCacheTests(TestCase):
+    """
+    Invalidación de los resúmenes por área y por unidad guardados en la caché.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        datos.cargar_datos(cls)
+
+    def _mas_tarde(self, segundos):
+        """
+        Adelanta el reloj con el que la caché en base de datos decide si una clave caducó.
+        """
+        return mock.patch(
+            'django.core.cache.backends.db.tz_now',
+            return_value=timezone.now() + datetime.timedelta(seconds=segundos)
+        )
+
+    def _mover_sin_puntaje(self, investigador, area):
+        """
+        Cambia de área a un investigador inactivo: no se recalcula ningún puntaje, así que
+        solo la versión distingue el resumen nuevo del anterior.
+        """
+        with self.captureOnCommitCallbacks(execute=True):
+            investigador = Investigador.objects.get(pk=investigador.pk)
+            investigador.activo = False
+            investigador.area = area
+            investigador.save()
+
+    def test_cambio_de_area_invalida_el_resumen(self):
+        investigador = Investigador.objects.filter(puntaje__puntos_totales__gt=0).first()
+        otra_area = Area.objects.exclude(pk=investigador.area_id).first()
+        inicial = resumen_en_cache('area')
+
+        self._mover_sin_puntaje(investigador, otra_area)
+
+        self.assertNotEqual(calcular_resumen('area'), inicial)
+        self.assertEqual(resumen_en_cache('area'), calcular_resumen('area'))
+
+    def test_version_no_caduca_con_la_cache(self):
+        investigador = Investigador.objects.filter(puntaje__puntos_totales__gt=0).first()
+        area_original = investigador.area
+        otra_area = Area.objects.exclude(pk=area_original.pk).first()
+
+        inicial = resumen_en_cache('area')
+        self._mover_sin_puntaje(investigador, otra_area)
+        movido = resumen_en_cache('area')
+        self._mover_sin_puntaje(investigador, area_original)
+        self.assertEqual(resumen_en_cache('area'), inicial)
+        version = version_puntajes()
+
+        # Pasado el tiempo de vida por defecto de la caché (300 s) la versión se conserva
+        # y no vuelve a una con la que quedó guardado un resumen anterior
+        with self._mas_tarde(600):
+            self.assertEqual(version_puntajes(), version)
+            self.assertEqual(resumen_en_cache('area'), inicial)
+            self.assertNotEqual(resumen_en_cache('area'), movido)
+
+    def test_cambio_de_unidad_invalida_el_resumen(self):
+        area = Investigador.objects.filter(puntaje__puntos_totales__gt=0).first().area
+        otra_unidad = Unidad.objects.exclude(pk=area.unidad_id).first()
+        inicial = resumen_en_cache('unidad')
+
+        with self.captureOnCommitCallbacks(execute=True):
+            area.unidad = otra_unidad
+            area.save()
+
+        self.assertNotEqual(calcular_resumen('unidad'), inicial)
+        self.assertEqual(resumen_en_cache('unidad'), calcular_resumen('unidad'))
@@ -0,0 +1,198 @@
+import datetime
+import json
+import os
+import tempfile
+from unittest import mock
+
+from django.test import TestCase
+from django.utils import timezone
+
+from investigators.importacion.escritura import BATCH_SIZE, importar_lote
+from investigators.importacion.modelos import IMPORT_MODES
+from investigators.importacion.validacion import validar_lotes
+from investigators.models import Investigador, PuntajeInvestigador, Trabajo, Unidad
+from investigators.scoring.concurrencia import recalcular_investigadores
+from investigators.tests import datos
+from investigators.trabajos import ejecutar, encolar, tomar_siguiente
+
+class ConsultaDeTrabajosTests(TestCase):
+    """
+    Consulta del avance de los trabajos en segundo plano desde la API.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        datos.cargar_datos(cls)
+        cls.recalculo = encolar('recalcular_puntajes')
+        cls.importacion = encolar('importar_json', ruta='/srv/importaciones/respaldo.json')
+
+    def test_trabajo_de_recalculo_es_publico(self):
+        respuesta = self.client.get(f'/api/puntajes/jobs/{self.recalculo.pk}/')
+
+        self.assertEqual(respuesta.status_code, 200)
+        self.assertEqual(respuesta.json()['tipo'], 'recalcular_puntajes')
+
+    def test_trabajo_de_importacion_no_se_expone_como_recalculo(self):
+        respuesta = self.client.get(f'/api/puntajes/jobs/{self.importacion.pk}/')
+
+        self.assertEqual(respuesta.status_code, 404)
+        self.assertNotIn('respaldo.json', respuesta.content.decode())
+
+    def test_trabajo_de_importacion_requiere_administrador(self):
+        # El fixture incluye usuarios, así que ya no es una instancia vacía
+        respuesta = self.client.get(f'/api/import-json/jobs/{self.importacion.pk}/')
+
+        self.assertIn(respuesta.status_code, (401, 403))
+
+class RecalculoEnSegundoPlanTests(TestCase):
+    """
+    Trabajos de recálculo de puntajes: bloqueos compartidos con la API y trabajos detenidos.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        datos.cargar_datos(cls)
+
+    def _ejecutar_siguiente(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            trabajo = tomar_siguiente()
+            ejecutar(trabajo)
+        return Trabajo.objects.get(pk=trabajo.pk)
+
+    def _detener(self, trabajo, segundos):
+        """
+        Simula un trabajo 'En Proceso' cuyo último avance fue hace los segundos indicados.
+        """
+        hace = timezone.now() - datetime.timedelta(seconds=segundos)
+        Trabajo.objects.filter(pk=trabajo.pk).update(
+            estado='En Proceso', fecha_inicio=hace, fecha_actualizacion=hace, procesados=5
+        )
+
+    def test_recalculo_usa_los_bloqueos_de_los_recalculos_individuales(self):
+        activos = list(Investigador.objects.filter(activo=True).order_by('pk').values_list('pk', flat=True))
+        encolar('recalcular_puntajes', shard_size=5)
+        PuntajeInvestigador.objects.all().delete()
+
+        with mock.patch(
+            'investigators.trabajos.recalcular_investigadores', wraps=recalcular_investigadores
+        ) as recalcular:
+            trabajo = self._ejecutar_siguiente()
+
+        self.assertEqual(trabajo.estado, 'Completado')
+        self.assertEqual(
+            [list(llamada.args[0]) for llamada in recalcular.call_args_list],
+            [activos[inicio:inicio + 5] for inicio in range(0, len(activos), 5)]
+        )
+        self.assertEqual(
+            set(PuntajeInvestigador.objects.values_list('investigador_id', flat=True)), set(activos)
+        )
+
+    def test_trabajo_detenido_se_retoma_desde_el_principio(self):
+        trabajo = encolar('recalcular_puntajes')
+        with self.settings(IMPORTACION_INACTIVIDAD=600):
+            self._detener(trabajo, 601)
+            self.assertEqual(tomar_siguiente().pk, trabajo.pk)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            ejecutar(Trabajo.objects.get(pk=trabajo.pk))
+        trabajo = Trabajo.objects.get(pk=trabajo.pk)
+
+        self.assertEqual(trabajo.estado, 'Completado')
+        self.assertEqual(trabajo.procesados, trabajo.total)
+        self.assertEqual(trabajo.errores, [])
+        self.assertEqual(trabajo.resultado['fallas_anteriores'], [{'error': 'Sin avance durante 600 segundos'}])
+
+    def test_trabajo_con_avance_reciente_no_se_retoma(self):
+        trabajo = encolar('recalcular_puntajes')
+        with self.settings(IMPORTACION_INACTIVIDAD=600):
+            self._detener(trabajo, 60)
+            self.assertIsNone(tomar_siguiente())
+
+        self.assertEqual(Trabajo.objects.get(pk=trabajo.pk).estado, 'En Proceso')
+
+class ImportacionEnSegundoPlanTests(TestCase):
+    """
+    Trabajos de importación por bloques: avance, filas inválidas y reanudación.
+    """
+
+    def _unidades(self, *nombres):
+        return [
+            {'model': 'investigators.unidad', 'pk': 900 + i, 'fields': {'nombre': nombre}}
+            for i, nombre in enumerate(nombres)
+        ]
+
+    def _encolar(self, objetos, **parametros):
+        directorio = tempfile.TemporaryDirectory()
+        self.addCleanup(directorio.cleanup)
+        ruta = os.path.join(directorio.name, 'respaldo.json')
+        with open(ruta, 'w', encoding='utf-8') as archivo:
+            json.dump(objetos, archivo)
+        return encolar('importar_json', ruta=ruta, **parametros)
+
+    def _ejecutar_siguiente(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            trabajo = tomar_siguiente()
+            ejecutar(trabajo)
+        return Trabajo.objects.get(pk=trabajo.pk)
+
+    def test_fila_con_varios_campos_invalidos_cuenta_una_vez(self):
+        invalida = {'model': 'investigators.unidad', 'pk': 'abc', 'fields': {'nombre': 'Sin id'}}
+        varios_campos = {
+            'model': 'investigators.articulo', 'pk': 950,
+            'fields': {
+                'nombre_articulo': 'Artículo', 'pais_publicacion': 'México',
+                'fecha_publicacion': 'ayer', 'estado': 'Inexistente',
+            },
+        }
+        self._encolar(self._unidades('Norte', 'Sur') + [invalida, varios_campos])
+
+        trabajo = self._ejecutar_siguiente()
+
+        self.assertEqual(trabajo.estado, 'Completado')
+        self.assertEqual((trabajo.procesados, trabajo.total), (4, 4))
+        self.assertEqual(trabajo.porcentaje, 100.0)
+        # Un error por campo inválido, aunque las filas se cuenten una vez
+        self.assertEqual(len(trabajo.errores), 3)
+        self.assertEqual(
+            {punto.modelo: punto.procesados for punto in trabajo.puntos_control.all()},
+            {'investigators.unidad': 3, 'investigators.articulo': 1}
+        )
+
+    def test_reanudar_descarta_la_falla_de_la_ejecucion_anterior(self):
+        self._encolar(self._unidades('Norte', 'Centro', 'Sur'), chunk_size=1)
+        llamadas = []
+
+        def falla_en_el_segundo_bloque(*args, **kwargs):
+            llamadas.append(args)
+            resultado = importar_lote(*args, **kwargs)
+            if len(llamadas) == 2:
+                raise RuntimeError('boom')
+            return resultado
+
+        with mock.patch.dict(IMPORT_MODES, {'bulk': (falla_en_el_segundo_bloque, BATCH_SIZE)}):
+            trabajo = self._ejecutar_siguiente()
+
+        self.assertEqual(trabajo.estado, 'Error')
+        self.assertEqual(trabajo.procesados, 1)
+        self.assertEqual(trabajo.errores, [{'error': 'boom'}])
+        # El bloque fallido se revirtió completo
+        self.assertEqual(list(Unidad.objects.filter(pk__gte=900).values_list('nombre', flat=True)), ['Norte'])
+
+        Trabajo.objects.filter(pk=trabajo.pk).update(estado='Pendiente', fecha_fin=None)
+        trabajo = self._ejecutar_siguiente()
+
+        self.assertEqual(trabajo.estado, 'Completado')
+        self.assertEqual((trabajo.procesados, trabajo.total), (3, 3))
+        self.assertEqual(trabajo.errores, [])
+        self.assertEqual(trabajo.resultado['fallas_anteriores'], [{'error': 'boom'}])
+        self.assertEqual(trabajo.resultado['reanudado_desde'], 1)
+        self.assertEqual(Unidad.objects.filter(pk__gte=900).count(), 3)
+
+    def test_validacion_en_varios_procesos_coincide_con_un_proceso(self):
+        lotes = [
+            ('investigators.unidad', self._unidades('Norte', 'Sur')),
+            ('investigators.unidad', [{'model': 'investigators.unidad', 'pk': 'abc', 'fields': {'nombre': 'X'}}]),
+            ('investigators.unidad', self._unidades('Centro')),
+        ]
+
+        self.assertEqual(list(validar_lotes(lotes, procesos=2)), list(validar_lotes(lotes, procesos=1)))
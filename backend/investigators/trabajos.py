@@ -0,0 +1,262 @@
+import logging
+import os
+import uuid
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import Max
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from investigators.importacion import ObjetosPorModelo, leer_objetos
+from investigators.importacion.copia import copia_disponible
+from investigators.importacion.diferencias import clasificar
+from investigators.importacion.escritura import reiniciar_secuencias
+from investigators.importacion.validacion import procesos_para, validar_lotes
+from investigators.importacion.modelos import IMPORT_LEVELS, IMPORT_MODES, MODEL_MAPPING, MODEL_RELATIONSHIPS
+from investigators.models import Trabajo, Investigador, PuntoControlImportacion
+from investigators.scoring import puntajes_diferidos
+from investigators.scoring.concurrencia import recalcular_investigadores
+from investigators.scoring.ranking import actualizar_ranking, ranking_diferido
+
+logger = logging.getLogger(__name__)
+
+# Cantidad máxima de errores guardados en cada trabajo
+MAX_ERRORES = 100
+
+# Filas del fixture que se importan en cada transacción de un trabajo de importación
+IMPORT_CHUNK_SIZE = 5000
+
+def encolar(tipo, **parametros):
+    """
+    Crea un trabajo pendiente que ejecutará el comando procesar_trabajos.
+    Retorna el objeto Trabajo creado.
+    """
+    return Trabajo.objects.create(tipo=tipo, parametros=parametros)
+
+def detenidos():
+    """
+    Retorna los trabajos 'En Proceso' sin avance durante IMPORTACION_INACTIVIDAD segundos,
+    por ejemplo porque el proceso procesar_trabajos que los ejecutaba se detuvo.
+    """
+    limite = timezone.now() - timedelta(seconds=settings.IMPORTACION_INACTIVIDAD)
+    return Trabajo.objects.filter(estado='En Proceso').alias(
+        ultima=Coalesce('fecha_actualizacion', 'fecha_inicio')
+    ).filter(ultima__lt=limite)
+
+def tomar_siguiente():
+    """
+    Toma el trabajo pendiente más antiguo y lo marca como en proceso.
+
+    Antes vuelve a la cola los trabajos detenidos (ver detenidos), que se retoman como
+    cualquier otro: una importación continúa desde su último bloque confirmado y un
+    recálculo empieza de nuevo.
+
+    En PostgreSQL usa SELECT ... FOR UPDATE SKIP LOCKED, de modo que varios procesos
+    procesar_trabajos pueden consultar la cola a la vez sin tomar el mismo trabajo.
+    Retorna None si no hay trabajos pendientes.
+    """
+    with transaction.atomic():
+        for trabajo in detenidos().select_for_update():
+            logger.warning(
+                "Trabajo %s sin avance desde %s; se vuelve a encolar",
+                trabajo.pk, trabajo.fecha_actualizacion or trabajo.fecha_inicio
+            )
+            if len(trabajo.errores) < MAX_ERRORES:
+                trabajo.errores.append({'error': f'Sin avance durante {settings.IMPORTACION_INACTIVIDAD} segundos'})
+            trabajo.estado = 'Pendiente'
+            trabajo.save(update_fields=['estado', 'errores'])
+
+        pendientes = Trabajo.objects.filter(estado='Pendiente').order_by('id')
+        if connection.features.has_select_for_update_skip_locked:
+            pendientes = pendientes.select_for_update(skip_locked=True)
+        trabajo = pendientes.first()
+        if trabajo is None:
+            return None
+        trabajo.estado = 'En Proceso'
+        trabajo.fecha_inicio = trabajo.fecha_actualizacion = timezone.now()
+        trabajo.save(update_fields=['estado', 'fecha_inicio', 'fecha_actualizacion'])
+    return trabajo
+
+def registrar_avance(trabajo, procesados=0, error=None):
+    """
+    Suma elementos procesados y, si se indica, un error al trabajo y guarda el avance.
+    """
+    trabajo.procesados += procesados
+    if error is not None and len(trabajo.errores) < MAX_ERRORES:
+        trabajo.errores.append(error)
+    trabajo.fecha_actualizacion = timezone.now()
+    trabajo.save(update_fields=['procesados', 'errores', 'fecha_actualizacion'])
+
+def ultima_actividad(trabajo):
+    """
+    Retorna el momento del último avance registrado de un trabajo: el último punto de
+    control guardado o, si todavía no hay ninguno, el inicio de la ejecución.
+    """
+    ultimo = trabajo.puntos_control.aggregate(ultimo=Max('fecha_actualizacion'))['ultimo']
+    return max(filter(None, [ultimo, trabajo.fecha_actualizacion, trabajo.fecha_inicio]), default=None)
+
+def ejecutar(trabajo):
+    """
+    Ejecuta un trabajo ya tomado de la cola y guarda su estado final.
+    Una excepción no controlada marca el trabajo con estado 'Error'.
+    """
+    try:
+        EJECUTORES[trabajo.tipo](trabajo)
+    except Exception as e:
+        logger.exception("Error en el trabajo %s", trabajo.pk)
+        # Descarta el avance y los errores en memoria de la transacción revertida
+        trabajo.refresh_from_db(fields=['procesados', 'errores'])
+        trabajo.estado = 'Error'
+        if len(trabajo.errores) < MAX_ERRORES:
+            trabajo.errores.append({'error': str(e)})
+    else:
+        # Solo es un error si ninguna parte del trabajo se pudo completar
+        trabajo.estado = 'Error' if trabajo.errores and not trabajo.procesados else 'Completado'
+    trabajo.fecha_fin = timezone.now()
+    trabajo.save(update_fields=['estado', 'errores', 'resultado', 'fecha_fin'])
+
+def recalcular_puntajes(trabajo):
+    """
+    Recalcula los puntajes de los investigadores activos por rangos de ids.
+
+    Cada rango se guarda en su propia transacción con recalcular_investigadores, que
+    toma los mismos bloqueos por investigador que los recálculos pedidos desde la API,
+    y actualiza el avance del trabajo; si un rango falla se registra el error y se
+    continúa con el siguiente. El ranking se actualiza una sola vez al final, con las
+    categorías que cambiaron. Un trabajo retomado empieza de nuevo desde el primer rango.
+    Parámetros del trabajo: shard_size (investigadores por rango, 1000 por defecto).
+    """
+    shard_size = trabajo.parametros.get('shard_size', 1000)
+    ids = list(Investigador.objects.filter(activo=True).order_by('pk').values_list('pk', flat=True))
+    trabajo.total = len(ids)
+    trabajo.procesados = 0
+    if trabajo.errores:
+        # Errores de una ejecución anterior que se detuvo
+        trabajo.resultado = dict(trabajo.resultado, fallas_anteriores=trabajo.errores)
+        trabajo.errores = []
+    trabajo.save(update_fields=['total', 'procesados', 'errores', 'resultado'])
+
+    with ranking_diferido() as categorias:
+        for inicio in range(0, len(ids), shard_size):
+            lote = ids[inicio:inicio + shard_size]
+            try:
+                recalcular_investigadores(lote)
+            except Exception as e:
+                logger.exception("Error recalculando los investigadores %s a %s", lote[0], lote[-1])
+                registrar_avance(trabajo, error={'desde': lote[0], 'hasta': lote[-1], 'error': str(e)})
+            else:
+                registrar_avance(trabajo, procesados=len(lote))
+    actualizar_ranking(categorias)
+
+    trabajo.resultado = dict(trabajo.resultado, investigadores=trabajo.procesados)
+
+def guardar_archivo(archivo):
+    """
+    Copia por fragmentos un archivo subido al directorio de importaciones y retorna su ruta.
+    """
+    os.makedirs(settings.IMPORTACIONES_DIR, exist_ok=True)
+    ruta = os.path.join(settings.IMPORTACIONES_DIR, f'{uuid.uuid4().hex}.json')
+    with open(ruta, 'wb') as destino:
+        for fragmento in archivo.chunks():
+            destino.write(fragmento)
+    return ruta
+
+def _importar_bloque(trabajo, punto, Model, items, invalidos, import_batch, batch_size, incremental):
+    """
+    Importa un bloque de filas ya validadas de un modelo y guarda su punto de control y
+    el avance del trabajo en la misma transacción. Las filas que no pasaron la validación
+    (invalidos) se cuentan como errores. Los puntajes afectados se recalculan al confirmarla.
+    """
+    relations = MODEL_RELATIONSHIPS[punto.modelo]
+    with transaction.atomic(), puntajes_diferidos():
+        pendientes = items
+        if incremental:
+            nuevos, modificados, _ = clasificar(Model, items, relations)
+            pendientes = nuevos + modificados
+        count, errors, missing = import_batch(Model, pendientes, relations, batch_size) if pendientes else (0, [], {})
+        errors = [f"ID {pk}: {campo}: {mensaje}" for pk, campo, mensaje in invalidos] + errors
+
+        # invalidos tiene un error por campo: una fila con varios campos inválidos cuenta una vez
+        rechazados = len({pk for pk, _, _ in invalidos})
+        punto.bloques += 1
+        punto.procesados += len(items) + rechazados
+        punto.importados += count
+        punto.errores += len(errors)
+        for field_name, ids in missing.items():
+            punto.referencias_faltantes[field_name] = punto.referencias_faltantes.get(field_name, 0) + len(ids)
+        punto.save()
+
+        for error in errors[:max(0, MAX_ERRORES - len(trabajo.errores))]:
+            trabajo.errores.append({'modelo': punto.modelo, 'error': error})
+        registrar_avance(trabajo, procesados=len(items) + rechazados)
+
+def importar_json(trabajo):
+    """
+    Importa un fixture JSON guardado con guardar_archivo.
+
+    El archivo se agrupa por modelo como en la importación directa y se procesa en
+    bloques de chunk_size filas, que se validan en paralelo (ver validar_lotes) y se
+    importan por niveles de dependencia. Cada bloque se confirma en su propia transacción
+    junto con su PuntoControlImportacion, así que una falla solo revierte el bloque en
+    curso y al reanudar el trabajo se omiten los bloques ya confirmados. El archivo se elimina cuando el trabajo termina.
+    Parámetros del trabajo: ruta, mode ('bulk' o 'copy'), incremental y chunk_size
+    (5000 por defecto).
+    """
+    parametros = trabajo.parametros
+    mode = parametros.get('mode', 'bulk')
+    if mode == 'copy' and not copia_disponible():
+        mode = 'bulk'
+    import_batch, batch_size = IMPORT_MODES[mode]
+    chunk_size = parametros.get('chunk_size', IMPORT_CHUNK_SIZE)
+
+    with open(parametros['ruta'], 'rb') as archivo, ObjetosPorModelo() as objetos:
+        for item in leer_objetos(archivo):
+            if isinstance(item, dict) and item.get('model') in MODEL_MAPPING and 'pk' in item and 'fields' in item:
+                objetos.agregar(item['model'], item)
+
+        # Al reanudar se conservan los puntos de control de la ejecución anterior
+        puntos = {punto.modelo: punto for punto in trabajo.puntos_control.all()}
+        for model_name, total in objetos.cantidades.items():
+            if model_name not in puntos:
+                puntos[model_name] = PuntoControlImportacion.objects.create(
+                    trabajo=trabajo, modelo=model_name, total=total
+                )
+        trabajo.total = sum(punto.total for punto in puntos.values())
+        trabajo.procesados = sum(punto.procesados for punto in puntos.values())
+        # Filas confirmadas antes de esta ejecución, para calcular la velocidad actual
+        trabajo.resultado = dict(trabajo.resultado, mode=mode, reanudado_desde=trabajo.procesados)
+        # Los errores sin modelo son la falla que detuvo una ejecución anterior: se guardan
+        # aparte y solo se conservan como errores los de las filas de bloques confirmados
+        fallas = [error for error in trabajo.errores if 'modelo' not in error]
+        if fallas:
+            trabajo.resultado['fallas_anteriores'] = trabajo.resultado.get('fallas_anteriores', []) + fallas
+            trabajo.errores = [error for error in trabajo.errores if 'modelo' in error]
+        trabajo.save(update_fields=['total', 'procesados', 'errores', 'resultado'])
+
+        # Los bloques ya confirmados en una ejecución anterior no se vuelven a validar
+        confirmados = {model_name: punto.bloques for model_name, punto in puntos.items()}
+        bloques = (
+            (model_name, items)
+            for level in IMPORT_LEVELS for model_name in level if model_name in puntos
+            for indice, items in enumerate(objetos.lotes(model_name, chunk_size))
+            if indice >= confirmados[model_name]
+        )
+        procesos = procesos_para(trabajo.total - trabajo.procesados)
+        for model_name, items, invalidos in validar_lotes(bloques, procesos):
+            _importar_bloque(
+                trabajo, puntos[model_name], MODEL_MAPPING[model_name], items, invalidos,
+                import_batch, batch_size, parametros.get('incremental', False)
+            )
+
+    # Los ids explícitos no avanzan las secuencias de PostgreSQL
+    reiniciar_secuencias([MODEL_MAPPING[model_name] for model_name in puntos])
+    trabajo.resultado['imported_counts'] = {model_name: punto.importados for model_name, punto in puntos.items()}
+    os.remove(parametros['ruta'])
+
+# Tipo de trabajo: función que lo ejecuta
+EJECUTORES = {
+    'recalcular_puntajes': recalcular_puntajes,
+    'importar_json': importar_json,
+}
@@ -25,7 +25,7 @@ from .views import (
     TokenLogoutView,
     PuntajeInvestigadorViewSet,
 )
-from .views.import_view import JSONImportView
+from .views.import_view import JSONImportView, ImportJobView, ImportJobResumeView
 
 # Router para crear automáticamente URLs para las vistas basadas en ViewSets
 router = DefaultRouter(trailing_slash=True)
@@ -58,4 +58,6 @@ urlpatterns = [
     path('api/token/refresh/', TokenRefreshView.as_view(), name='token_refresh'),  # Endpoint para refrescar token expirado
     path('api/token/logout/', TokenLogoutView.as_view(), name='token_logout'),  # Endpoint para cerrar sesión (invalidar token)
     path('api/import-json/', JSONImportView.as_view(), name='import-json'),  # Endpoint para importar datos desde JSON
+    path('api/import-json/jobs/<int:job_id>/', ImportJobView.as_view(), name='import-json-job'),  # Avance de un trabajo de importación
+    path('api/import-json/jobs/<int:job_id>/resume/', ImportJobResumeView.as_view(), name='import-json-job-resume'),  # Reanuda un trabajo de importación
 ]
@@ -1,115 +1,84 @@
-import json
 from rest_framework.views import APIView
 from rest_framework.parsers import MultiPartParser
 from rest_framework.response import Response
 from rest_framework import status
 from django.db import transaction
+from django.shortcuts import get_object_or_404
+from django.utils import timezone
 from drf_spectacular.utils import extend_schema, OpenApiParameter, OpenApiResponse
 from django.apps import apps
+from django.conf import settings
+from datetime import timedelta
 
-from investigators.models import (
-    Unidad, Area, Especialidad, NivelEducacion, NivelSNII, Carrera,
-    TipoEstudiante, Investigador, JefeArea, Estudiante, Linea, DetLinea,
-    TipoHerramienta, Herramienta, Proyecto, DetProyecto, DetHerramienta,
-    Articulo, DetArticulo, TipoEvento, RolEvento, Evento, DetEvento, Usuario,
-    PuntajeInvestigador
-)
+from investigators.importacion import FormatoInvalido, ObjetosPorModelo, leer_objetos
+from investigators.importacion.diferencias import clasificar
+from investigators.importacion.copia import copia_disponible
+from investigators.importacion.escritura import reiniciar_secuencias
+from investigators.importacion.validacion import procesos_para, validar_lotes
+from investigators.importacion.modelos import IMPORT_LEVELS, IMPORT_MODES, MODEL_MAPPING, MODEL_RELATIONSHIPS
+from investigators.models import Trabajo
+from investigators.permissions import IsAdminOrInitialRestore
+from investigators.scoring import puntajes_diferidos
+from investigators.serializers.trabajo_serializer import PuntoControlImportacionSerializer, TrabajoSerializer
+from investigators.trabajos import encolar, guardar_archivo, ultima_actividad, IMPORT_CHUNK_SIZE
 
-MODEL_MAPPING = {
-    'investigators.unidad': Unidad,
-    'investigators.area': Area,
-    'investigators.especialidad': Especialidad,
-    'investigators.niveleducacion': NivelEducacion,
-    'investigators.nivelsnii': NivelSNII,
-    'investigators.carrera': Carrera,
-    'investigators.tipoestudiante': TipoEstudiante,
-    'investigators.investigador': Investigador,
-    'investigators.jefearea': JefeArea,
-    'investigators.estudiante': Estudiante,
-    'investigators.linea': Linea,
-    'investigators.detlinea': DetLinea,
-    'investigators.tipoherramienta': TipoHerramienta,
-    'investigators.herramienta': Herramienta,
-    'investigators.proyecto': Proyecto,
-    'investigators.detproyecto': DetProyecto,
-    'investigators.detherramienta': DetHerramienta,
-    'investigators.articulo': Articulo,
-    'investigators.detarticulo': DetArticulo,
-    'investigators.tipoevento': TipoEvento,
-    'investigators.rolevento': RolEvento,
-    'investigators.evento': Evento,
-    'investigators.detevento': DetEvento,
-    'investigators.usuario': Usuario,
-    'investigators.puntajeinvestigador': PuntajeInvestigador,
-}
+# Cantidad máxima de ids inexistentes listados por campo en la respuesta
+MAX_MISSING_IDS = 100
 
-# Define relaciones entre modelos para la importación
-MODEL_RELATIONSHIPS = {
-    'investigators.area': {
-        'unidad': ('investigators.unidad', Unidad),
-    },
-    'investigators.investigador': {
-        'area': ('investigators.area', Area),
-        'nivel_edu': ('investigators.niveleducacion', NivelEducacion),
-        'especialidad': ('investigators.especialidad', Especialidad),
-        'nivel_snii': ('investigators.nivelsnii', NivelSNII),
-    },
-    'investigators.jefearea': {
-        'area': ('investigators.area', Area),
-        'investigador': ('investigators.investigador', Investigador),
-    },
-    'investigators.estudiante': {
-        'tipo_estudiante': ('investigators.tipoestudiante', TipoEstudiante),
-        'carrera': ('investigators.carrera', Carrera),
-        'investigador': ('investigators.investigador', Investigador),
-        'area': ('investigators.area', Area),
-    },
-    'investigators.detlinea': {
-        'linea': ('investigators.linea', Linea),
-        'investigador': ('investigators.investigador', Investigador),
-    },
-    'investigators.herramienta': {
-        'tipo_herramienta': ('investigators.tipoherramienta', TipoHerramienta),
-    },
-    'investigators.proyecto': {
-        'lider': ('investigators.investigador', Investigador),
-    },
-    'investigators.detproyecto': {
-        'proyecto': ('investigators.proyecto', Proyecto),
-        'investigador': ('investigators.investigador', Investigador),
-    },
-    'investigators.detherramienta': {
-        'proyecto': ('investigators.proyecto', Proyecto),
-        'herramienta': ('investigators.herramienta', Herramienta),
-    },
-    'investigators.detarticulo': {
-        'articulo': ('investigators.articulo', Articulo),
-        'investigador': ('investigators.investigador', Investigador),
-    },
-    'investigators.evento': {
-        'tipo_evento': ('investigators.tipoevento', TipoEvento),
-    },
-    'investigators.detevento': {
-        'evento': ('investigators.evento', Evento),
-        'investigador': ('investigators.investigador', Investigador),
-        'rol_evento': ('investigators.rolevento', RolEvento),
-    },
-    'investigators.usuario': {
-        'investigador': ('investigators.investigador', Investigador),
-        'estudiante': ('investigators.estudiante', Estudiante),
-    },
-    'investigators.puntajeinvestigador': {
-        'investigador': ('investigators.investigador', Investigador),
-    },
-}
+# Cantidad máxima de mensajes de validación distintos listados por campo en la respuesta
+MAX_INVALID_MESSAGES = 5
+
+# Valores aceptados como verdadero en los parámetros dry_run, incremental y background
+TRUE_VALUES = ('1', 'true', 'yes')
 
 class JSONImportView(APIView):
     parser_classes = [MultiPartParser]
-    permission_classes = []  # Permitir acceso sin autenticación para pruebas iniciales
+    permission_classes = [IsAdminOrInitialRestore]
     
     @extend_schema(
         summary="Importar datos desde archivo JSON",
         description="Permite importar datos a la base de datos desde un archivo JSON con formato de Django fixtures",
+        parameters=[
+            OpenApiParameter(
+                name="mode",
+                description=(
+                    "'bulk' (por defecto) escribe con bulk_create/bulk_update; 'copy' carga cada lote con "
+                    "COPY en una tabla temporal y lo fusiona con INSERT ... ON CONFLICT (solo PostgreSQL, "
+                    "en otras bases de datos se usa 'bulk')"
+                ),
+                required=False, type=str
+            ),
+            OpenApiParameter(
+                name="dry_run",
+                description=(
+                    "Si es 1, compara el archivo con la base de datos sin escribir nada e informa por "
+                    "modelo cuántos objetos se insertarían, se actualizarían o no cambian"
+                ),
+                required=False, type=bool
+            ),
+            OpenApiParameter(
+                name="incremental",
+                description=(
+                    "Si es 1, solo escribe los objetos nuevos y aquellos cuyos campos difieren de la "
+                    "fila guardada; los que no cambian se omiten"
+                ),
+                required=False, type=bool
+            ),
+            OpenApiParameter(
+                name="background",
+                description=(
+                    "Si es 1, guarda el archivo y encola un trabajo que lo importa en bloques de chunk_size "
+                    "filas, cada uno en su propia transacción. Responde 202 con el id del trabajo; el avance "
+                    "se consulta en jobs/{id}/ y un trabajo fallido se reanuda con jobs/{id}/resume/"
+                ),
+                required=False, type=bool
+            ),
+            OpenApiParameter(
+                name="chunk_size",
+                description=f"Filas por transacción en los trabajos en segundo plano (por defecto {IMPORT_CHUNK_SIZE})",
+                required=False, type=int
+            ),
+        ],
         tags=["Importación"],
         request={
             'multipart/form-data': {
@@ -121,148 +90,165 @@ class JSONImportView(APIView):
             }
         },
         responses={
+            200: OpenApiResponse(description="Resultado de la simulación (dry_run)"),
             201: OpenApiResponse(description="Datos importados correctamente"),
+            202: OpenApiResponse(description="Trabajo de importación encolado (background)"),
             400: OpenApiResponse(description="Error en el formato del archivo"),
             500: OpenApiResponse(description="Error interno del servidor")
         }
     )
     @transaction.atomic
+    @puntajes_diferidos()  # Un solo recálculo de los investigadores afectados al confirmar
     def post(self, request):
         try:
             json_file = request.FILES.get('file')
             if not json_file:
                 return Response({"detail": "No se recibió ningún archivo"}, status=status.HTTP_400_BAD_REQUEST)
             
-            try:
-                # Decodificar el contenido del archivo
-                content = json_file.read().decode('utf-8')
-                # Eliminar comentarios de tipo línea si existen (como en el archivo test_data.json)
-                content_lines = content.split('\n')
-                cleaned_lines = [line for line in content_lines if not line.strip().startswith('//')]
-                cleaned_content = '\n'.join(cleaned_lines)
-                
-                data = json.loads(cleaned_content)
-            except json.JSONDecodeError as e:
-                return Response({
-                    "detail": f"El archivo no contiene JSON válido: {str(e)}"
-                }, status=status.HTTP_400_BAD_REQUEST)
-            
-            if not isinstance(data, list):
-                return Response({"detail": "El JSON debe ser una lista de objetos"}, status=status.HTTP_400_BAD_REQUEST)
+            mode = request.query_params.get('mode', 'bulk')
+            if mode not in IMPORT_MODES:
+                return Response(
+                    {"detail": f"Modo desconocido: {mode}. Use 'bulk' o 'copy'"},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+            if mode == 'copy' and not copia_disponible():
+                mode = 'bulk'
+            import_batch, batch_size = IMPORT_MODES[mode]
+            dry_run = request.query_params.get('dry_run', '').lower() in TRUE_VALUES
+            incremental = request.query_params.get('incremental', '').lower() in TRUE_VALUES
             
-            # Agrupar los objetos por modelo para una importación ordenada
-            objects_by_model = {}
-            for item in data:
-                if 'model' not in item or 'pk' not in item or 'fields' not in item:
-                    continue
-                    
-                model_name = item['model']
-                if model_name not in objects_by_model:
-                    objects_by_model[model_name] = []
-                    
-                objects_by_model[model_name].append(item)
+            if request.query_params.get('background', '').lower() in TRUE_VALUES and not dry_run:
+                # El archivo se importa fuera del proceso web, en transacciones por bloque
+                try:
+                    chunk_size = int(request.query_params.get('chunk_size', IMPORT_CHUNK_SIZE))
+                    if chunk_size < 1:
+                        raise ValueError
+                except ValueError:
+                    return Response(
+                        {"detail": "chunk_size debe ser un entero positivo"}, status=status.HTTP_400_BAD_REQUEST
+                    )
+                trabajo = encolar(
+                    'importar_json', ruta=guardar_archivo(json_file), mode=mode,
+                    incremental=incremental, chunk_size=chunk_size
+                )
+                return Response({
+                    "detail": "Importación encolada",
+                    "job_id": trabajo.pk,
+                    "job": TrabajoSerializer(trabajo).data
+                }, status=status.HTTP_202_ACCEPTED)
             
-            # Orden de importación para respetar las dependencias
-            import_order = [
-                'investigators.unidad',
-                'investigators.area',
-                'investigators.especialidad',
-                'investigators.niveleducacion',
-                'investigators.nivelsnii',
-                'investigators.carrera', 
-                'investigators.tipoestudiante',
-                'investigators.tipoherramienta',
-                'investigators.tipoevento',
-                'investigators.rolevento',
-                'investigators.investigador',
-                'investigators.herramienta',
-                'investigators.linea',
-                'investigators.jefearea',
-                'investigators.estudiante',
-                'investigators.proyecto',
-                'investigators.articulo',
-                'investigators.evento',
-                'investigators.detlinea',
-                'investigators.detproyecto',
-                'investigators.detherramienta',
-                'investigators.detarticulo',
-                'investigators.detevento',
-                'investigators.usuario',
-                'investigators.puntajeinvestigador',
-            ]
+            # Agrupar los objetos por modelo para una importación ordenada. El archivo se lee
+            # de forma incremental y cada modelo se guarda en un archivo temporal, así que
+            # la memoria depende del tamaño del lote y no del tamaño del archivo
+            objects_by_model = ObjetosPorModelo()
+            try:
+                for item in leer_objetos(json_file):
+                    if not isinstance(item, dict) or 'model' not in item or 'pk' not in item or 'fields' not in item:
+                        continue
+                    objects_by_model.agregar(item['model'], item)
+            except FormatoInvalido as e:
+                objects_by_model.cerrar()
+                return Response({"detail": str(e)}, status=status.HTTP_400_BAD_REQUEST)
             
             imported_counts = {}
             skipped_items = {}
+            missing_references = {}
+            changes = {}
+            invalid_items = {}
             
-            # Importar en el orden correcto
-            for model_name in import_order:
-                if model_name not in objects_by_model:
-                    continue
+            # Los lotes se validan en paralelo (ver validar_lotes) y se escriben en orden por
+            # niveles de dependencia: un modelo se importa después de los modelos a los que apunta
+            with objects_by_model:
+                batches = (
+                    (model_name, items)
+                    for level in IMPORT_LEVELS for model_name in level if model_name in objects_by_model
+                    for items in objects_by_model.lotes(model_name, batch_size)
+                )
+                processes = procesos_para(sum(objects_by_model.cantidades.values()))
+                for model_name, items, invalid in validar_lotes(batches, processes):
+                    Model = MODEL_MAPPING[model_name]
+                    relations = MODEL_RELATIONSHIPS[model_name]
+                    if not dry_run:
+                        imported_counts.setdefault(model_name, 0)
                     
-                Model = MODEL_MAPPING.get(model_name)
-                if not Model:
-                    continue
+                    # Errores de validación agrupados por modelo y campo
+                    for pk, field_name, message in invalid:
+                        field_errors = invalid_items.setdefault(model_name, {}).setdefault(
+                            field_name, {"ids": [], "messages": set()}
+                        )
+                        field_errors["ids"].append(pk)
+                        field_errors["messages"].add(message)
                     
-                items = objects_by_model[model_name]
-                imported_count = 0
-                skipped_count = 0
-                
-                for item in items:
-                    try:
-                        pk = item['pk']
-                        fields = item['fields'].copy()
-                        
-                        # Manejar elipsis (...) en campos que pueden ser resúmenes
-                        for field, value in fields.items():
-                            if value == "…" or value == "{…}":
-                                if field in MODEL_RELATIONSHIPS.get(model_name, {}):
-                                    fields[field] = None
-                                else:
-                                    fields[field] = ""
-                        
-                        # Procesar las relaciones (ForeignKey)
-                        if model_name in MODEL_RELATIONSHIPS:
-                            relationships = MODEL_RELATIONSHIPS[model_name]
-                            for field_name, (related_model_name, RelatedModel) in relationships.items():
-                                if field_name in fields and fields[field_name] is not None:
-                                    try:
-                                        # Buscar la instancia relacionada por su ID
-                                        related_id = fields[field_name]
-                                        related_instance = RelatedModel.objects.get(pk=related_id)
-                                        fields[field_name] = related_instance
-                                    except RelatedModel.DoesNotExist:
-                                        # Si no existe la relación, establece None
-                                        fields[field_name] = None
-                        
-                        # Verificar si el objeto ya existe
-                        existing_obj = Model.objects.filter(pk=pk).first()
-                        
-                        if existing_obj:
-                            # Actualizar objeto existente
-                            for field_name, value in fields.items():
-                                if hasattr(existing_obj, field_name):
-                                    setattr(existing_obj, field_name, value)
-                            existing_obj.save()
-                        else:
-                            # Crear nuevo objeto
-                            Model.objects.create(id=pk, **fields)
-                        
-                        imported_count += 1
-                    except Exception as e:
-                        skipped_count += 1
-                        if model_name not in skipped_items:
-                            skipped_items[model_name] = []
-                        skipped_items[model_name].append(f"ID {pk}: {str(e)}")
-                
-                imported_counts[model_name] = imported_count
+                    if dry_run or incremental:
+                        # Solo se escriben los objetos nuevos o con campos distintos a la fila guardada
+                        new, modified, unchanged = clasificar(Model, items, relations)
+                        model_changes = changes.setdefault(model_name, {"insert": 0, "update": 0, "unchanged": 0})
+                        model_changes["insert"] += len(new)
+                        model_changes["update"] += len(modified)
+                        model_changes["unchanged"] += len(unchanged)
+                        items = new + modified
+                    if dry_run or not items:
+                        continue
+                    
+                    count, errors, missing = import_batch(Model, items, relations)
+                    imported_counts[model_name] += count
+                    if errors:
+                        skipped_items.setdefault(model_name, []).extend(errors)
+                    for field_name, ids in missing.items():
+                        missing_references.setdefault(model_name, {}).setdefault(field_name, set()).update(ids)
+            
+            # Errores de validación: cantidad, primeros ids y mensajes distintos por campo
+            invalid_items = {
+                model_name: {
+                    field_name: {
+                        "count": len(errors["ids"]),
+                        "ids": errors["ids"][:MAX_MISSING_IDS],
+                        "messages": sorted(errors["messages"])[:MAX_INVALID_MESSAGES]
+                    }
+                    for field_name, errors in fields.items()
+                }
+                for model_name, fields in invalid_items.items()
+            }
+            
+            if dry_run:
+                response = {
+                    "detail": "Simulación completada; no se escribió ningún dato",
+                    "dry_run": True,
+                    "levels": IMPORT_LEVELS,
+                    "changes": changes
+                }
+                if invalid_items:
+                    response["invalid_items"] = invalid_items
+                return Response(response, status=status.HTTP_200_OK)
+            
+            # Los ids explícitos no avanzan las secuencias de PostgreSQL
+            reiniciar_secuencias([MODEL_MAPPING[model_name] for model_name in imported_counts])
             
             response_data = {
                 "detail": "Importación completada con éxito",
+                "mode": mode,
                 "imported_counts": imported_counts
             }
             
+            if incremental:
+                response_data["changes"] = changes
+            
             if skipped_items:
                 response_data["skipped_items"] = skipped_items
+            
+            if invalid_items:
+                # Objetos que no pasaron la validación y no se escribieron
+                response_data["invalid_items"] = invalid_items
+            
+            if missing_references:
+                # Referencias a filas inexistentes, que se importaron como None
+                response_data["missing_references"] = {
+                    model_name: {
+                        field_name: {"count": len(ids), "ids": sorted(ids)[:MAX_MISSING_IDS]}
+                        for field_name, ids in fields.items()
+                    }
+                    for model_name, fields in missing_references.items()
+                }
                 
             return Response(response_data, status=status.HTTP_201_CREATED)
             
@@ -273,3 +259,86 @@ class JSONImportView(APIView):
             return Response({
                 "detail": f"Error durante la importación: {str(e)}"
             }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+class ImportJobView(APIView):
+    permission_classes = [IsAdminOrInitialRestore]
+    
+    @extend_schema(
+        summary="Consultar trabajo de importación",
+        description=(
+            "Retorna el estado del trabajo, las filas por segundo de la ejecución en curso y el avance "
+            "de cada modelo según sus puntos de control"
+        ),
+        tags=["Importación"],
+        responses={200: OpenApiResponse(description="Estado del trabajo"), 404: OpenApiResponse(description="No existe")}
+    )
+    def get(self, request, job_id):
+        trabajo = get_object_or_404(Trabajo, pk=job_id, tipo='importar_json')
+        
+        # Las filas confirmadas en ejecuciones anteriores no cuentan para la velocidad
+        rows_per_second = 0.0
+        if trabajo.fecha_inicio is not None:
+            duracion = ((trabajo.fecha_fin or timezone.now()) - trabajo.fecha_inicio).total_seconds()
+            filas = trabajo.procesados - trabajo.resultado.get('reanudado_desde', 0)
+            rows_per_second = round(filas / duracion, 1) if duracion > 0 else 0.0
+        
+        return Response({
+            "job": TrabajoSerializer(trabajo).data,
+            "rows_per_second": rows_per_second,
+            "models": PuntoControlImportacionSerializer(trabajo.puntos_control.order_by('id'), many=True).data
+        })
+
+class ImportJobResumeView(APIView):
+    permission_classes = [IsAdminOrInitialRestore]
+    
+    @extend_schema(
+        summary="Reanudar trabajo de importación",
+        description=(
+            "Vuelve a encolar un trabajo de importación con estado 'Error', o 'En Proceso' si el proceso "
+            "que lo ejecutaba se detuvo (sin avance durante IMPORTACION_INACTIVIDAD segundos). "
+            "Continúa a partir del último bloque confirmado"
+        ),
+        tags=["Importación"],
+        request=None,
+        responses={
+            202: OpenApiResponse(description="Trabajo encolado de nuevo"),
+            400: OpenApiResponse(description="El trabajo no se puede reanudar"),
+            404: OpenApiResponse(description="No existe"),
+            409: OpenApiResponse(description="El estado del trabajo cambió mientras se reanudaba")
+        }
+    )
+    def post(self, request, job_id):
+        trabajo = get_object_or_404(Trabajo, pk=job_id, tipo='importar_json')
+        if trabajo.estado not in ('Error', 'En Proceso'):
+            return Response(
+                {"detail": f"Solo se reanudan trabajos con error o detenidos; estado actual: {trabajo.estado}"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        if trabajo.estado == 'En Proceso':
+            # Un trabajo que sigue avanzando lo está ejecutando otro proceso
+            ultima = ultima_actividad(trabajo)
+            limite = timezone.now() - timedelta(seconds=settings.IMPORTACION_INACTIVIDAD)
+            if ultima is not None and ultima > limite:
+                return Response(
+                    {"detail": (
+                        f"El trabajo sigue en proceso (último avance: {ultima.isoformat()}); solo se reanuda "
+                        f"si no avanza durante {settings.IMPORTACION_INACTIVIDAD} segundos"
+                    )},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+        
+        # La actualización condicional evita que dos pedidos simultáneos lo encolen dos veces
+        reanudado = Trabajo.objects.filter(pk=trabajo.pk, estado=trabajo.estado).update(
+            estado='Pendiente', fecha_fin=None
+        )
+        if not reanudado:
+            return Response(
+                {"detail": "El estado del trabajo cambió mientras se reanudaba; consulte su estado e intente de nuevo"},
+                status=status.HTTP_409_CONFLICT
+            )
+        trabajo.refresh_from_db()
+        return Response({
+            "detail": "Importación encolada de nuevo",
+            "job_id": trabajo.pk,
+            "job": TrabajoSerializer(trabajo).data
+        }, status=status.HTTP_202_ACCEPTED)
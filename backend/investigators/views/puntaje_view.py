@@ -1,16 +1,38 @@
 from rest_framework import viewsets, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
-from drf_spectacular.utils import extend_schema, extend_schema_view
+from datetime import datetime, time, timedelta
+from django.core.exceptions import ValidationError
+from django.shortcuts import get_object_or_404
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime, parse_date
+from drf_spectacular.utils import extend_schema, extend_schema_view, OpenApiParameter
 
-from investigators.models import (
-    PuntajeInvestigador, Investigador, Estudiante, 
-    DetLinea, Linea, Proyecto, DetProyecto, 
-    Articulo, DetArticulo, DetEvento, Evento
-)
+from investigators.models import PuntajeInvestigador, RankingPuntaje, Trabajo
+from investigators.scoring import CAMPOS_PUNTAJE
+from investigators.scoring.auditoria import CHUNK_SIZE, auditar_puntajes
+from investigators.scoring.concurrencia import contadores, recalcular_investigadores
+from investigators.scoring.explicacion import explicar_puntaje
+from investigators.scoring.history import serie_historial
+from investigators.scoring.resumen import AGRUPACIONES, resumen_en_cache, estadisticas_en_cache
+from investigators.scoring.simulacion import Simulador
+from investigators.pagination import RankingCursorPagination
 from investigators.serializers.puntaje_serializer import PuntajeInvestigadorSerializer
+from investigators.serializers.trabajo_serializer import TrabajoSerializer
+from investigators.trabajos import encolar
 from investigators.views.base_view import OrderedModelViewSet
 
+# Mapeo de categorías de los parámetros de consulta a campos de puntaje
+CAMPOS_CATEGORIA = {
+    'estudiantes_maestria': 'puntos_estudiantes_maestria',
+    'estudiantes_doctorado': 'puntos_estudiantes_doctorado',
+    'lineas': 'puntos_lineas_investigacion',
+    'proyectos': 'puntos_proyectos',
+    'articulos': 'puntos_articulos',
+    'eventos': 'puntos_eventos',
+    'total': 'puntos_totales'
+}
+
 @extend_schema_view(
     list=extend_schema(summary="Listar todos los puntajes", tags=["Puntajes"]),
     retrieve=extend_schema(summary="Obtener puntaje por ID", tags=["Puntajes"]),
@@ -25,18 +47,36 @@ class PuntajeInvestigadorViewSet(OrderedModelViewSet):
     
     @extend_schema(
         summary="Recalcular todos los puntajes",
-        description="Recalcula los puntajes de todos los investigadores activos",
+        description=(
+            "Encola el recálculo de los puntajes de todos los investigadores activos y retorna el id "
+            "del trabajo. El comando procesar_trabajos lo ejecuta; el avance se consulta en jobs/{id}/"
+        ),
+        responses={202: TrabajoSerializer},
         tags=["Puntajes"]
     )
     @action(detail=False, methods=['post'])
     def recalcular_todos(self, request):
-        # Obtenemos todos los investigadores activos
-        investigadores = Investigador.objects.filter(activo=True)
-        
-        for investigador in investigadores:
-            self._calcular_puntaje_investigador(investigador)
+        # El recálculo completo se ejecuta fuera del proceso web
+        trabajo = encolar('recalcular_puntajes')
         
-        return Response({"status": "Puntajes recalculados con éxito"}, status=status.HTTP_200_OK)
+        return Response({
+            "status": "Recálculo de puntajes encolado",
+            "job_id": trabajo.pk,
+            "job": TrabajoSerializer(trabajo).data
+        }, status=status.HTTP_202_ACCEPTED)
+    
+    @extend_schema(
+        summary="Consultar trabajo de recálculo",
+        description="Retorna el estado, porcentaje de avance, velocidad y errores de un trabajo en segundo plano",
+        responses=TrabajoSerializer,
+        tags=["Puntajes"]
+    )
+    @action(detail=False, methods=['get'], url_path=r'jobs/(?P<job_id>\d+)')
+    def jobs(self, request, job_id=None):
+        # Solo trabajos de recálculo: los de importación incluyen rutas del servidor
+        # y se consultan desde /api/import-json/jobs/ con permisos de administrador
+        trabajo = get_object_or_404(Trabajo, pk=job_id, tipo='recalcular_puntajes')
+        return Response(TrabajoSerializer(trabajo).data)
     
     @extend_schema(
         summary="Recalcular puntaje de un investigador",
@@ -46,238 +86,316 @@ class PuntajeInvestigadorViewSet(OrderedModelViewSet):
     @action(detail=True, methods=['post'])
     def recalcular(self, request, pk=None):
         investigador = self.get_object().investigador
-        self._calcular_puntaje_investigador(investigador)
+        if self._calcular_puntaje_investigador(investigador):
+            return Response({"status": "El puntaje ya se estaba recalculando, se incluirán los cambios"}, status=status.HTTP_200_OK)
         
         return Response({"status": "Puntaje recalculado con éxito"}, status=status.HTTP_200_OK)
     
+    @extend_schema(
+        summary="Contadores de recálculos",
+        description="Cantidad de recálculos individuales ejecutados, absorbidos por un recálculo en curso y esperas de bloqueo",
+        tags=["Puntajes"]
+    )
+    @action(detail=False, methods=['get'])
+    def recalculos(self, request):
+        return Response(contadores())
+    
     @extend_schema(
         summary="Obtener resumen por área",
-        description="Obtiene un resumen de puntajes agrupados por área",
+        description="Obtiene un resumen de puntajes agrupados por área o por unidad",
+        parameters=[
+            OpenApiParameter(name="agrupar", description="Agrupar por 'area' (por defecto) o 'unidad'", required=False, type=str),
+        ],
         tags=["Puntajes"]
     )
     @action(detail=False, methods=['get'])
     def resumen_por_area(self, request):
-        # Implementación para obtener resumen por área
-        areas = {}
-        
-        for puntaje in PuntajeInvestigador.objects.select_related('investigador__area').all():
-            area_nombre = puntaje.investigador.area.nombre
-            area_id = puntaje.investigador.area.id
-            
-            if area_id not in areas:
-                areas[area_id] = {
-                    'id': area_id,
-                    'nombre': area_nombre,
-                    'puntos_totales': 0,
-                    'puntos_estudiantes_maestria': 0,
-                    'puntos_estudiantes_doctorado': 0,
-                    'puntos_lineas_investigacion': 0,
-                    'puntos_proyectos': 0,
-                    'puntos_articulos': 0,
-                    'puntos_eventos': 0,
-                    'investigadores': 0
-                }
-            
-            areas[area_id]['puntos_totales'] += puntaje.puntos_totales
-            areas[area_id]['puntos_estudiantes_maestria'] += puntaje.puntos_estudiantes_maestria
-            areas[area_id]['puntos_estudiantes_doctorado'] += puntaje.puntos_estudiantes_doctorado
-            areas[area_id]['puntos_lineas_investigacion'] += puntaje.puntos_lineas_investigacion
-            areas[area_id]['puntos_proyectos'] += puntaje.puntos_proyectos
-            areas[area_id]['puntos_articulos'] += puntaje.puntos_articulos
-            areas[area_id]['puntos_eventos'] += puntaje.puntos_eventos
-            areas[area_id]['investigadores'] += 1
+        agrupar = request.query_params.get('agrupar', 'area')
+        if agrupar not in AGRUPACIONES:
+            return Response(
+                {"error": f"Agrupación inválida. Opciones válidas: {', '.join(AGRUPACIONES.keys())}"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
         
-        return Response(list(areas.values()))
+        # Se suma en la base de datos y se guarda en caché hasta que cambie algún puntaje
+        return Response(resumen_en_cache(agrupar))
     
     @extend_schema(
         summary="Obtener estadísticas por categoría",
-        description="Obtiene estadísticas detalladas para una categoría específica, agrupadas por área",
+        description=(
+            "Obtiene por área la cantidad de investigadores, suma, promedio, mediana y los mejores "
+            "puntajes de una categoría. Con el parámetro 'area' recorre todos los investigadores "
+            "del área en orden de posición, paginados por cursor"
+        ),
+        parameters=[
+            OpenApiParameter(name="categoria", description="Categoría a consultar (por defecto total)", required=False, type=str),
+            OpenApiParameter(name="top", description="Mejores puntajes incluidos por área (por defecto 10, máximo 100)", required=False, type=int),
+            OpenApiParameter(name="area", description="ID de área cuyo ranking completo se recorre por cursor", required=False, type=int),
+            OpenApiParameter(name="cursor", description="Cursor de la página siguiente o anterior", required=False, type=str),
+        ],
         tags=["Puntajes"]
     )
     @action(detail=False, methods=['get'])
     def stats_por_categoria(self, request):
         categoria = request.query_params.get('categoria', 'total')
         
-        # Mapeo de categorías a campos de puntaje
-        campo_puntaje = {
-            'estudiantes_maestria': 'puntos_estudiantes_maestria',
-            'estudiantes_doctorado': 'puntos_estudiantes_doctorado',
-            'lineas': 'puntos_lineas_investigacion',
-            'proyectos': 'puntos_proyectos',
-            'articulos': 'puntos_articulos',
-            'eventos': 'puntos_eventos',
-            'total': 'puntos_totales'
-        }
-        
         # Verificar que la categoría sea válida
-        if categoria not in campo_puntaje:
+        if categoria not in CAMPOS_CATEGORIA:
             return Response(
-                {"error": f"Categoría inválida. Opciones válidas: {', '.join(campo_puntaje.keys())}"},
+                {"error": f"Categoría inválida. Opciones válidas: {', '.join(CAMPOS_CATEGORIA.keys())}"},
                 status=status.HTTP_400_BAD_REQUEST
             )
+        campo = CAMPOS_CATEGORIA[categoria]
         
-        # Datos agrupados por área
-        datos_por_area = {}
+        try:
+            top = int(request.query_params.get('top', 10))
+            area_id = request.query_params.get('area')
+            area_id = int(area_id) if area_id else None
+        except ValueError:
+            return Response(
+                {"error": "Los parámetros 'top' y 'area' deben ser enteros"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        if not 1 <= top <= 100:
+            return Response(
+                {"error": "El parámetro 'top' debe estar entre 1 y 100"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
         
-        # Para cada puntaje, obtener el investigador y su área
-        for puntaje in PuntajeInvestigador.objects.select_related('investigador__area').all():
-            area_nombre = puntaje.investigador.area.nombre
-            area_id = puntaje.investigador.area.id
-            
-            if area_id not in datos_por_area:
-                datos_por_area[area_id] = {
-                    'id': area_id,
-                    'nombre': area_nombre,
-                    'investigadores': []
+        # Detalle de un área: todos sus investigadores en orden de posición, por cursor
+        if area_id is not None:
+            paginator = RankingCursorPagination()
+            rankings = RankingPuntaje.objects.filter(
+                categoria=campo, area_id=area_id
+            ).select_related('investigador')
+            pagina = paginator.paginate_queryset(rankings, request, view=self)
+            return paginator.get_paginated_response([
+                {
+                    'id': ranking.investigador_id,
+                    'nombre': ranking.investigador.nombre,
+                    'puntaje': ranking.puntos,
+                    'posicion': ranking.posicion_area
                 }
-            
-            # Agregar datos del investigador
-            datos_por_area[area_id]['investigadores'].append({
-                'id': puntaje.investigador.id,
-                'nombre': puntaje.investigador.nombre,
-                'puntaje': getattr(puntaje, campo_puntaje[categoria])
-            })
+                for ranking in pagina
+            ])
         
-        # Convertir el diccionario a una lista
-        resultado = []
-        for area_id, area_data in datos_por_area.items():
-            # Ordenar investigadores por puntaje (de mayor a menor)
-            area_data['investigadores'].sort(key=lambda x: x['puntaje'], reverse=True)
-            resultado.append(area_data)
-        
-        # Ordenar áreas por cantidad de investigadores
-        resultado.sort(key=lambda x: len(x['investigadores']), reverse=True)
-        
-        return Response(resultado)
+        # Resumen por área calculado con funciones de ventana en la base de datos
+        return Response(estadisticas_en_cache(campo, top))
     
-    def _calcular_puntaje_investigador(self, investigador):
-        """
-        Calcula y guarda el puntaje de un investigador según los criterios establecidos
-        """
-        # Inicializar puntajes
-        puntos_estudiantes_maestria = 0
-        puntos_estudiantes_doctorado = 0
-        puntos_lineas_investigacion = 0
-        puntos_proyectos = 0
-        puntos_articulos = 0
-        puntos_eventos = 0
-        
-        # 1. Calcular puntos por estudiantes de maestría
-        estudiantes_maestria = Estudiante.objects.filter(
-            investigador=investigador,
-            tipo_estudiante__nombre__icontains='Maestría'
-        )
-        
-        for estudiante in estudiantes_maestria:
-            if estudiante.activo:
-                puntos_estudiantes_maestria += 1
-            elif estudiante.estatus == 'Desertor':
-                puntos_estudiantes_maestria += 2
-            elif estudiante.estatus == 'Egresado':
-                puntos_estudiantes_maestria += 3
-            elif estudiante.estatus == 'Titulado':
-                puntos_estudiantes_maestria += 5
-        
-        # 2. Calcular puntos por estudiantes de doctorado
-        estudiantes_doctorado = Estudiante.objects.filter(
-            investigador=investigador,
-            tipo_estudiante__nombre__icontains='Doctorado'
-        )
+    @extend_schema(
+        summary="Obtener ranking de investigadores",
+        description=(
+            "Retorna los primeros lugares de una categoría, globales o dentro de un área, "
+            "o la posición de un investigador"
+        ),
+        parameters=[
+            OpenApiParameter(name="categoria", description="Categoría del ranking (por defecto total)", required=False, type=str),
+            OpenApiParameter(name="area", description="Filtrar por ID de área", required=False, type=int),
+            OpenApiParameter(name="investigador", description="Filtrar por ID de investigador", required=False, type=int),
+            OpenApiParameter(name="top", description="Cantidad de lugares (por defecto 10, máximo 100)", required=False, type=int),
+        ],
+        tags=["Puntajes"]
+    )
+    @action(detail=False, methods=['get'])
+    def ranking(self, request):
+        categoria = request.query_params.get('categoria', 'total')
+        if categoria not in CAMPOS_CATEGORIA:
+            return Response(
+                {"error": f"Categoría inválida. Opciones válidas: {', '.join(CAMPOS_CATEGORIA.keys())}"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
         
-        for estudiante in estudiantes_doctorado:
-            if estudiante.activo:
-                puntos_estudiantes_doctorado += 1
-            elif estudiante.estatus == 'Desertor':
-                puntos_estudiantes_doctorado += 3
-            elif estudiante.estatus == 'Egresado':
-                puntos_estudiantes_doctorado += 5
-            elif estudiante.estatus == 'Titulado':
-                puntos_estudiantes_doctorado += 8
+        try:
+            top = int(request.query_params.get('top', 10))
+            area_id = request.query_params.get('area')
+            area_id = int(area_id) if area_id else None
+            investigador_id = request.query_params.get('investigador')
+            investigador_id = int(investigador_id) if investigador_id else None
+        except ValueError:
+            return Response(
+                {"error": "Los parámetros 'top', 'area' e 'investigador' deben ser enteros"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        if not 1 <= top <= 100:
+            return Response(
+                {"error": "El parámetro 'top' debe estar entre 1 y 100"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
         
-        # 3. Calcular puntos por líneas de investigación con reconocimiento institucional
-        lineas_reconocidas = DetLinea.objects.filter(
-            investigador=investigador,
-            linea__reconocimiento_institucional=True
-        ).count()
+        # Los índices (categoria, area, posicion_area) y (categoria, posicion_global)
+        # resuelven la consulta sin ordenar todos los puntajes
+        rankings = RankingPuntaje.objects.filter(categoria=CAMPOS_CATEGORIA[categoria])
+        if area_id is not None:
+            rankings = rankings.filter(area_id=area_id).order_by('posicion_area', 'investigador_id')
+            campo_posicion = 'posicion_area'
+        else:
+            rankings = rankings.order_by('posicion_global', 'investigador_id')
+            campo_posicion = 'posicion_global'
+        if investigador_id is not None:
+            rankings = rankings.filter(investigador_id=investigador_id)
         
-        puntos_lineas_investigacion = lineas_reconocidas * 5
+        resultado = [
+            {
+                'posicion': getattr(ranking, campo_posicion),
+                'id': ranking.investigador_id,
+                'nombre': ranking.investigador.nombre,
+                'area': ranking.area_id,
+                'puntaje': ranking.puntos
+            }
+            for ranking in rankings.select_related('investigador')[:top]
+        ]
         
-        # 4. Calcular puntos por proyectos
-        proyectos_liderados = Proyecto.objects.filter(lider=investigador)
+        return Response(resultado)
+    
+    @extend_schema(
+        summary="Simular cambios en las reglas de puntaje",
+        description=(
+            "Calcula cómo cambiarían los puntajes y posiciones de los investigadores activos con otros "
+            "puntos por regla, sin guardar nada. Cuerpo: {\"escenarios\": [{\"nombre\": \"...\", "
+            "\"pesos\": {\"puntos_articulos\": {\"3\": 12}}}], \"limite\": 50}. Sin escenarios "
+            "retorna las reglas actuales con su índice"
+        ),
+        tags=["Puntajes"]
+    )
+    @action(detail=False, methods=['post'])
+    def simular(self, request):
+        escenarios = request.data.get('escenarios', [])
+        if 'pesos' in request.data:
+            escenarios = [{'nombre': 'Escenario 1', 'pesos': request.data['pesos']}]
+        if not isinstance(escenarios, list) or not all(isinstance(e, dict) for e in escenarios):
+            return Response(
+                {"error": "'escenarios' debe ser una lista de objetos con 'pesos'"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        try:
+            limite = int(request.data.get('limite', 50))
+        except (TypeError, ValueError):
+            limite = 0
+        if not 1 <= limite <= 1000:
+            return Response(
+                {"error": "El parámetro 'limite' debe ser un entero entre 1 y 1000"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
         
-        for proyecto in proyectos_liderados:
-            if proyecto.estado == 'En Proceso':
-                puntos_proyectos += 3
-            elif proyecto.estado == 'Terminado':
-                puntos_proyectos += 7
-            elif proyecto.estado == 'Instalado en Sitio':
-                puntos_proyectos += 10
+        simulador = Simulador()
+        try:
+            resultados = simulador.evaluar(escenarios, limite=limite)
+        except ValidationError as e:
+            return Response({"error": e.messages}, status=status.HTTP_400_BAD_REQUEST)
         
-        # 5. Calcular puntos por artículos
-        articulos_participados = DetArticulo.objects.filter(investigador=investigador)
+        return Response({
+            "investigadores": len(simulador.ids),
+            "reglas": simulador.describir_reglas(),
+            "escenarios": resultados
+        })
+    
+    @extend_schema(
+        summary="Auditar puntajes",
+        description=(
+            "Compara los puntajes guardados con los que corresponden según las reglas vigentes, "
+            "recorriendo los investigadores por lotes. Solo administradores. Cuerpo opcional: "
+            "{\"chunk_size\": 1000, \"limite\": 100, \"corregir\": false}; con corregir se "
+            "recalculan solo los puntajes con diferencias o faltantes"
+        ),
+        tags=["Puntajes"]
+    )
+    @action(detail=False, methods=['post'])
+    def auditar(self, request):
+        try:
+            chunk_size = int(request.data.get('chunk_size', CHUNK_SIZE))
+            limite = int(request.data.get('limite', 100))
+        except (TypeError, ValueError):
+            chunk_size = limite = 0
+        if not 1 <= chunk_size <= 10000 or not 1 <= limite <= 1000:
+            return Response(
+                {"error": "'chunk_size' debe ser un entero entre 1 y 10000 y 'limite' entre 1 y 1000"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        corregir = request.data.get('corregir', False) in (True, 'true', 'True', '1', 1)
         
-        for det_articulo in articulos_participados:
-            articulo = det_articulo.articulo
-            
-            # Verificar si es el primer autor
-            es_primer_autor = det_articulo.orden_autor == 1
-            
-            if es_primer_autor:
-                if articulo.estado == 'En Proceso':
-                    puntos_articulos += 3
-                elif articulo.estado == 'Terminado':
-                    puntos_articulos += 5
-                elif articulo.estado == 'En Revista':
-                    puntos_articulos += 7
-                elif articulo.estado == 'Publicado':
-                    puntos_articulos += 10
-            else:
-                # Si no es el primer autor, siempre son 3 puntos
-                puntos_articulos += 3
+        return Response(auditar_puntajes(chunk_size=chunk_size, corregir=corregir, limite=limite))
+    
+    @extend_schema(
+        summary="Obtener historial del puntaje",
+        description="Retorna la evolución del puntaje del investigador, reducida a un máximo de puntos",
+        parameters=[
+            OpenApiParameter(name="puntos", description="Cantidad máxima de puntos de la serie (por defecto 100)", required=False, type=int),
+            OpenApiParameter(name="desde", description="Fecha inicial (YYYY-MM-DD)", required=False, type=str),
+            OpenApiParameter(name="hasta", description="Fecha final (YYYY-MM-DD)", required=False, type=str),
+        ],
+        tags=["Puntajes"]
+    )
+    @action(detail=True, methods=['get'])
+    def historial(self, request, pk=None):
+        puntaje = self.get_object()
         
-        # 6. Calcular puntos por eventos
-        eventos_participados = DetEvento.objects.filter(investigador=investigador)
+        try:
+            max_puntos = int(request.query_params.get('puntos', 100))
+        except ValueError:
+            max_puntos = 0
+        if not 1 <= max_puntos <= 1000:
+            return Response(
+                {"error": "El parámetro 'puntos' debe ser un entero entre 1 y 1000"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
         
-        for det_evento in eventos_participados:
-            evento = det_evento.evento
-            tipo_evento = evento.tipo_evento.nombre if evento.tipo_evento else ""
-            rol_evento = det_evento.rol_evento.nombre if det_evento.rol_evento else ""
-            
-            if tipo_evento == "Congreso" and "Ponente" in rol_evento:
-                puntos_eventos += 3
-            elif tipo_evento == "Taller":
-                puntos_eventos += 1
-            elif tipo_evento == "Conferencia" and "Ponente" in rol_evento:
-                puntos_eventos += 5
-            elif tipo_evento == "Diplomado":
-                puntos_eventos += 3
-            elif tipo_evento == "Charla":
-                puntos_eventos += 1
-            else:
-                puntos_eventos += 1  # Punto por cualquier otro tipo de evento
+        fechas = {}
+        for nombre in ('desde', 'hasta'):
+            valor = request.query_params.get(nombre)
+            fechas[nombre] = None
+            if not valor:
+                continue
+            fecha = parse_datetime(valor)
+            if fecha is None:
+                dia = parse_date(valor)
+                if dia is None:
+                    return Response(
+                        {"error": f"Fecha inválida en '{nombre}': {valor}"},
+                        status=status.HTTP_400_BAD_REQUEST
+                    )
+                # Una fecha sin hora incluye el día completo
+                if nombre == 'hasta':
+                    dia += timedelta(days=1)
+                fecha = datetime.combine(dia, time.min)
+            if timezone.is_naive(fecha):
+                fecha = timezone.make_aware(fecha)
+            fechas[nombre] = fecha
         
-        # Calcular puntaje total
-        puntos_totales = (
-            puntos_estudiantes_maestria +
-            puntos_estudiantes_doctorado +
-            puntos_lineas_investigacion +
-            puntos_proyectos +
-            puntos_articulos +
-            puntos_eventos
-        )
+        serie = serie_historial(puntaje.investigador_id, max_puntos, fechas['desde'], fechas['hasta'])
         
-        # Guardar o actualizar el registro de puntaje
-        puntaje, created = PuntajeInvestigador.objects.update_or_create(
-            investigador=investigador,
-            defaults={
-                'puntos_estudiantes_maestria': puntos_estudiantes_maestria,
-                'puntos_estudiantes_doctorado': puntos_estudiantes_doctorado,
-                'puntos_lineas_investigacion': puntos_lineas_investigacion,
-                'puntos_proyectos': puntos_proyectos,
-                'puntos_articulos': puntos_articulos,
-                'puntos_eventos': puntos_eventos,
-                'puntos_totales': puntos_totales
-            }
-        )
+        return Response({
+            "investigador": puntaje.investigador_id,
+            "puntos": len(serie),
+            "historial": serie
+        })
+    
+    @extend_schema(
+        summary="Explicar el puntaje",
+        description=(
+            "Lista, por categoría, cada estudiante, línea, proyecto, artículo y evento que aporta "
+            "puntos al investigador, con la regla que cumple y los puntos obtenidos. Incluye el "
+            "valor guardado de cada categoría para compararlo con el calculado"
+        ),
+        tags=["Puntajes"]
+    )
+    @action(detail=True, methods=['get'])
+    def explicacion(self, request, pk=None):
+        puntaje = self.get_object()
+        explicacion = explicar_puntaje(puntaje.investigador_id)
+        for categoria in CAMPOS_PUNTAJE:
+            explicacion[categoria]['guardado'] = getattr(puntaje, categoria)
         
-        return puntaje
+        return Response({
+            "investigador": puntaje.investigador_id,
+            "puntos_totales": explicacion.pop('puntos_totales'),
+            "puntos_totales_guardado": puntaje.puntos_totales,
+            "categorias": explicacion
+        })
+    
+    def _calcular_puntaje_investigador(self, investigador):
+        """
+        Calcula y guarda el puntaje de un investigador según los criterios establecidos.
+        Usa el mismo cálculo en bloque que recalcular_todos, limitado a un investigador.
+        Retorna True si el pedido lo absorbió un recálculo que ya estaba en curso.
+        """
+        return bool(recalcular_investigadores([investigador.pk]))
@@ -146,6 +146,19 @@ DATABASES = {
     }
 }
 
+# Configuración de caché. Por defecto se guarda en la base de datos para que el backend y
+# el worker (procesar_trabajos) compartan los resúmenes calculados; la tabla se crea con
+# `python manage.py createcachetable`. Sus versiones y los contadores de recálculos no se
+# guardan aquí sino en el modelo Contador, porque las claves de la caché caducan.
+# También se puede usar Redis
+# (CACHE_BACKEND=django.core.cache.backends.redis.RedisCache, CACHE_LOCATION=redis://...)
+CACHES = {
+    'default': {
+        'BACKEND': os.getenv('CACHE_BACKEND', 'django.core.cache.backends.db.DatabaseCache'),
+        'LOCATION': os.getenv('CACHE_LOCATION', 'cache_table'),
+    }
+}
+
 # Validadores de contraseñas para aumentar la seguridad
 AUTH_PASSWORD_VALIDATORS = [
     {
@@ -202,6 +215,37 @@ CORS_ALLOW_HEADERS = [
     'x-requested-with',
 ]
 
+# Modo incremental de puntajes: las señales aplican solo la diferencia de puntos de la fila
+# que cambió en lugar de recalcular el historial completo del investigador.
+# En este modo conviene ejecutar periódicamente `python manage.py actualizar_puntajes`
+# como pasada de reconciliación para corregir cualquier desviación.
+PUNTAJES_INCREMENTALES = os.getenv('PUNTAJES_INCREMENTALES', 'False') == 'True'
+
+# Frecuencia del historial de puntajes: 'cambio' guarda una fila por cada cambio,
+# 'dia' conserva solo la última fila de cada día por investigador
+PUNTAJES_HISTORIAL = os.getenv('PUNTAJES_HISTORIAL', 'cambio')
+
+# Segundos que se conservan en caché los resúmenes de puntajes; además se invalidan
+# en cuanto cambia cualquier puntaje
+PUNTAJES_CACHE_TIMEOUT = int(os.getenv('PUNTAJES_CACHE_TIMEOUT', '3600'))
+
+# Segundos durante los que cada proceso reutiliza los campos relevantes para el puntaje
+# sin comprobar si otro proceso modificó las reglas; en el proceso que las modifica se
+# descartan en el momento
+PUNTAJES_REGLAS_VIGENCIA = int(os.getenv('PUNTAJES_REGLAS_VIGENCIA', '60'))
+
+# Directorio donde se guardan los archivos de los trabajos de importación hasta que
+# terminan; debe ser compartido entre el backend y el proceso procesar_trabajos
+IMPORTACIONES_DIR = os.getenv('IMPORTACIONES_DIR', str(Path(__file__).resolve().parent.parent / 'importaciones'))
+
+# Procesos que validan en paralelo los objetos de los archivos importados grandes
+IMPORTACION_PROCESOS = int(os.getenv('IMPORTACION_PROCESOS', str(min(4, os.cpu_count() or 1))))
+
+# Segundos sin avance tras los cuales un trabajo 'En Proceso' se considera detenido (por
+# ejemplo porque se reinició el worker): procesar_trabajos lo vuelve a encolar y una
+# importación también se puede reanudar desde la API
+IMPORTACION_INACTIVIDAD = int(os.getenv('IMPORTACION_INACTIVIDAD', '600'))
+
 # Límites de tamaño para carga de archivos (10MB)
 DATA_UPLOAD_MAX_MEMORY_SIZE = 10485760 
 FILE_UPLOAD_MAX_MEMORY_SIZE = 10485760
@@ -47,7 +47,19 @@ export const puntajeService = {
     }
   },
 
-  // Recalcular todos los puntajes
+  // Obtener el ranking de una categoría; filtros opcionales: area, investigador, top
+  getRanking: async (categoria, filtros = {}) => {
+    try {
+      const params = new URLSearchParams({ categoria, ...filtros });
+      const response = await api.get(`/puntajes/ranking/?${params.toString()}`);
+      return response.data;
+    } catch (error) {
+      console.error(`Error obteniendo ranking de ${categoria}:`, error);
+      throw error;
+    }
+  },
+
+  // Encolar el recálculo de todos los puntajes; retorna el trabajo creado (job_id, job)
   recalcularTodos: async () => {
     try {
       const response = await api.post("/puntajes/recalcular_todos/");
@@ -58,6 +70,28 @@ export const puntajeService = {
     }
   },
 
+  // Obtener el estado y el avance de un trabajo en segundo plano
+  getTrabajo: async (id) => {
+    try {
+      const response = await api.get(`/puntajes/jobs/${id}/`);
+      return response.data;
+    } catch (error) {
+      console.error(`Error obteniendo trabajo ${id}:`, error);
+      throw error;
+    }
+  },
+
+  // Consultar un trabajo cada cierto intervalo hasta que termine (Completado o Error)
+  esperarTrabajo: async (id, intervalo = 2000) => {
+    for (;;) {
+      const trabajo = await puntajeService.getTrabajo(id);
+      if (trabajo.estado === "Completado" || trabajo.estado === "Error") {
+        return trabajo;
+      }
+      await new Promise((resolve) => setTimeout(resolve, intervalo));
+    }
+  },
+
   // Recalcular puntaje de un investigador específico
   recalcularInvestigador: async (id) => {
     try {
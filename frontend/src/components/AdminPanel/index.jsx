@@ -28,6 +28,7 @@ import CreateButton from "./components/Buttons/CreateButton";
 import ViewControls from "./components/Controls/ViewControls";
 import ContentDisplay from "./components/Content/ContentDisplay";
 import LoadingSpinner from "./components/Loaders/LoadingSpinner";
+import JsonImport from "./subcomponents/JsonImport";
 import "react-toastify/dist/ReactToastify.css";
 import {
   UsuarioForm,
@@ -509,6 +510,11 @@ function AdminPanel() {
               handlePageChange={handlePageChange}
             />
           </div>
+
+          {/* Importación de respaldos JSON (solo administradores) */}
+          <div className="bg-gray-800/80 rounded-lg p-6 mt-6 border border-blue-500/30">
+            <JsonImport />
+          </div>
         </div>
       )}
 
@@ -1,5 +1,5 @@
 import React, { useState, useRef } from "react";
-import axios from "axios";
+import api from "../../../api/apiConfig";
 
 function JsonImport() {
   const [isLoading, setIsLoading] = useState(false);
@@ -57,8 +57,9 @@ function JsonImport() {
     const formData = new FormData();
     formData.append("file", file);
 
-    axios
-      .post("/api/import-json/", formData, {
+    // Se envía con la instancia de api, que incluye la cookie de sesión del administrador
+    api
+      .post("/import-json/", formData, {
         headers: {
           "Content-Type": "multipart/form-data",
         },
@@ -90,7 +91,7 @@ function JsonImport() {
   return (
     <div className="mt-6 text-center">
       <h3 className="text-sm text-blue-300 mb-2">
-        ¿Tienes un respaldo? Restaura tus datos
+        Restaurar datos desde un respaldo JSON
       </h3>
       <div
         className={`border-2 border-dashed rounded-md p-4 transition-colors cursor-pointer
@@ -177,8 +177,17 @@ function Dashboard() {
       // Activar indicador de carga
       setActualizando(true);
 
-      // Solicitar recálculo de todos los puntajes en el backend
-      await puntajeService.recalcularTodos();
+      // Encolar el recálculo de todos los puntajes; lo ejecuta un proceso en segundo plano
+      const { job_id } = await puntajeService.recalcularTodos();
+      toast.info("Recálculo de puntajes en proceso...");
+
+      // Consultar el trabajo hasta que termine antes de recargar los datos
+      const trabajo = await puntajeService.esperarTrabajo(job_id);
+      if (trabajo.estado === "Error") {
+        throw new Error(
+          `El trabajo de recálculo ${job_id} terminó con errores: ${JSON.stringify(trabajo.errores)}`
+        );
+      }
 
       // Recargar datos actualizados
       const puntajesData = await puntajeService.getAll();
@@ -189,6 +189,14 @@ function PuntajePorCategoria({ categoria, investigadorSeleccionado }) {
       // Obtener datos del servicio API para la categoría seleccionada
       const data = await puntajeService.getStatsPorCategoria(categoria);
 
+      // Las estadísticas solo traen los mejores puntajes de cada área; el puntaje del
+      // investigador seleccionado se obtiene del ranking aunque no esté entre ellos
+      const seleccionado = investigadorSeleccionado
+        ? await puntajeService.getRanking(categoria, {
+            investigador: investigadorSeleccionado,
+          })
+        : [];
+
       // Arrays y objetos para transformación de datos
       const transformedData = [];
       const areaColors = {}; // Mapeo de área a color
@@ -215,11 +223,9 @@ function PuntajePorCategoria({ categoria, investigadorSeleccionado }) {
         areaColors[area.nombre] = colores[areaIndex % colores.length];
         areaTotals[area.nombre] = 0;
 
-        // Filtrar por investigador si hay uno seleccionado
+        // Si hay un investigador seleccionado, mostrar solo su puntaje en su área
         const investigadoresFiltrados = investigadorSeleccionado
-          ? area.investigadores.filter(
-              (inv) => inv.id === investigadorSeleccionado
-            )
+          ? seleccionado.filter((inv) => inv.area === area.id)
           : area.investigadores;
 
         // Filtrar investigadores con puntaje 0 o nulo para mostrar solo datos relevantes